@@ -0,0 +1,117 @@
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from rich.console import Console
+from rich.table import Table
+
+
+def delta(old: Optional[float], new: Optional[float]) -> str:
+    """
+    Format the relative change between two measurements.
+
+    Parameters
+    ----------
+    old : Optional[float]
+        Baseline measurement.
+    new : Optional[float]
+        New measurement.
+
+    Returns
+    -------
+    str
+        Relative change, or '-' if either measurement is missing.
+    """
+
+    if not old or new is None:
+        return "-"
+
+    return f"{100 * (new - old) / old:+.1f}%"
+
+
+def compare(old: Path, new: Path) -> Table:
+    """
+    Compare the throughput and median latency of two benchmark runs.
+
+    Parameters
+    ----------
+    old : Path
+        Results file of the baseline run.
+    new : Path
+        Results file of the new run.
+
+    Returns
+    -------
+    Table
+        Comparison, by benchmark.
+    """
+
+    runs = [
+        json.loads(path.read_text(encoding="utf-8"))
+        for path in [old, new]
+    ]
+    baseline, current = [run["results"] for run in runs]
+
+    table = Table(
+        title=(
+            f"{runs[0]['meta'].get('commit')} → "
+            f"{runs[1]['meta'].get('commit')}"
+        )
+    )
+
+    table.add_column("Benchmark", no_wrap=True)
+
+    for column in [
+        "Pages/s (old)",
+        "Pages/s (new)",
+        "Δ",
+        "p50 ms (old)",
+        "p50 ms (new)",
+        "Δ",
+    ]:
+        table.add_column(column)
+
+    for name in list(dict.fromkeys([*baseline, *current])):
+        before = baseline.get(name, dict())
+        after = current.get(name, dict())
+
+        rates = [
+            result.get("pages_per_sec") for result in [before, after]
+        ]
+        medians = [
+            result.get("latency_ms", dict()).get("p50")
+            for result in [before, after]
+        ]
+
+        table.add_row(
+            name,
+            *[f"{rate:,.1f}" if rate else "-" for rate in rates],
+            delta(*rates),
+            *[f"{p50:.3f}" if p50 else "-" for p50 in medians],
+            delta(*medians),
+        )
+
+    return table
+
+
+def run(argv: List[str]) -> None:
+    """
+    Print the comparison of two results files.
+
+    Parameters
+    ----------
+    argv : List[str]
+        Paths of the baseline and new results files.
+    """
+
+    if len(argv) != 2:
+        sys.exit(
+            "usage: python -m benchmarks.compare OLD.json NEW.json"
+        )
+
+    Console().print(compare(*[Path(arg) for arg in argv]))
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
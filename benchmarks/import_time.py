@@ -0,0 +1,272 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+from .run import ROOT
+
+# Entry points; the CLIs and the modules loaded by shard worker processes
+MODULES: List[str] = [
+    "scraping_pokemon.query",
+    "scraping_pokemon.src.export",
+    "scraping_pokemon.src.database.db",
+    "scraping_pokemon.src.scraping.shard_worker",
+    "scraping_pokemon.main",
+]
+
+# Line of the '-X importtime' output; self and cumulative microseconds
+IMPORTTIME = re.compile(
+    r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$"
+)
+
+
+def measure(module: str) -> Tuple[dict, List[str]]:
+    """
+    Import a module in a fresh interpreter, within an empty working
+    directory, and collect its import times and the files it created.
+
+    Parameters
+    ----------
+    module : str
+        Module to import.
+
+    Returns
+    -------
+    Tuple[dict, List[str]]
+        Self and cumulative import times in microseconds, by imported
+        module, and the paths created by importing.
+    """
+
+    with tempfile.TemporaryDirectory() as cwd:
+        res = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                f"import {module}",
+            ],
+            cwd=cwd,
+            env={**os.environ, "PYTHONPATH": str(ROOT)},
+            capture_output=True,
+            text=True,
+        )
+
+        if res.returncode:
+            raise RuntimeError(res.stderr.strip().splitlines()[-1])
+
+        created = sorted(
+            str(path.relative_to(cwd)) for path in Path(cwd).rglob("*")
+        )
+
+    times: Dict[str, Tuple[int, int]] = dict()
+
+    for line in res.stderr.splitlines():
+        match = IMPORTTIME.match(line)
+
+        if match:
+            times[match.group(4)] = (
+                int(match.group(1)),
+                int(match.group(2)),
+            )
+
+    return times, created
+
+
+def bench(module: str, repeat: int, top: int) -> dict:
+    """
+    Benchmark the import of a module; the fastest of the repeats is kept,
+    since slower ones only add noise of the machine.
+
+    Parameters
+    ----------
+    module : str
+        Module to import.
+    repeat : int
+        Amount of imports.
+    top : int
+        Amount of slowest imported modules to report.
+
+    Returns
+    -------
+    dict
+        Benchmark result.
+    """
+
+    runs = [measure(module) for _ in range(max(1, repeat))]
+    times, created = min(runs, key=lambda run: run[0][module][1])
+
+    slowest = sorted(times.items(), key=lambda item: -item[1][0])[:top]
+
+    return dict(
+        import_ms=times[module][1] / 1000,
+        modules=len(times),
+        slowest=[
+            dict(module=name, self_ms=self_us / 1000)
+            for name, (self_us, _) in slowest
+        ],
+        created=created,
+    )
+
+
+def report(results: Dict[str, dict], path: Path) -> None:
+    """
+    Print the results as a table.
+
+    Parameters
+    ----------
+    results : Dict[str, dict]
+        Results, by module.
+    path : Path
+        Path of the results file.
+    """
+
+    table = Table(title="Import time")
+
+    for column in [
+        "Module",
+        "Import (ms)",
+        "Modules",
+        "Slowest (self ms)",
+        "Created",
+    ]:
+        table.add_column(column)
+
+    for name, result in results.items():
+        if "skipped" in result:
+            table.add_row(name, "skipped", "-", result["skipped"], "-")
+
+            continue
+
+        table.add_row(
+            name,
+            f"{result['import_ms']:.1f}",
+            str(result["modules"]),
+            ", ".join(
+                f"{slow['module']} ({slow['self_ms']:.1f})"
+                for slow in result["slowest"]
+            ),
+            ", ".join(result["created"]) or "-",
+        )
+
+    console = Console()
+    console.print(table)
+    console.print(f"Results written to '{path}'.")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse the command line arguments of the import time benchmark.
+
+    Parameters
+    ----------
+    argv : Optional[List[str]], optional
+        Command line arguments, by default None
+
+    Returns
+    -------
+    argparse.Namespace
+        Parsed arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.import_time",
+        description="Benchmark the import time and side effects of the entry points.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="imports per module, each in a fresh interpreter",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=3,
+        help="slowest imported modules to report per module",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        metavar="NAME",
+        help="benchmark only modules whose name starts with NAME",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="JSON results file; defaults to data/benchmarks/import_<timestamp>.json",
+    )
+
+    return parser.parse_args(argv)
+
+
+def run(argv: Optional[List[str]] = None) -> Path:
+    """
+    Benchmark the import of every entry point, and write the results as
+    JSON.
+
+    Parameters
+    ----------
+    argv : Optional[List[str]], optional
+        Command line arguments, by default None
+
+    Returns
+    -------
+    Path
+        Path of the results file.
+    """
+
+    args = parse_args(argv)
+    output = (
+        args.output
+        or Path("data/benchmarks")
+        / f"import_{datetime.now():%Y%m%d-%H%M%S}.json"
+    ).resolve()
+
+    results: Dict[str, dict] = dict()
+
+    for module in MODULES:
+        if args.only and not any(
+            module.startswith(o) for o in args.only
+        ):
+            continue
+
+        try:
+            results[module] = bench(module, args.repeat, args.top)
+        except RuntimeError as e:
+            results[module] = dict(skipped=str(e))
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            dict(
+                meta=dict(
+                    timestamp=datetime.now().isoformat(
+                        timespec="seconds"
+                    ),
+                    python=sys.version.split()[0],
+                    repeat=args.repeat,
+                ),
+                results=results,
+            ),
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+
+    report(results, output)
+
+    return output
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
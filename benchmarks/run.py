@@ -0,0 +1,208 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import urljoin
+
+from .server import FixtureServer
+
+# Repository root
+ROOT = Path(__file__).parent.parent
+
+
+def configure(root: str, backend: str) -> None:
+    """
+    Point the scraper at the fixture server, before any of its modules
+    bind the switches at import. Caching, sprite reuse, request blocking,
+    rate limiting and resuming are disabled, so every call does the full
+    work.
+
+    Parameters
+    ----------
+    root : str
+        Root URL of the fixture server.
+    backend : str
+        Storage backend.
+    """
+
+    import scraping_pokemon.src.environ as environ
+
+    environ.CONSOLE.quiet = True
+    environ.CONSOLE.record = False
+
+    environ.FIREFOX_PARAMS = environ.FirefoxParams(headless=True)
+    environ.URL_ROOT = root
+    environ.ENTRYPOINT = urljoin(root, environ.URL_POKEDEX_INDEX)
+    environ.LIMIT_POKEDEX = 0
+    environ.LIMIT_CARDS = 0
+    environ.SCREENSHOT_MODE = "off"
+    environ.CACHE_ENABLED = False
+    environ.SPRITE_MAX_AGE = 0
+    environ.ROUTE_BLOCKING = False
+    environ.RATE_LIMIT = False
+    environ.HTTP_FALLBACK = False
+    environ.STORAGE_BACKEND = backend
+    environ.TRUNCATE = True
+    environ.RESUME = False
+    environ.PRETTY_JSON = False
+
+    environ.create_env()
+
+
+def metadata(args: argparse.Namespace) -> dict:
+    """
+    Describe the version and machine the benchmarks ran on.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Parsed arguments.
+
+    Returns
+    -------
+    dict
+        Run metadata.
+    """
+
+    version = re.search(
+        r'^version = "(.+)"$',
+        (ROOT / "pyproject.toml").read_text(encoding="utf-8"),
+        re.MULTILINE,
+    )
+
+    try:
+        commit: Optional[str] = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return dict(
+        version=version.group(1) if version else None,
+        commit=commit,
+        timestamp=datetime.now().isoformat(timespec="seconds"),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        backend=args.backend,
+        repeat=args.repeat,
+        inserts=args.inserts,
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse the command line arguments of the benchmark runner.
+
+    Parameters
+    ----------
+    argv : Optional[List[str]], optional
+        Command line arguments, by default None
+
+    Returns
+    -------
+    argparse.Namespace
+        Parsed arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Benchmark the scraping hot paths against local fixtures.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="calls per scraping and parsing benchmark",
+    )
+    parser.add_argument(
+        "--inserts",
+        type=int,
+        default=1000,
+        help="inserts per table in the storage benchmarks",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["sqlite", "tinydb"],
+        default="sqlite",
+        help="storage backend",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        metavar="NAME",
+        help="run only benchmarks whose name starts with NAME",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="JSON results file; defaults to data/benchmarks/<timestamp>.json",
+    )
+
+    return parser.parse_args(argv)
+
+
+def run(argv: Optional[List[str]] = None) -> Path:
+    """
+    Run the benchmarks and write their results as JSON.
+
+    Parameters
+    ----------
+    argv : Optional[List[str]], optional
+        Command line arguments, by default None
+
+    Returns
+    -------
+    Path
+        Path of the results file.
+    """
+
+    args = parse_args(argv)
+    output = (
+        args.output
+        or Path("data/benchmarks")
+        / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    ).resolve()
+
+    previous = os.getcwd()
+
+    with FixtureServer() as server, tempfile.TemporaryDirectory() as cwd:
+        # The scraper writes its data relative to the working directory
+        os.chdir(cwd)
+        configure(server.root, args.backend)
+
+        from . import suite
+
+        try:
+            results = asyncio.run(
+                suite.run_all(args.repeat, args.inserts, args.only)
+            )
+        finally:
+            os.chdir(previous)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            dict(meta=metadata(args), results=results), indent=2
+        ),
+        encoding="utf-8",
+    )
+
+    suite.report(results, output)
+
+    return output
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
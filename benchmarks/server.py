@@ -0,0 +1,125 @@
+import io
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+# Saved copies of the Pokédex index, Pokédex pages, detail pages and sprites
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the fixtures like the site serves its pages: extensionless paths
+    map to '.html' files, and the '{{ROOT}}' placeholder for absolute URLs
+    is replaced by the root URL of the server.
+    """
+
+    def translate_path(self, path: str) -> str:
+        translated = Path(super().translate_path(path))
+
+        if not translated.suffix:
+            translated = translated.with_suffix(".html")
+
+        return str(translated)
+
+    def send_head(self):
+        path = Path(self.translate_path(self.path))
+
+        if path.suffix != ".html" or not path.is_file():
+            return super().send_head()
+
+        body = (
+            path.read_text(encoding="utf-8")
+            .replace("{{ROOT}}", self.server.root)
+            .encode("utf-8")
+        )
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        return io.BytesIO(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    # Concurrent benchmark clients overflow the default backlog of 5, which
+    # stalls their connections on SYN retransmits
+    request_queue_size = 128
+
+
+class FixtureServer:
+    """
+    Local HTTP server of the fixtures, running in a background thread, so
+    it does not compete with the event loop being benchmarked.
+
+    Parameters
+    ----------
+    fixtures : Path, optional
+        Folder of the fixtures, by default FIXTURES
+    port : int, optional
+        Port to listen on; a free port is picked if 0, by default 0
+    """
+
+    def __init__(
+        self, fixtures: Path = FIXTURES, port: int = 0
+    ) -> None:
+        self.fixtures = fixtures
+        self.port = port
+
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def root(self) -> str:
+        """
+        Root URL of the server.
+        """
+
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> str:
+        """
+        Start serving.
+
+        Returns
+        -------
+        str
+            Root URL of the server.
+        """
+
+        self._server = _Server(
+            ("127.0.0.1", self.port),
+            partial(FixtureHandler, directory=str(self.fixtures)),
+        )
+        self._server.daemon_threads = True
+        self._server.root = self.root
+
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+
+        return self.root
+
+    def stop(self) -> None:
+        """
+        Stop serving.
+        """
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        self.start()
+
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,567 @@
+import time
+from itertools import cycle, islice
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+from unicodedata import normalize
+
+import aiohttp
+from playwright.async_api import Error, Page, async_playwright
+from rich.console import Console
+from rich.table import Table
+from selectolax.parser import HTMLParser
+
+import scraping_pokemon.src.utils as utils
+from scraping_pokemon.src import output
+from scraping_pokemon.src.database import db
+from scraping_pokemon.src.downloader import ImageDownloader
+from scraping_pokemon.src.environ import ENTRYPOINT, FIREFOX_PARAMS
+from scraping_pokemon.src.scraping import parsers
+from scraping_pokemon.src.scraping.coro_http import (
+    fetch_html,
+    http_get_pokedex_cards,
+    http_get_pokedex_urls,
+    http_get_pokemon_details,
+    extract_vitals,
+    inner_text,
+)
+from scraping_pokemon.src.scraping.coro_pokedex_cards import (
+    get_pokedex_cards,
+)
+from scraping_pokemon.src.scraping.coro_pokedex_urls import (
+    get_pokedex_urls,
+)
+from scraping_pokemon.src.scraping.coro_pokemon_details import (
+    get_pokemon_details,
+)
+from scraping_pokemon.src.types import VitalsRow
+
+from .server import FIXTURES
+
+# Per-call measurement; latency in seconds, and pages handled by the call
+Sample = Tuple[float, int]
+
+
+class BrowserUnavailable(RuntimeError):
+    """
+    Raised when no browser can be launched for the Playwright benchmarks.
+    """
+
+
+def summarize(samples: List[Sample]) -> dict:
+    """
+    Summarize the samples of a benchmark into throughput and per-call
+    latency statistics.
+
+    Parameters
+    ----------
+    samples : List[Sample]
+        Latency and page count of every call.
+
+    Returns
+    -------
+    dict
+        Benchmark result; latencies in milliseconds.
+    """
+
+    latencies = sorted(latency for latency, _ in samples)
+    seconds = sum(latencies)
+    pages = sum(n for _, n in samples)
+
+    def percentile(q: float) -> float:
+        return latencies[
+            min(len(latencies) - 1, int(q * len(latencies)))
+        ]
+
+    return dict(
+        calls=len(samples),
+        pages=pages,
+        seconds=round(seconds, 6),
+        pages_per_sec=round(pages / seconds, 3) if seconds else None,
+        latency_ms=dict(
+            mean=round(1000 * seconds / len(samples), 4),
+            p50=round(1000 * percentile(0.5), 4),
+            p95=round(1000 * percentile(0.95), 4),
+            min=round(1000 * latencies[0], 4),
+            max=round(1000 * latencies[-1], 4),
+        ),
+    )
+
+
+async def measure(
+    call: Callable[[], Awaitable[int]], repeat: int
+) -> Coroutine[Any, Any, Awaitable[dict]]:
+    """
+    Time a call a number of times.
+
+    Parameters
+    ----------
+    call : Callable[[], Awaitable[int]]
+        Call to time; returns the amount of pages it handled.
+    repeat : int
+        Amount of calls.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[dict]]
+        Benchmark result.
+    """
+
+    samples: List[Sample] = list()
+
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        pages = await call()
+        samples.append((time.perf_counter() - started, pages))
+
+    return summarize(samples)
+
+
+def detail_fixtures() -> List[bytes]:
+    """
+    Read the detail page fixtures.
+
+    Returns
+    -------
+    List[bytes]
+        HTML of every detail page.
+    """
+
+    return [
+        path.read_bytes()
+        for path in sorted((FIXTURES / "pokedex").glob("*.html"))
+        if path.stem != "national"
+    ]
+
+
+def extract_detail(
+    html: bytes,
+) -> Tuple[str, str, Dict[str, List[VitalsRow]]]:
+    """
+    Extract the name, description and vitals tables of a detail page, like
+    the HTTP engine does.
+
+    Parameters
+    ----------
+    html : bytes
+        HTML of the detail page.
+
+    Returns
+    -------
+    Tuple[str, str, Dict[str, List[VitalsRow]]]
+        Name, description and rows of the vitals tables, by section.
+    """
+
+    tree = HTMLParser(html)
+    main = tree.css_first("main")
+
+    name = normalize(
+        "NFKC", inner_text(main.css_first("h1, h2, h3, h4, h5, h6"))
+    )
+    description = normalize("NFKC", inner_text(main.css_first("p")))
+    tables = extract_vitals(main)
+
+    return name, description, tables
+
+
+async def bench_playwright(
+    repeat: int,
+) -> Coroutine[Any, Any, Awaitable[Dict[str, dict]]]:
+    """
+    Benchmark the Playwright scraping coroutines against the fixture
+    server. Every call navigates and extracts its pages from scratch.
+
+    Parameters
+    ----------
+    repeat : int
+        Calls per benchmark.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[Dict[str, dict]]]
+        Results, by benchmark name.
+    """
+
+    results: Dict[str, dict] = dict()
+
+    async with async_playwright() as backend:
+        try:
+            browser = await backend.firefox.launch(**FIREFOX_PARAMS)
+        except Error as e:
+            raise BrowserUnavailable(str(e).splitlines()[0]) from e
+
+        page: Page = await utils.navigate(
+            url=ENTRYPOINT, browser=browser
+        )
+
+        state: Dict[str, Any] = dict()
+
+        async def _pokedex_urls() -> int:
+            await utils.navigate(url=ENTRYPOINT, page=page)
+            state["urls"] = await get_pokedex_urls(page)
+
+            return 1
+
+        async def _pokedex_cards() -> int:
+            state["cards"], _ = await get_pokedex_cards(
+                page, state["urls"]
+            )
+
+            return len(state["urls"])
+
+        async def _pokemon_details() -> int:
+            downloader = ImageDownloader()
+            await downloader.start()
+
+            pokemon = await get_pokemon_details(
+                page, state["cards"], downloader
+            )
+            await downloader.drain()
+
+            return len(pokemon)
+
+        results["get_pokedex_urls"] = await measure(
+            _pokedex_urls, repeat
+        )
+        results["get_pokedex_cards"] = await measure(
+            _pokedex_cards, repeat
+        )
+        results["get_pokemon_details"] = await measure(
+            _pokemon_details, repeat
+        )
+
+        await browser.close()
+
+    return results
+
+
+async def bench_http(
+    repeat: int,
+) -> Coroutine[Any, Any, Awaitable[Dict[str, dict]]]:
+    """
+    Benchmark the browserless HTTP engine against the fixture server.
+
+    Parameters
+    ----------
+    repeat : int
+        Calls per benchmark.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[Dict[str, dict]]]
+        Results, by benchmark name.
+    """
+
+    results: Dict[str, dict] = dict()
+    state: Dict[str, Any] = dict()
+
+    async with aiohttp.ClientSession() as session:
+
+        async def _pokedex_urls() -> int:
+            state["urls"] = http_get_pokedex_urls(
+                await fetch_html(session, ENTRYPOINT)
+            )
+
+            return 1
+
+        async def _pokedex_cards() -> int:
+            state["cards"], _ = await http_get_pokedex_cards(
+                session, state["urls"]
+            )
+
+            return len(state["urls"])
+
+        async def _pokemon_details() -> int:
+            downloader = ImageDownloader()
+            await downloader.start()
+
+            pokemon = await http_get_pokemon_details(
+                session, state["cards"], downloader
+            )
+            await downloader.drain()
+
+            return len(pokemon)
+
+        results["http_get_pokedex_urls"] = await measure(
+            _pokedex_urls, repeat
+        )
+        results["http_get_pokedex_cards"] = await measure(
+            _pokedex_cards, repeat
+        )
+        results["http_get_pokemon_details"] = await measure(
+            _pokemon_details, repeat
+        )
+
+    return results
+
+
+async def bench_parsing(
+    repeat: int,
+) -> Coroutine[Any, Any, Awaitable[Dict[str, dict]]]:
+    """
+    Benchmark parsing without any I/O: extracting the detail page fixtures
+    from HTML, and parsing their vitals tables into records.
+
+    Parameters
+    ----------
+    repeat : int
+        Passes over the detail page fixtures.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[Dict[str, dict]]]
+        Results, by benchmark name.
+    """
+
+    pages = detail_fixtures()
+    extracted = [extract_detail(html) for html in pages]
+
+    samples_extract: List[Sample] = list()
+    samples_parse: List[Sample] = list()
+
+    for _ in range(max(1, repeat)):
+        for html in pages:
+            started = time.perf_counter()
+            extract_detail(html)
+            samples_extract.append((time.perf_counter() - started, 1))
+
+        for name, description, tables in extracted:
+            started = time.perf_counter()
+            await parsers.parse_pokemon(name, description, tables)
+            samples_parse.append((time.perf_counter() - started, 1))
+
+    return dict(
+        parse_html_detail=summarize(samples_extract),
+        parse_pokemon=summarize(samples_parse),
+    )
+
+
+async def bench_storage(
+    inserts: int,
+) -> Coroutine[Any, Any, Awaitable[Dict[str, dict]]]:
+    """
+    Benchmark the inserts into every document table, and flushing their
+    buffers, with records parsed from the fixtures.
+
+    Parameters
+    ----------
+    inserts : int
+        Inserts per table.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[Dict[str, dict]]]
+        Results, by benchmark name; a 'page' is a record.
+    """
+
+    pokemon = [
+        await parsers.parse_pokemon(*extract_detail(html))
+        for html in detail_fixtures()
+    ]
+
+    records: Dict[str, Tuple[Any, List[dict]]] = dict(
+        pokedex=(
+            db.table_pokedex,
+            [dict(pokedex_url=f"{ENTRYPOINT}/national")],
+        ),
+        generations=(
+            db.table_generations,
+            [dict(generation_url=f"{ENTRYPOINT}/game/red-blue-yellow")],
+        ),
+        cards_img=(
+            db.table_cards_img,
+            [
+                dict(
+                    card_image=dict(
+                        url=[f"{ENTRYPOINT}/{record['name'].lower()}"],
+                        img_src=[f"{record['name'].lower()}.png"],
+                        img_alt=[record["name"]],
+                    )
+                )
+                for record in pokemon
+            ],
+        ),
+        cards_data=(
+            db.table_cards_data,
+            [
+                dict(
+                    card_data=dict(
+                        number=[
+                            record["pokedex_data"]["national_no"][0]
+                        ],
+                        types=[
+                            record["pokedex_data"]["type"][0].split()
+                        ],
+                    )
+                )
+                for record in pokemon
+            ],
+        ),
+        pokemon=(db.table_pokemon, pokemon),
+    )
+
+    results: Dict[str, dict] = dict()
+
+    for name, (table, documents) in records.items():
+        table.truncate()
+
+        samples: List[Sample] = list()
+
+        for document in islice(cycle(documents), inserts):
+            started = time.perf_counter()
+            table.insert(dict(document))
+            samples.append((time.perf_counter() - started, 1))
+
+        started = time.perf_counter()
+        table.flush()
+        flushed = time.perf_counter() - started
+
+        results[f"insert_{name}"] = summarize(samples)
+        results[f"insert_{name}"]["flush_ms"] = round(1000 * flushed, 4)
+
+    return results
+
+
+async def run_all(
+    repeat: int, inserts: int, only: Optional[List[str]] = None
+) -> Coroutine[Any, Any, Awaitable[Dict[str, dict]]]:
+    """
+    Run all benchmark groups. The Playwright group is reported as skipped
+    if no browser can be launched; any other failure fails the run.
+
+    Parameters
+    ----------
+    repeat : int
+        Calls per scraping and parsing benchmark.
+    inserts : int
+        Inserts per table in the storage benchmarks.
+    only : Optional[List[str]], optional
+        Name prefixes of the benchmarks to keep, by default None
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[Dict[str, dict]]]
+        Results, by benchmark name.
+    """
+
+    groups: Dict[
+        str, Tuple[List[str], Callable[[], Awaitable[dict]]]
+    ] = {
+        "playwright": (
+            [
+                "get_pokedex_urls",
+                "get_pokedex_cards",
+                "get_pokemon_details",
+            ],
+            lambda: bench_playwright(repeat),
+        ),
+        "http": (
+            [
+                "http_get_pokedex_urls",
+                "http_get_pokedex_cards",
+                "http_get_pokemon_details",
+            ],
+            lambda: bench_http(repeat),
+        ),
+        "parsing": (
+            ["parse_html_detail", "parse_pokemon"],
+            lambda: bench_parsing(repeat),
+        ),
+        "storage": (
+            [
+                f"insert_{name}"
+                for name in [
+                    "pokedex",
+                    "generations",
+                    "cards_img",
+                    "cards_data",
+                    "pokemon",
+                ]
+            ],
+            lambda: bench_storage(inserts),
+        ),
+    }
+
+    def selected(name: str) -> bool:
+        return not only or any(
+            name.startswith(prefix) for prefix in only
+        )
+
+    results: Dict[str, dict] = dict()
+
+    try:
+        for names, group in groups.values():
+            if not any(selected(name) for name in names):
+                continue
+
+            try:
+                measured = await group()
+            except BrowserUnavailable as e:
+                reason = f"{type(e).__name__}: {e}"
+                measured = {
+                    name: dict(skipped=reason) for name in names
+                }
+
+            results.update(
+                {
+                    name: result
+                    for name, result in measured.items()
+                    if selected(name)
+                }
+            )
+    finally:
+        # Close the storage while its temporary directory still exists
+        db.close()
+        output.close()
+
+    return results
+
+
+def report(results: Dict[str, dict], path: Path) -> None:
+    """
+    Print the results as a table.
+
+    Parameters
+    ----------
+    results : Dict[str, dict]
+        Results, by benchmark name.
+    path : Path
+        Path of the results file.
+    """
+
+    table = Table(title="Benchmarks")
+
+    for column in [
+        "Benchmark",
+        "Pages/s",
+        "p50 (ms)",
+        "p95 (ms)",
+        "Calls",
+    ]:
+        table.add_column(column)
+
+    for name, result in results.items():
+        if "skipped" in result:
+            table.add_row(name, "skipped", "-", "-", "-")
+
+            continue
+
+        table.add_row(
+            name,
+            f"{result['pages_per_sec']:,.1f}",
+            f"{result['latency_ms']['p50']:.3f}",
+            f"{result['latency_ms']['p95']:.3f}",
+            str(result["calls"]),
+        )
+
+    console = Console()
+    console.print(table)
+    console.print(f"Results written to '{path}'.")
@@ -1,7 +1,16 @@
 import asyncio
 
+from rich.traceback import install
+
+from .src.environ import CONSOLE, create_env
 from .src.utils import entrypoint
 
 
 def run() -> None:
+    # Rich console traceback hook
+    install(console=CONSOLE, indent_guides=True)
+
+    # Create/assert folder structure
+    create_env()
+
     asyncio.run(entrypoint())
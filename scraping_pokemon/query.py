@@ -1,13 +1,301 @@
-from .src.database.db import db
-import pandas as pd
+import argparse
+from functools import cache
+from typing import TYPE_CHECKING, Dict, List, Optional
 
+from .src.database import db
+from .src.database.index import (
+    GENERATIONS,
+    STATS,
+    PokemonIndex,
+    generation_bounds,
+)
 
-def run() -> None:
-    res = db.table("pokemon").all()
-    res_cards = db.table("cards_img").all()
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+@cache
+def pokemon_index() -> PokemonIndex:
+    """
+    Index over the Pokémon table, built once per process on first use.
+
+    Returns
+    -------
+    PokemonIndex
+        Pokémon index.
+    """
+
+    return PokemonIndex(db.table_pokemon)
+
+
+def query_columns(
+    types: Optional[List[str]] = None,
+    generation: Optional[int] = None,
+    name_prefix: Optional[str] = None,
+    min_stats: Optional[Dict[str, int]] = None,
+    max_stats: Optional[Dict[str, int]] = None,
+    fields: Optional[List[str]] = None,
+    sort: str = "national_no",
+    descending: bool = False,
+    limit: Optional[int] = None,
+) -> "pa.Table":
+    """
+    Query the columnar export of the Pokémon table. The export is
+    memory-mapped, so only the filtered, sorted and selected columns are
+    read from disk.
+
+    Parameters
+    ----------
+    types : Optional[List[str]], optional
+        Types the Pokémon must all have, by default None
+    generation : Optional[int], optional
+        Generation of the Pokémon, by default None
+    name_prefix : Optional[str], optional
+        Case-insensitive prefix of the name, by default None
+    min_stats : Optional[Dict[str, int]], optional
+        Inclusive lower bounds of base stats, by default None
+    max_stats : Optional[Dict[str, int]], optional
+        Inclusive upper bounds of base stats, by default None
+    fields : Optional[List[str]], optional
+        Columns to return, by default None, which returns all columns
+    sort : str, optional
+        Field to sort by: 'national_no', 'name', 'generation' or a base
+        stat, by default "national_no"
+    descending : bool, optional
+        Whether or not to sort in descending order, by default False
+    limit : Optional[int], optional
+        Maximum amount of rows to return, by default None
+
+    Returns
+    -------
+    pa.Table
+        Matching rows.
+
+    Raises
+    ------
+    ValueError
+        If the generation does not exist.
+    """
+
+    # Imported here, so the index queries start faster
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    from .src.export import read_table
+
+    table = read_table("pokemon")
+    mask = pa.array([True] * table.num_rows)
+
+    for _type in types or []:
+        column = table["types"]
+        hits = pc.equal(
+            pc.utf8_lower(pc.list_flatten(column)), _type.lower()
+        )
+        rows = pc.unique(
+            pc.filter(pc.list_parent_indices(column), hits)
+        )
+
+        mask = pc.and_(
+            mask, pc.is_in(pa.array(range(table.num_rows)), rows)
+        )
+
+    if generation is not None:
+        lower, upper = generation_bounds(generation)
+
+        mask = pc.and_(
+            mask,
+            pc.and_(
+                pc.greater(table["national_no"], lower),
+                pc.less_equal(table["national_no"], upper),
+            ),
+        )
+
+    if name_prefix:
+        mask = pc.and_(
+            mask,
+            pc.starts_with(
+                pc.utf8_lower(table["name"]), name_prefix.lower()
+            ),
+        )
+
+    for stat, value in (min_stats or dict()).items():
+        mask = pc.and_(
+            mask, pc.greater_equal(table[f"{stat}_base"], value)
+        )
+
+    for stat, value in (max_stats or dict()).items():
+        mask = pc.and_(
+            mask, pc.less_equal(table[f"{stat}_base"], value)
+        )
+
+    column = dict(generation="national_no").get(sort, sort)
+    column = f"{column}_base" if column in STATS else column
+
+    table = table.filter(mask).sort_by(
+        [(column, "descending" if descending else "ascending")]
+    )
+
+    if limit is not None:
+        table = table.slice(0, limit)
+
+    return table.select(fields) if fields else table
 
-    print(len(res))
-    print(pd.json_normalize(res).head(25))
 
-    print(len(res_cards))
-    print(pd.json_normalize(res_cards).head(25))
+def parse_thresholds(thresholds: List[str]) -> Dict[str, int]:
+    """
+    Parse base stat thresholds, e.g. 'attack=100'.
+
+    Parameters
+    ----------
+    thresholds : List[str]
+        Thresholds formatted as '<stat>=<value>'.
+
+    Returns
+    -------
+    Dict[str, int]
+        Threshold value per base stat.
+    """
+
+    parsed = dict()
+
+    for threshold in thresholds:
+        stat, _, value = threshold.partition("=")
+
+        if stat not in STATS or not value.isdigit():
+            raise argparse.ArgumentTypeError(
+                f"Invalid threshold '{threshold}'; expected <stat>=<value> with a stat in {', '.join(STATS)}."
+            )
+
+        parsed[stat] = int(value)
+
+    return parsed
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse the command line arguments of the query entry point.
+
+    Parameters
+    ----------
+    argv : Optional[List[str]], optional
+        Arguments to parse, by default None, which parses sys.argv
+
+    Returns
+    -------
+    argparse.Namespace
+        Parsed arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="query", description="Query the scraped Pokémon."
+    )
+    parser.add_argument(
+        "--type",
+        dest="types",
+        action="append",
+        default=[],
+        help="type the Pokémon must have; repeat to require several",
+    )
+    parser.add_argument(
+        "--generation",
+        type=int,
+        choices=range(1, len(GENERATIONS) + 1),
+        metavar=f"1-{len(GENERATIONS)}",
+        help="generation of the Pokémon",
+    )
+    parser.add_argument(
+        "--name", dest="name_prefix", help="prefix of the name"
+    )
+    parser.add_argument(
+        "--min",
+        dest="min_stats",
+        nargs="+",
+        default=[],
+        metavar="STAT=VALUE",
+        help="inclusive lower bounds of base stats",
+    )
+    parser.add_argument(
+        "--max",
+        dest="max_stats",
+        nargs="+",
+        default=[],
+        metavar="STAT=VALUE",
+        help="inclusive upper bounds of base stats",
+    )
+    parser.add_argument(
+        "--fields",
+        nargs="+",
+        help="dotted paths of the fields to show, e.g. base_stats.hp.base; column names with --arrow, e.g. hp_base",
+    )
+    parser.add_argument(
+        "--sort",
+        default="national_no",
+        choices=["national_no", "name", "generation", *STATS],
+        help="field to sort by",
+    )
+    parser.add_argument(
+        "--desc",
+        action="store_true",
+        help="sort in descending order",
+    )
+    parser.add_argument(
+        "--arrow",
+        action="store_true",
+        help="query the memory-mapped columnar export instead of the database",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=25,
+        help="maximum amount of results; 0 for all",
+    )
+
+    args = parser.parse_args(argv)
+
+    try:
+        args.min_stats = parse_thresholds(args.min_stats)
+        args.max_stats = parse_thresholds(args.max_stats)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    return args
+
+
+def run(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+
+    if args.arrow:
+        res = query_columns(
+            types=args.types,
+            generation=args.generation,
+            name_prefix=args.name_prefix,
+            min_stats=args.min_stats,
+            max_stats=args.max_stats,
+            fields=args.fields,
+            sort=args.sort,
+            descending=args.desc,
+            limit=args.limit or None,
+        )
+
+        print(res.num_rows)
+        print(res.to_pandas())
+
+        return
+
+    res = pokemon_index().query(
+        types=args.types,
+        generation=args.generation,
+        name_prefix=args.name_prefix,
+        min_stats=args.min_stats,
+        max_stats=args.max_stats,
+        fields=args.fields,
+        sort=args.sort,
+        descending=args.desc,
+        limit=args.limit or None,
+    )
+
+    # Imported here, since it takes longer than the query itself
+    import pandas as pd
+
+    print(len(res))
+    print(pd.json_normalize(res))
@@ -0,0 +1,252 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Coroutine, Optional, Tuple
+
+from playwright.async_api import Browser, BrowserContext, Playwright
+
+import scraping_pokemon.src.environ as environ
+
+
+def read_endpoint(
+    path: Path = environ.BROWSER_ENDPOINT_FILE,
+) -> Optional[str]:
+    """
+    Read the websocket endpoint of the running browser server.
+
+    Parameters
+    ----------
+    path : Path, optional
+        Endpoint file written by the server, by default
+        BROWSER_ENDPOINT_FILE
+
+    Returns
+    -------
+    Optional[str]
+        Websocket endpoint, or None if no server is running.
+    """
+
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))["endpoint"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+async def launch_browser(
+    backend: Playwright,
+) -> Coroutine[Any, Any, Awaitable[Tuple[Browser, bool]]]:
+    """
+    Get a Firefox browser for a run. With BROWSER_SERVER enabled, the run
+    connects to the long-running browser server, skipping browser startup;
+    if no server is reachable, a browser is launched as usual.
+
+    Closing a connected browser only closes the contexts of this run and
+    disconnects; the server keeps running.
+
+    Parameters
+    ----------
+    backend : Playwright
+        Playwright Async context
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[Tuple[Browser, bool]]]
+        Browser, and whether it is connected to the browser server.
+    """
+
+    if environ.BROWSER_SERVER:
+        endpoint = read_endpoint()
+
+        if endpoint is not None:
+            try:
+                browser = await backend.firefox.connect(endpoint)
+
+                # Log
+                environ.CONSOLE.log(
+                    f"Connected to browser server: '{endpoint}'"
+                )
+
+                return browser, True
+            except Exception as e:
+                # Log
+                environ.CONSOLE.log(
+                    f"[bold red]Browser server unreachable[/bold red] ({e!r}); launching a browser.",
+                    level="warning",
+                )
+        else:
+            # Log
+            environ.CONSOLE.log(
+                "[bold red]No browser server running[/bold red]; launching a browser.",
+                level="warning",
+            )
+
+    return await backend.firefox.launch(**environ.FIREFOX_PARAMS), False
+
+
+async def new_context(
+    browser: Browser,
+) -> Coroutine[Any, Any, Awaitable[BrowserContext]]:
+    """
+    Create a browser context. With BROWSER_SERVER enabled, the cookies and
+    local storage that the previous run persisted to STORAGE_STATE are
+    restored, so runs start warm.
+
+    Parameters
+    ----------
+    browser : Browser
+        Playwright Browser instance.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[BrowserContext]]
+        Browser context.
+    """
+
+    if environ.BROWSER_SERVER and environ.STORAGE_STATE.is_file():
+        try:
+            return await browser.new_context(
+                storage_state=environ.STORAGE_STATE
+            )
+        except Exception as e:
+            # Log
+            environ.CONSOLE.log(
+                f"[bold red]Discarded storage state[/bold red] ({e!r}).",
+                level="warning",
+            )
+
+    return await browser.new_context()
+
+
+async def save_state(
+    context: BrowserContext,
+) -> Coroutine[Any, Any, Awaitable[None]]:
+    """
+    Persist the cookies and local storage of a context to STORAGE_STATE,
+    for the next run.
+
+    Parameters
+    ----------
+    context : BrowserContext
+        Playwright BrowserContext instance.
+    """
+
+    environ.STORAGE_STATE.parent.mkdir(parents=True, exist_ok=True)
+
+    await context.storage_state(path=environ.STORAGE_STATE)
+
+    # Log
+    environ.CONSOLE.log(
+        f"Persisted storage state: '{environ.STORAGE_STATE}'"
+    )
+
+
+def _stop(process: subprocess.Popen) -> None:
+    """
+    Stop the browser server, including the Node.js driver and browser it
+    spawned.
+
+    Parameters
+    ----------
+    process : subprocess.Popen
+        Server process.
+    """
+
+    if process.poll() is not None:
+        return
+
+    if os.name == "posix":
+        os.killpg(process.pid, signal.SIGTERM)
+    else:
+        process.terminate()
+
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def run() -> None:
+    """
+    Run a Firefox browser server until interrupted. Its websocket endpoint
+    is written to BROWSER_ENDPOINT_FILE, where scrape runs with
+    BROWSER_SERVER enabled pick it up. The server is launched through the
+    Playwright driver, since the Python API cannot launch one.
+    """
+
+    environ.BROWSER_ENDPOINT_FILE.parent.mkdir(
+        parents=True, exist_ok=True
+    )
+
+    config = dict(
+        headless=environ.FIREFOX_PARAMS.get("headless", True),
+        port=environ.BROWSER_SERVER_PORT,
+    )
+
+    with tempfile.NamedTemporaryFile(
+        "w", suffix=".json", delete=False
+    ) as f:
+        json.dump(config, f)
+
+    # Own process group, so the driver and browser are stopped with it
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "playwright",
+            "launch-server",
+            "--browser",
+            "firefox",
+            "--config",
+            f.name,
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+        start_new_session=os.name == "posix",
+    )
+
+    try:
+        # The driver prints the endpoint once the browser is up
+        endpoint = process.stdout.readline().strip()
+
+        if not endpoint.startswith("ws"):
+            # Log
+            environ.CONSOLE.log(
+                f"[bold red]Browser server failed to start[/bold red] (exit code {process.wait()}).",
+                level="error",
+            )
+
+            sys.exit(1)
+
+        environ.BROWSER_ENDPOINT_FILE.write_text(
+            json.dumps(
+                dict(
+                    endpoint=endpoint,
+                    pid=process.pid,
+                    started_at=datetime.now().isoformat(),
+                )
+            ),
+            encoding="utf-8",
+        )
+
+        # Log
+        environ.CONSOLE.log(
+            f"Browser server listening on: '{endpoint}'"
+        )
+        environ.CONSOLE.log(">> Press CTRL-C to stop")
+
+        process.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _stop(process)
+
+        environ.BROWSER_ENDPOINT_FILE.unlink(missing_ok=True)
+        Path(f.name).unlink(missing_ok=True)
+
+        # Log
+        environ.CONSOLE.log("Browser server stopped.")
@@ -0,0 +1,423 @@
+import sqlite3
+import time
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Awaitable, Coroutine, Dict, Mapping, Optional
+from uuid import uuid4
+
+import aiofiles
+import aiohttp
+
+import scraping_pokemon.src.environ as environ
+from scraping_pokemon.src.ratelimit import LIMITER
+from scraping_pokemon.src.types import CacheEntry
+
+
+class CacheMiss(LookupError):
+    """
+    Raised when a URL is not cached while the cache is in offline mode.
+    """
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk HTTP response cache. Bodies are stored once
+    under their SHA-256 digest, and indexed by URL in a SQLite database
+    together with their ETag and Last-Modified validators.
+
+    Entries younger than max_age are served without a request; older
+    entries are revalidated with a conditional request. In offline mode,
+    every cached entry is served as-is and misses raise CacheMiss. The least
+    recently used entries are evicted once the bodies exceed max_bytes.
+
+    Parameters
+    ----------
+    root : Path, optional
+        Cache directory, by default CACHE_DIR
+    max_age : int, optional
+        Seconds an entry is served without revalidation, by default
+        CACHE_MAX_AGE
+    max_bytes : int, optional
+        Maximum total size of the stored bodies, by default CACHE_MAX_BYTES
+    offline : bool, optional
+        Whether or not to serve from the cache only, by default
+        CACHE_OFFLINE
+    """
+
+    def __init__(
+        self,
+        root: Path = environ.CACHE_DIR,
+        max_age: int = environ.CACHE_MAX_AGE,
+        max_bytes: int = environ.CACHE_MAX_BYTES,
+        offline: bool = environ.CACHE_OFFLINE,
+    ) -> None:
+        self.root = Path(root)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.offline = offline
+
+        # Statistics
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """
+        Connection to the cache index, opened on first use.
+        """
+
+        if self._conn is None:
+            (self.root / "objects").mkdir(parents=True, exist_ok=True)
+            (self.root / "tmp").mkdir(parents=True, exist_ok=True)
+
+            self._conn = sqlite3.connect(
+                self.root / "index.db", isolation_level=None
+            )
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    url TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    content_type TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_entries_accessed_at ON entries (accessed_at)"
+            )
+
+        return self._conn
+
+    def path(self, digest: str) -> Path:
+        """
+        Path of a stored body.
+
+        Parameters
+        ----------
+        digest : str
+            SHA-256 digest of the body.
+
+        Returns
+        -------
+        Path
+            Path of the body on disk.
+        """
+
+        return self.root / "objects" / digest[:2] / digest
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """
+        Look up the cache entry of a URL.
+
+        Parameters
+        ----------
+        url : str
+            URL of the response.
+
+        Returns
+        -------
+        Optional[CacheEntry]
+            Cache entry, or None if the URL is not cached.
+        """
+
+        row = self.conn.execute(
+            "SELECT * FROM entries WHERE url = ?", (url,)
+        ).fetchone()
+
+        if row is None or not self.path(row["digest"]).exists():
+            return None
+
+        return CacheEntry(**dict(row))
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """
+        Whether or not an entry can be served without revalidation.
+
+        Parameters
+        ----------
+        entry : CacheEntry
+            Cache entry.
+
+        Returns
+        -------
+        bool
+            True when offline, or when the entry is younger than max_age.
+        """
+
+        return (
+            self.offline
+            or time.time() - entry["stored_at"] < self.max_age
+        )
+
+    def conditional_headers(
+        self, entry: Optional[CacheEntry]
+    ) -> Dict[str, str]:
+        """
+        Compile the headers for revalidating an entry.
+
+        Parameters
+        ----------
+        entry : Optional[CacheEntry]
+            Cache entry, if any.
+
+        Returns
+        -------
+        Dict[str, str]
+            'If-None-Match' and 'If-Modified-Since' headers, where
+            available.
+        """
+
+        headers: Dict[str, str] = dict()
+
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        return headers
+
+    def hit(self, entry: CacheEntry, revalidated: bool = False) -> Path:
+        """
+        Mark an entry as used, and as fresh if it has been revalidated.
+
+        Parameters
+        ----------
+        entry : CacheEntry
+            Cache entry.
+        revalidated : bool, optional
+            Whether or not the server confirmed the entry, by default False
+
+        Returns
+        -------
+        Path
+            Path of the body on disk.
+        """
+
+        now = time.time()
+
+        if revalidated:
+            self.revalidated += 1
+            self.conn.execute(
+                "UPDATE entries SET stored_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, entry["url"]),
+            )
+        else:
+            self.hits += 1
+            self.conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE url = ?",
+                (now, entry["url"]),
+            )
+
+        return self.path(entry["digest"])
+
+    async def store(
+        self, url: str, body: bytes, headers: Mapping[str, str]
+    ) -> Coroutine[Any, Any, Awaitable[Path]]:
+        """
+        Store a complete response body.
+
+        Parameters
+        ----------
+        url : str
+            URL of the response.
+        body : bytes
+            Response body.
+        headers : Mapping[str, str]
+            Response headers.
+
+        Returns
+        -------
+        Coroutine[Any, Any, Awaitable[Path]]
+            Path of the body on disk.
+        """
+
+        tmp = self.root / "tmp" / uuid4().hex
+
+        async with aiofiles.open(tmp, "wb") as f:
+            await f.write(body)
+
+        return self._commit(url, tmp, sha256(body).hexdigest(), headers)
+
+    async def fetch(
+        self, session: aiohttp.ClientSession, url: str
+    ) -> Coroutine[Any, Any, Awaitable[Optional[Path]]]:
+        """
+        Fetch a URL through the cache. Fresh entries are served from disk,
+        stale entries are revalidated, and new responses are streamed into
+        the cache in chunks of IMG_CHUNK_SIZE bytes. Requests wait for the
+        rate limiter of their host; cache hits do not.
+
+        Parameters
+        ----------
+        session : aiohttp.ClientSession
+            Session to fetch with.
+        url : str
+            URL to fetch.
+
+        Returns
+        -------
+        Coroutine[Any, Any, Awaitable[Optional[Path]]]
+            Path of the body on disk, or None if the server did not respond
+            with status 200.
+
+        Raises
+        ------
+        CacheMiss
+            If the URL is not cached while in offline mode.
+        """
+
+        entry = self.lookup(url)
+
+        if entry and self.is_fresh(entry):
+            return self.hit(entry)
+
+        if self.offline:
+            raise CacheMiss(url)
+
+        async with LIMITER.slot(url) as permit, session.get(
+            url, headers=self.conditional_headers(entry)
+        ) as res:
+            permit.record(res.status, res.headers)
+
+            if res.status == 304 and entry:
+                return self.hit(entry, revalidated=True)
+
+            if res.status != 200:
+                return None
+
+            # Stream body to disk, hashing along the way
+            tmp = self.root / "tmp" / uuid4().hex
+            digest = sha256()
+
+            async with aiofiles.open(tmp, "wb") as f:
+                async for chunk in res.content.iter_chunked(
+                    environ.IMG_CHUNK_SIZE
+                ):
+                    digest.update(chunk)
+                    await f.write(chunk)
+
+            return self._commit(
+                url, tmp, digest.hexdigest(), res.headers
+            )
+
+    def _commit(
+        self,
+        url: str,
+        tmp: Path,
+        digest: str,
+        headers: Mapping[str, str],
+    ) -> Path:
+        """
+        Move a written body into the object store and index it.
+
+        Parameters
+        ----------
+        url : str
+            URL of the response.
+        tmp : Path
+            Temporary file containing the body.
+        digest : str
+            SHA-256 digest of the body.
+        headers : Mapping[str, str]
+            Response headers.
+
+        Returns
+        -------
+        Path
+            Path of the body on disk.
+        """
+
+        self.misses += 1
+
+        path = self.path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if path.exists():
+            tmp.unlink()
+        else:
+            tmp.replace(path)
+
+        now = time.time()
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                url,
+                digest,
+                path.stat().st_size,
+                headers.get("content-type"),
+                headers.get("etag"),
+                headers.get("last-modified"),
+                now,
+                now,
+            ),
+        )
+
+        self.evict(keep=url)
+
+        return path
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """
+        Evict the least recently used entries until the stored bodies fit
+        within max_bytes. Bodies are removed once no entry refers to them.
+
+        Parameters
+        ----------
+        keep : Optional[str], optional
+            URL of an entry that must not be evicted, by default None
+        """
+
+        while True:
+            (total,) = self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)"
+            ).fetchone()
+
+            if total <= self.max_bytes:
+                return
+
+            row = self.conn.execute(
+                "SELECT url, digest FROM entries WHERE url != ? ORDER BY accessed_at LIMIT 1",
+                (keep or "",),
+            ).fetchone()
+
+            if row is None:
+                return
+
+            self.conn.execute(
+                "DELETE FROM entries WHERE url = ?", (row["url"],)
+            )
+
+            (refs,) = self.conn.execute(
+                "SELECT COUNT(*) FROM entries WHERE digest = ?",
+                (row["digest"],),
+            ).fetchone()
+
+            if not refs:
+                self.path(row["digest"]).unlink(missing_ok=True)
+
+    def report(self) -> None:
+        """
+        Log the cache hits, revalidations and misses of this run.
+        """
+
+        # Log
+        environ.CONSOLE.log(
+            f"Response cache: [b]{self.hits}[/b] hits, [b]{self.revalidated}[/b] revalidated, "
+            f"[b]{self.misses}[/b] misses."
+        )
+
+
+# Shared cache for all fetches of a run
+RESPONSE_CACHE = ResponseCache()
@@ -0,0 +1,162 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from ..environ import CONSOLE, RESUME, TRUNCATE
+
+
+class CrawlJournal:
+    """
+    Append-only journal of completed crawl work, stored as JSON lines next
+    to the NOSQL database. Every completed unit of work is flushed to disk
+    as soon as it is done, so a restarted run can resume where the previous
+    one stopped.
+
+    The journal records:
+
+    - 'pokedex_index': the scraped Pokédex URLs.
+    - 'generations': the scraped generation URLs.
+    - 'pokedex_page': a Pokédex page URL with its card image data and card
+      data.
+    - 'details': a Pokémon detail page URL with the key of its record.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the journal file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+        self.pokedex_index: Optional[List[str]] = None
+        self.generations: Optional[List[str]] = None
+        self.pokedex_pages: Dict[
+            str, Tuple[List[dict], List[dict]]
+        ] = dict()
+        self.details: Dict[str, str] = dict()
+
+        self._file: Optional[TextIO] = None
+
+    def load(self) -> None:
+        """
+        Load the completed work from the journal file. Truncated trailing
+        lines, left by an interrupted run, are ignored.
+        """
+
+        if not self.path.exists():
+            return
+
+        with self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                stage = entry["stage"]
+
+                if stage == "pokedex_index":
+                    self.pokedex_index = entry["urls"]
+                elif stage == "generations":
+                    self.generations = entry["urls"]
+                elif stage == "pokedex_page":
+                    self.pokedex_pages[entry["url"]] = (
+                        entry["cards_img"],
+                        entry["cards_data"],
+                    )
+                elif stage == "details":
+                    self.details[entry["url"]] = entry["key"]
+
+        # Log
+        CONSOLE.log(
+            f"Resuming crawl: [b]{len(self.pokedex_pages)}[/b] Pokédex pages and "
+            f"[b]{len(self.details)}[/b] detail pages completed."
+        )
+
+    def record(self, stage: str, **payload) -> None:
+        """
+        Append a completed unit of work to the journal.
+
+        Parameters
+        ----------
+        stage : str
+            Crawl stage of the work.
+        **payload
+            Serializable details of the work.
+        """
+
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("a", encoding="utf-8")
+
+            # Terminate a line truncated by an interrupted run
+            if self.path.stat().st_size:
+                with self.path.open("rb") as f:
+                    f.seek(-1, 2)
+
+                    if f.read(1) != b"\n":
+                        self._file.write("\n")
+
+        self._file.write(
+            json.dumps(dict(stage=stage, **payload), ensure_ascii=False)
+            + "\n"
+        )
+        self._file.flush()
+
+    def reset(self) -> None:
+        """
+        Discard the journal and all completed work.
+        """
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        self.path.unlink(missing_ok=True)
+
+        self.pokedex_index = None
+        self.generations = None
+        self.pokedex_pages.clear()
+        self.details.clear()
+
+
+def open_journal() -> None:
+    """
+    Open the crawl journal, and reset it if TRUNCATE is enabled or load it
+    if RESUME is enabled. Called on first access of the journal, so
+    importing this module does not read or remove the journal file.
+    """
+
+    global journal, _opened
+
+    if _opened:
+        return
+
+    # Crawl state journal
+    journal = CrawlJournal(Path("./data/db/crawl_state.jsonl"))
+
+    if TRUNCATE:
+        journal.reset()
+    elif RESUME:
+        journal.load()
+
+    _opened = True
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Open the crawl journal on first access.
+    """
+
+    if name == "journal":
+        open_journal()
+
+        return journal
+
+    raise AttributeError(
+        f"module {__name__!r} has no attribute {name!r}"
+    )
+
+
+_opened = False
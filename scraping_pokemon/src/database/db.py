@@ -1,32 +1,182 @@
+import atexit
 from pathlib import Path
+from typing import Any, List
 
-from BetterJSONStorage import BetterJSONStorage
-from tinydb import TinyDB
+from .. import output
+from ..environ import CONSOLE, NDJSON_OUTPUT, STORAGE_BACKEND, TRUNCATE
+from ..types import DocumentTable
+from .sqlite import POKEMON_INDEXES, SQLiteDatabase, pokemon_types
+from .writer import BufferedTable
 
-from ..environ import CONSOLE, TRUNCATE
+# TinyDB file of the former default backend
+TINYDB_PATH: Path = Path("./data/db/nosql.db")
 
-# NOSQL DB
-db = TinyDB(
-    Path("./data/db/nosql.db"),
-    access_mode="r+",
-    storage=BetterJSONStorage,
-)
+# Database and tables, opened on first access by 'open_db'
+_LAZY: List[str] = [
+    "db",
+    "table_pokedex",
+    "table_generations",
+    "table_cards_data",
+    "table_cards_img",
+    "table_pokemon",
+    "TABLES",
+    "table_dead_letter",
+]
 
-# Document tables
-table_pokedex = db.table("pokedex")
-table_generations = db.table("generations")
-table_cards_data = db.table("cards_data")
-table_cards_img = db.table("cards_img")
-table_pokemon = db.table("pokemon")
 
-if TRUNCATE:
-    CONSOLE.log("[bold red]Truncating tables...")
+def _buffered(table: DocumentTable, name: str) -> BufferedTable:
+    """
+    Wrap a table in a write-behind buffer, streaming its inserts to the
+    NDJSON stream of the same name if NDJSON_OUTPUT is enabled.
+    """
 
-    for _table in [
+    return BufferedTable(
+        table, name, sink=output.stream(name) if NDJSON_OUTPUT else None
+    )
+
+
+def _import_tinydb(target: SQLiteDatabase, path: Path) -> None:
+    """
+    Import the tables of a TinyDB file into a new SQLite database, so
+    switching the storage backend keeps the data scraped so far.
+
+    Parameters
+    ----------
+    target : SQLiteDatabase
+        Database to import the tables into.
+    path : Path
+        Path of the TinyDB file.
+    """
+
+    from BetterJSONStorage import BetterJSONStorage
+    from tinydb import TinyDB
+
+    source = TinyDB(path, access_mode="r", storage=BetterJSONStorage)
+
+    try:
+        for name in sorted(source.tables()):
+            documents = source.table(name).all()
+            target.table(name).insert_multiple(documents)
+
+            # Log
+            CONSOLE.log(
+                f"Imported {len(documents)} records of table '{name}' from {path}",
+                level="info",
+            )
+    finally:
+        source.close()
+
+
+def open_db() -> None:
+    """
+    Open the database and its tables, and truncate them if TRUNCATE is
+    enabled. Called on first access of any of them, so importing this
+    module, e.g. to query, does not open or load the database.
+    """
+
+    global db, TABLES, table_dead_letter, _opened
+    global table_pokedex, table_generations, table_cards_data
+    global table_cards_img, table_pokemon
+
+    if _opened:
+        return
+
+    if STORAGE_BACKEND == "sqlite":
+        # SQLite document DB; imports the TinyDB file on first open
+        path = Path("./data/db/documents.sqlite")
+        legacy = not path.exists() and TINYDB_PATH.is_file()
+        db = SQLiteDatabase(path)
+
+        _table_pokemon = db.table(
+            "pokemon", indexes=POKEMON_INDEXES, tags=pokemon_types
+        )
+
+        if legacy and not TRUNCATE:
+            _import_tinydb(db, TINYDB_PATH)
+    else:
+        from BetterJSONStorage import BetterJSONStorage
+        from tinydb import TinyDB
+
+        # NOSQL DB
+        db = TinyDB(
+            TINYDB_PATH,
+            access_mode="r+",
+            storage=BetterJSONStorage,
+        )
+
+        _table_pokemon = db.table("pokemon")
+
+    # Document tables; inserts are buffered and written in batches
+    table_pokedex = _buffered(db.table("pokedex"), "pokedex")
+    table_generations = _buffered(
+        db.table("generations"), "generations"
+    )
+    table_cards_data = _buffered(db.table("cards_data"), "cards_data")
+    table_cards_img = _buffered(db.table("cards_img"), "cards_img")
+    table_pokemon = _buffered(_table_pokemon, "pokemon")
+
+    TABLES = [
         table_pokedex,
         table_generations,
         table_cards_data,
         table_cards_img,
         table_pokemon,
-    ]:
-        _table.truncate()
+    ]
+
+    # Pages that kept failing, with their exception and HTML snapshot
+    table_dead_letter = db.table("dead_letter")
+
+    _opened = True
+    atexit.register(close)
+
+    if TRUNCATE:
+        CONSOLE.log("[bold red]Truncating tables...")
+
+        for _table in TABLES + [table_dead_letter]:
+            _table.truncate()
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Open the database on first access of the database or a table.
+    """
+
+    if name in _LAZY:
+        open_db()
+
+        return globals()[name]
+
+    raise AttributeError(
+        f"module {__name__!r} has no attribute {name!r}"
+    )
+
+
+_opened = False
+_closed = False
+
+
+def flush() -> None:
+    """
+    Write the buffered records of all document tables, if opened.
+    """
+
+    if not _opened:
+        return
+
+    for table in TABLES:
+        table.flush()
+
+
+def close() -> None:
+    """
+    Flush all document tables and close the database, which waits for the
+    storage to be written to disk.
+    """
+
+    global _closed
+
+    if _opened and not _closed:
+        flush()
+        db.close()
+
+        _closed = True
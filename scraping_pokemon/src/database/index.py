@@ -0,0 +1,446 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from ..types import DocumentTable, IndexEntry
+
+# Base stats of a Pokémon record
+STATS: Tuple[str, ...] = (
+    "hp",
+    "attack",
+    "defense",
+    "special_attack",
+    "special_defense",
+    "speed",
+)
+
+# Last national number of every generation
+GENERATIONS: Tuple[int, ...] = (
+    151,
+    251,
+    386,
+    493,
+    649,
+    721,
+    809,
+    905,
+    1025,
+)
+
+# Fields of the index entries, as JSON paths into a Pokémon record
+INDEX_PATHS: Dict[str, str] = dict(
+    key="$.key",
+    name="$.name",
+    national_no="$.pokedex_data.national_no[0]",
+    type="$.pokedex_data.type[0]",
+    **{stat: f"$.base_stats.{stat}.base" for stat in STATS},
+)
+
+
+def generation_of(national_no: int) -> int:
+    """
+    Determine the generation that introduced a Pokémon.
+
+    Parameters
+    ----------
+    national_no : int
+        National Pokédex number of the Pokémon.
+
+    Returns
+    -------
+    int
+        Generation of the Pokémon, or 0 if unknown.
+    """
+
+    _generation = bisect_left(GENERATIONS, national_no) + 1
+
+    return _generation if 0 < national_no <= GENERATIONS[-1] else 0
+
+
+def generation_bounds(generation: int) -> Tuple[int, int]:
+    """
+    Determine the range of national numbers of a generation.
+
+    Parameters
+    ----------
+    generation : int
+        Generation, from 1 up to the amount of generations.
+
+    Returns
+    -------
+    Tuple[int, int]
+        Exclusive lower and inclusive upper bound of the national numbers.
+
+    Raises
+    ------
+    ValueError
+        If the generation does not exist.
+    """
+
+    if not 1 <= generation <= len(GENERATIONS):
+        raise ValueError(
+            f"Invalid generation {generation}; expected 1 to {len(GENERATIONS)}."
+        )
+
+    lower = GENERATIONS[generation - 2] if generation > 1 else 0
+
+    return lower, GENERATIONS[generation - 1]
+
+
+def extract(document: Mapping, path: str) -> Any:
+    """
+    Extract a field from a record by its JSON path, e.g.
+    '$.pokedex_data.national_no[0]'. The '$.' prefix is optional.
+
+    Parameters
+    ----------
+    document : Mapping
+        Record to extract from.
+    path : str
+        JSON path of the field.
+
+    Returns
+    -------
+    Any
+        Value of the field, or None if it is missing.
+    """
+
+    value: Any = document
+
+    for part in path.removeprefix("$.").split("."):
+        name, *indices = part.replace("]", "").split("[")
+        value = value.get(name) if isinstance(value, Mapping) else None
+
+        for index in indices:
+            value = (
+                value[int(index)]
+                if isinstance(value, list) and int(index) < len(value)
+                else None
+            )
+
+    return value
+
+
+def project(document: Mapping, fields: Iterable[str]) -> Dict[str, Any]:
+    """
+    Select fields from a record, by their dotted paths, e.g.
+    'base_stats.hp.base'.
+
+    Parameters
+    ----------
+    document : Mapping
+        Record to project.
+    fields : Iterable[str]
+        Dotted paths of the fields.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Selected fields, keyed by their dotted paths. Missing fields are
+        None.
+    """
+
+    return {field: extract(document, field) for field in fields}
+
+
+class PokemonIndex:
+    """
+    In-memory secondary indexes over the Pokémon table, built once from
+    the indexed fields of every record. Queries are answered from the
+    indexes, and only the matching records are read from the table.
+
+    - Types and generations map to sets of document IDs.
+    - Names and base stats are kept in sorted lists, for prefix and range
+      lookups by bisection.
+
+    Parameters
+    ----------
+    table : DocumentTable
+        Pokémon table to index. Tables that can scan selected fields, like
+        SQLiteTable, are indexed without materializing their records.
+    """
+
+    def __init__(self, table: DocumentTable) -> None:
+        self.table = table
+
+        self.entries: Dict[int, IndexEntry] = dict()
+        self.by_type: Dict[str, Set[int]] = defaultdict(set)
+        self.by_generation: Dict[int, Set[int]] = defaultdict(set)
+        self.by_name: List[Tuple[str, int]] = list()
+        self.by_stat: Dict[str, List[Tuple[int, int]]] = {
+            stat: list() for stat in STATS
+        }
+
+        for doc_id, fields in self._scan():
+            national_no = int(fields["national_no"] or 0)
+
+            entry = IndexEntry(
+                doc_id=doc_id,
+                key=fields["key"],
+                name=fields["name"],
+                national_no=national_no,
+                generation=generation_of(national_no),
+                types=(fields["type"] or "").split(),
+                stats={
+                    stat: fields[stat]
+                    for stat in STATS
+                    if fields[stat] is not None
+                },
+            )
+
+            self.entries[doc_id] = entry
+
+            for _type in entry["types"]:
+                self.by_type[_type.lower()].add(doc_id)
+
+            self.by_generation[entry["generation"]].add(doc_id)
+            self.by_name.append((entry["name"].lower(), doc_id))
+
+            for stat, value in entry["stats"].items():
+                self.by_stat[stat].append((value, doc_id))
+
+        self.by_name.sort()
+
+        for values in self.by_stat.values():
+            values.sort()
+
+    def _scan(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Iterate over the indexed fields of all records.
+
+        Yields
+        ------
+        Iterator[Tuple[int, Dict[str, Any]]]
+            Document ID and indexed fields of every record.
+        """
+
+        if hasattr(self.table, "scan"):
+            yield from self.table.scan(INDEX_PATHS)
+            return
+
+        # Tables without field scans, like TinyDB's, are read in full
+        for document in self.table.all():
+            yield document.doc_id, {
+                name: extract(document, path)
+                for name, path in INDEX_PATHS.items()
+            }
+
+    def _prefix(self, prefix: str) -> Set[int]:
+        """
+        Look up the records of which the name starts with a prefix.
+
+        Parameters
+        ----------
+        prefix : str
+            Case-insensitive name prefix.
+
+        Returns
+        -------
+        Set[int]
+            Document IDs of the matching records.
+        """
+
+        prefix = prefix.lower()
+        start = bisect_left(self.by_name, (prefix,))
+        matches = set()
+
+        for name, doc_id in self.by_name[start:]:
+            if not name.startswith(prefix):
+                break
+
+            matches.add(doc_id)
+
+        return matches
+
+    def _range(
+        self,
+        stat: str,
+        minimum: Optional[int] = None,
+        maximum: Optional[int] = None,
+    ) -> Set[int]:
+        """
+        Look up the records of which a base stat lies within a range.
+
+        Parameters
+        ----------
+        stat : str
+            Base stat to compare.
+        minimum : Optional[int], optional
+            Inclusive lower bound, by default None
+        maximum : Optional[int], optional
+            Inclusive upper bound, by default None
+
+        Returns
+        -------
+        Set[int]
+            Document IDs of the matching records.
+        """
+
+        values = self.by_stat[stat]
+
+        start = (
+            0
+            if minimum is None
+            else bisect_left(values, (minimum, float("-inf")))
+        )
+        stop = (
+            len(values)
+            if maximum is None
+            else bisect_right(values, (maximum, float("inf")))
+        )
+
+        return {doc_id for (_, doc_id) in values[start:stop]}
+
+    def match(
+        self,
+        types: Optional[Iterable[str]] = None,
+        generation: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        min_stats: Optional[Mapping[str, int]] = None,
+        max_stats: Optional[Mapping[str, int]] = None,
+    ) -> Set[int]:
+        """
+        Look up the records matching all provided filters.
+
+        Parameters
+        ----------
+        types : Optional[Iterable[str]], optional
+            Types the Pokémon must all have, by default None
+        generation : Optional[int], optional
+            Generation of the Pokémon, by default None
+        name_prefix : Optional[str], optional
+            Case-insensitive prefix of the name, by default None
+        min_stats : Optional[Mapping[str, int]], optional
+            Inclusive lower bounds of base stats, by default None
+        max_stats : Optional[Mapping[str, int]], optional
+            Inclusive upper bounds of base stats, by default None
+
+        Returns
+        -------
+        Set[int]
+            Document IDs of the matching records.
+
+        Raises
+        ------
+        ValueError
+            If the generation does not exist.
+        """
+
+        candidates: List[Set[int]] = list()
+
+        for _type in types or []:
+            candidates.append(self.by_type.get(_type.lower(), set()))
+
+        if generation is not None:
+            generation_bounds(generation)
+            candidates.append(self.by_generation.get(generation, set()))
+
+        if name_prefix:
+            candidates.append(self._prefix(name_prefix))
+
+        for stat in set(min_stats or dict()) | set(max_stats or dict()):
+            candidates.append(
+                self._range(
+                    stat,
+                    (min_stats or dict()).get(stat),
+                    (max_stats or dict()).get(stat),
+                )
+            )
+
+        if not candidates:
+            return set(self.entries)
+
+        # Intersect, starting from the most selective filter
+        candidates.sort(key=len)
+
+        return set.intersection(*candidates)
+
+    def query(
+        self,
+        types: Optional[Iterable[str]] = None,
+        generation: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        min_stats: Optional[Mapping[str, int]] = None,
+        max_stats: Optional[Mapping[str, int]] = None,
+        fields: Optional[Iterable[str]] = None,
+        sort: str = "national_no",
+        descending: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Query the Pokémon table. Filtering, sorting and limiting are
+        done on the indexes; only the resulting records are read.
+
+        Parameters
+        ----------
+        types : Optional[Iterable[str]], optional
+            Types the Pokémon must all have, by default None
+        generation : Optional[int], optional
+            Generation of the Pokémon, by default None
+        name_prefix : Optional[str], optional
+            Case-insensitive prefix of the name, by default None
+        min_stats : Optional[Mapping[str, int]], optional
+            Inclusive lower bounds of base stats, by default None
+        max_stats : Optional[Mapping[str, int]], optional
+            Inclusive upper bounds of base stats, by default None
+        fields : Optional[Iterable[str]], optional
+            Dotted paths of the fields to return, by default None, which
+            returns the full records
+        sort : str, optional
+            Field to sort by: 'national_no', 'name', 'generation' or a base
+            stat, by default "national_no"
+        descending : bool, optional
+            Whether or not to sort in descending order, by default False
+        limit : Optional[int], optional
+            Maximum amount of records to return, by default None
+
+        Returns
+        -------
+        List[dict]
+            Matching records, or their projections.
+
+        Raises
+        ------
+        ValueError
+            If the generation does not exist.
+        """
+
+        doc_ids = self.match(
+            types=types,
+            generation=generation,
+            name_prefix=name_prefix,
+            min_stats=min_stats,
+            max_stats=max_stats,
+        )
+
+        def sort_key(doc_id: int) -> Any:
+            entry = self.entries[doc_id]
+
+            if sort in STATS:
+                return entry["stats"].get(sort, -1)
+
+            return entry[sort]
+
+        ordered = sorted(doc_ids, key=sort_key, reverse=descending)[
+            :limit
+        ]
+
+        # Materialize the results
+        documents = [
+            self.table.get(doc_id=doc_id) for doc_id in ordered
+        ]
+
+        if fields is None:
+            return documents
+
+        return [project(document, fields) for document in documents]
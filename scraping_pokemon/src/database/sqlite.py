@@ -0,0 +1,371 @@
+import json
+import sqlite3
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+
+class SQLiteTable:
+    """
+    Document table stored in SQLite. Every record is stored as a JSON
+    column, next to an autoincrementing document ID. Writes are
+    incremental: inserting a batch appends its rows in a single transaction,
+    instead of rewriting the whole store.
+
+    Lookups on indexed fields use expression indexes on the JSON column.
+    Multi-valued fields, like the types of a Pokémon, are stored as tags in
+    a side table '<name>_tags', indexed by tag.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Connection to the database.
+    name : str
+        Name of the table.
+    indexes : Optional[Dict[str, str]], optional
+        Indexed fields, mapping their names to SQL expressions over the
+        'doc' column, by default None
+    tags : Optional[Callable[[Mapping], Iterable[str]]], optional
+        Function that extracts the tags of a record, by default None
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        name: str,
+        indexes: Optional[Dict[str, str]] = None,
+        tags: Optional[Callable[[Mapping], Iterable[str]]] = None,
+    ) -> None:
+        self.conn = conn
+        self.name = name
+        self.indexes = dict(indexes or dict())
+        self.tags = tags
+
+        with self.conn:
+            self.conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {name} (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    doc TEXT NOT NULL CHECK (json_valid(doc))
+                )
+                """
+            )
+
+            for field, expression in self.indexes.items():
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{name}_{field} ON {name} ({expression})"
+                )
+
+            if self.tags is not None:
+                self.conn.execute(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS {name}_tags (
+                        doc_id INTEGER NOT NULL REFERENCES {name} (id) ON DELETE CASCADE,
+                        tag TEXT NOT NULL
+                    )
+                    """
+                )
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{name}_tags_tag ON {name}_tags (tag, doc_id)"
+                )
+
+    def insert(self, document: Mapping) -> int:
+        """
+        Insert a record.
+
+        Parameters
+        ----------
+        document : Mapping
+            Record to insert.
+
+        Returns
+        -------
+        int
+            Document ID of the record.
+        """
+
+        return self.insert_multiple([document])[0]
+
+    def insert_multiple(
+        self, documents: Iterable[Mapping]
+    ) -> List[int]:
+        """
+        Insert multiple records in a single transaction.
+
+        Parameters
+        ----------
+        documents : Iterable[Mapping]
+            Records to insert.
+
+        Returns
+        -------
+        List[int]
+            Document IDs of the records.
+        """
+
+        doc_ids: List[int] = list()
+
+        with self.conn:
+            for document in documents:
+                cursor = self.conn.execute(
+                    f"INSERT INTO {self.name} (doc) VALUES (?)",
+                    (json.dumps(document, ensure_ascii=False),),
+                )
+                doc_ids.append(cursor.lastrowid)
+
+                if self.tags is not None:
+                    self.conn.executemany(
+                        f"INSERT INTO {self.name}_tags (doc_id, tag) VALUES (?, ?)",
+                        [
+                            (cursor.lastrowid, tag)
+                            for tag in self.tags(document)
+                        ],
+                    )
+
+        return doc_ids
+
+    def all(self) -> List[dict]:
+        """
+        Retrieve all records, in insertion order.
+
+        Returns
+        -------
+        List[dict]
+            All records.
+        """
+
+        return [
+            json.loads(doc)
+            for (doc,) in self.conn.execute(
+                f"SELECT doc FROM {self.name} ORDER BY id"
+            )
+        ]
+
+    def get(self, doc_id: int) -> Optional[dict]:
+        """
+        Retrieve a record by its document ID.
+
+        Parameters
+        ----------
+        doc_id : int
+            Document ID of the record.
+
+        Returns
+        -------
+        Optional[dict]
+            Record, or None if it does not exist.
+        """
+
+        row = self.conn.execute(
+            f"SELECT doc FROM {self.name} WHERE id = ?", (doc_id,)
+        ).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def scan(
+        self, paths: Dict[str, str]
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Iterate over selected fields of all records, without materializing
+        the records themselves. Fields holding objects or arrays are
+        decoded from JSON.
+
+        Parameters
+        ----------
+        paths : Dict[str, str]
+            Fields to select, mapping their names to JSON paths, e.g.
+            '$.name'.
+
+        Yields
+        ------
+        Iterator[Tuple[int, Dict[str, Any]]]
+            Document ID and selected fields of every record.
+        """
+
+        columns = ", ".join(
+            "json_extract(doc, ?), json_type(doc, ?)" for _ in paths
+        )
+        params = [path for path in paths.values() for _ in range(2)]
+
+        for row in self.conn.execute(
+            f"SELECT id, {columns} FROM {self.name} ORDER BY id", params
+        ):
+            yield row[0], {
+                name: json.loads(value)
+                if _type in ("object", "array")
+                else value
+                for name, value, _type in zip(
+                    paths, row[1::2], row[2::2]
+                )
+            }
+
+    def search(self, field: str, value: Any) -> List[dict]:
+        """
+        Retrieve the records of which an indexed field equals a value.
+
+        Parameters
+        ----------
+        field : str
+            Name of the indexed field.
+        value : Any
+            Value to match.
+
+        Returns
+        -------
+        List[dict]
+            Matching records.
+        """
+
+        return [
+            json.loads(doc)
+            for (doc,) in self.conn.execute(
+                f"SELECT doc FROM {self.name} WHERE {self.indexes[field]} = ? ORDER BY id",
+                (value,),
+            )
+        ]
+
+    def search_tag(self, tag: str) -> List[dict]:
+        """
+        Retrieve the records that have a tag.
+
+        Parameters
+        ----------
+        tag : str
+            Tag to match.
+
+        Returns
+        -------
+        List[dict]
+            Matching records.
+        """
+
+        return [
+            json.loads(doc)
+            for (doc,) in self.conn.execute(
+                f"""
+                SELECT doc FROM {self.name}
+                WHERE id IN (SELECT doc_id FROM {self.name}_tags WHERE tag = ?)
+                ORDER BY id
+                """,
+                (tag,),
+            )
+        ]
+
+    def truncate(self) -> None:
+        """
+        Remove all records.
+        """
+
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {self.name}")
+
+    def __len__(self) -> int:
+        (count,) = self.conn.execute(
+            f"SELECT COUNT(*) FROM {self.name}"
+        ).fetchone()
+
+        return count
+
+
+class SQLiteDatabase:
+    """
+    Document database stored in a single SQLite file, in WAL mode. Exposes
+    its tables like TinyDB does.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the database file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+
+        self._tables: Dict[str, SQLiteTable] = dict()
+
+    def table(
+        self,
+        name: str,
+        indexes: Optional[Dict[str, str]] = None,
+        tags: Optional[Callable[[Mapping], Iterable[str]]] = None,
+    ) -> SQLiteTable:
+        """
+        Get a table, creating it and its indexes if needed.
+
+        Parameters
+        ----------
+        name : str
+            Name of the table.
+        indexes : Optional[Dict[str, str]], optional
+            Indexed fields, mapping their names to SQL expressions over the
+            'doc' column, by default None
+        tags : Optional[Callable[[Mapping], Iterable[str]]], optional
+            Function that extracts the tags of a record, by default None
+
+        Returns
+        -------
+        SQLiteTable
+            Document table.
+        """
+
+        if name not in self._tables:
+            self._tables[name] = SQLiteTable(
+                self.conn, name, indexes=indexes, tags=tags
+            )
+
+        return self._tables[name]
+
+    def close(self) -> None:
+        """
+        Close the connection, checkpointing the write-ahead log.
+        """
+
+        self.conn.close()
+
+
+def pokemon_types(document: Mapping) -> List[str]:
+    """
+    Extract the types of a Pokémon record, e.g. 'Grass Poison' yields
+    'Grass' and 'Poison'.
+
+    Parameters
+    ----------
+    document : Mapping
+        Pokémon record.
+
+    Returns
+    -------
+    List[str]
+        Types of the Pokémon.
+    """
+
+    return [
+        _type
+        for _types in document.get("pokedex_data", dict()).get(
+            "type", []
+        )
+        for _type in _types.split()
+    ]
+
+
+# Indexed fields of the Pokémon table
+POKEMON_INDEXES: Dict[str, str] = dict(
+    key="json_extract(doc, '$.key')",
+    national_no="CAST(json_extract(doc, '$.pokedex_data.national_no[0]') AS INTEGER)",
+    name="json_extract(doc, '$.name')",
+)
@@ -0,0 +1,391 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from ..environ import (
+    LEASE_MAX_ATTEMPTS,
+    LEASE_TIMEOUT,
+    WORK_QUEUE_SHARED,
+)
+from ..types import WorkItem
+
+# Identity of this worker; unique across nodes sharing a queue
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    Durable work queue of crawl URLs, stored in a SQLite file that any
+    number of workers can share. Workers lease items instead of popping
+    them: a leased item is hidden from other workers until its lease
+    expires, and only removed from the queue once it is acknowledged. Work
+    of a worker that crashed or was stopped is therefore picked up again by
+    another worker after LEASE_TIMEOUT.
+
+    Items are unique per kind and URL, so enqueueing is idempotent and every
+    worker can seed the queue with the URLs it discovers. Delivery is
+    at-least-once; an item whose lease expired while it was being scraped
+    may be scraped twice.
+
+    By default, the file uses a write-ahead log, which relies on shared
+    memory, so all workers must run on the same host. With shared enabled,
+    the file uses a rollback journal instead, for workers on several hosts
+    sharing it over a network filesystem; SQLite then depends on the file
+    locks of that filesystem, which must be reliable.
+
+    Calls block while other workers write, up to 30 seconds; in a coroutine,
+    run them with 'asyncio.to_thread'. Calls on one instance are
+    serialized, so it can be used from several threads. Leasing needs
+    SQLite 3.35 or later.
+
+    Item states:
+
+    - 'pending': waiting for a worker, from 'available_at' on.
+    - 'leased': being worked on, until 'expires_at'.
+    - 'done': acknowledged.
+    - 'failed': given up on after LEASE_MAX_ATTEMPTS leases.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the queue file.
+    lease_timeout : float, optional
+        Seconds until a lease expires, by default LEASE_TIMEOUT
+    max_attempts : int, optional
+        Amount of leases after which an item is failed, by default
+        LEASE_MAX_ATTEMPTS
+    worker_id : str, optional
+        Identity of this worker, by default WORKER_ID
+    shared : bool, optional
+        Whether or not workers on other hosts share the file, by default
+        WORK_QUEUE_SHARED
+
+    Raises
+    ------
+    RuntimeError
+        If the SQLite library is older than 3.35, which lacks the
+        'RETURNING' clause.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        lease_timeout: float = LEASE_TIMEOUT,
+        max_attempts: int = LEASE_MAX_ATTEMPTS,
+        worker_id: str = WORKER_ID,
+        shared: bool = WORK_QUEUE_SHARED,
+    ) -> None:
+        if sqlite3.sqlite_version_info < (3, 35, 0):
+            raise RuntimeError(
+                f"The work queue needs SQLite 3.35 or later, found {sqlite3.sqlite_version}"
+            )
+
+        self.path = Path(path)
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.worker_id = worker_id
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Writers of other processes are waited for, instead of failing
+        self.conn = sqlite3.connect(
+            self.path, timeout=30.0, check_same_thread=False
+        )
+        self._lock = threading.RLock()
+
+        # WAL needs shared memory, which network filesystems lack
+        if shared:
+            self.conn.execute("PRAGMA journal_mode=DELETE")
+            self.conn.execute("PRAGMA synchronous=FULL")
+        else:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS work (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    payload TEXT NOT NULL DEFAULT '{}',
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT,
+                    expires_at REAL,
+                    available_at REAL,
+                    error TEXT,
+                    UNIQUE (kind, url)
+                )
+                """
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_work_state ON work (kind, state, id)"
+            )
+
+    def enqueue(
+        self, kind: str, url: str, payload: Optional[Dict] = None
+    ) -> bool:
+        """
+        Add an item, unless an item of the same kind and URL exists.
+
+        Parameters
+        ----------
+        kind : str
+            Kind of work, like 'pokedex' or 'details'.
+        url : str
+            URL to scrape.
+        payload : Optional[Dict], optional
+            Serializable details of the work, by default None
+
+        Returns
+        -------
+        bool
+            Whether the item was added.
+        """
+
+        return self.enqueue_many(kind, [(url, payload)]) > 0
+
+    def enqueue_many(
+        self, kind: str, items: Iterable[Tuple[str, Optional[Dict]]]
+    ) -> int:
+        """
+        Add items in a single transaction, skipping existing items.
+
+        Parameters
+        ----------
+        kind : str
+            Kind of work.
+        items : Iterable[Tuple[str, Optional[Dict]]]
+            URLs to scrape, with their payloads.
+
+        Returns
+        -------
+        int
+            Amount of items added.
+        """
+
+        with self._lock, self.conn:
+            cursor = self.conn.executemany(
+                "INSERT OR IGNORE INTO work (kind, url, payload) VALUES (?, ?, ?)",
+                [
+                    (kind, url, json.dumps(payload or dict()))
+                    for url, payload in items
+                ],
+            )
+
+        return cursor.rowcount
+
+    def lease(self, kind: str) -> Optional[WorkItem]:
+        """
+        Lease the oldest available item of a kind. Items are available when
+        they are pending and not delayed, or when their lease expired; an
+        expired item is requeued by leasing it to this worker.
+
+        Parameters
+        ----------
+        kind : str
+            Kind of work.
+
+        Returns
+        -------
+        Optional[WorkItem]
+            Leased item, or None if no item is available.
+        """
+
+        now = time.time()
+
+        # Claimed in a single statement, so no two workers get one item
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                """
+                UPDATE work
+                SET state = 'leased', owner = ?, expires_at = ?, attempts = attempts + 1
+                WHERE id = (
+                    SELECT id FROM work
+                    WHERE kind = ? AND attempts < ?
+                    AND (
+                        (state = 'pending' AND (available_at IS NULL OR available_at <= ?))
+                        OR (state = 'leased' AND expires_at < ?)
+                    )
+                    ORDER BY id
+                    LIMIT 1
+                )
+                RETURNING id, kind, url, payload, attempts, owner, expires_at
+                """,
+                (
+                    self.worker_id,
+                    now + self.lease_timeout,
+                    kind,
+                    self.max_attempts,
+                    now,
+                    now,
+                ),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return WorkItem(
+            id=row[0],
+            kind=row[1],
+            url=row[2],
+            payload=json.loads(row[3]),
+            attempts=row[4],
+            owner=row[5],
+            expires_at=row[6],
+        )
+
+    def ack(self, item: WorkItem) -> bool:
+        """
+        Mark a leased item as done.
+
+        Parameters
+        ----------
+        item : WorkItem
+            Leased item.
+
+        Returns
+        -------
+        bool
+            Whether the lease was still held; False if it expired and the
+            item was leased by another worker in the meantime.
+        """
+
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                """
+                UPDATE work SET state = 'done', expires_at = NULL
+                WHERE id = ? AND owner = ? AND state = 'leased'
+                """,
+                (item["id"], item["owner"]),
+            )
+
+        return cursor.rowcount > 0
+
+    def release(
+        self,
+        item: WorkItem,
+        error: Optional[str] = None,
+        delay: float = 0.0,
+    ) -> bool:
+        """
+        Give up a leased item, making it available again after a delay.
+        Once the item was leased LEASE_MAX_ATTEMPTS times, it is failed
+        instead.
+
+        Parameters
+        ----------
+        item : WorkItem
+            Leased item.
+        error : Optional[str], optional
+            Reason the work failed, by default None
+        delay : float, optional
+            Seconds before the item is available, by default 0.0
+
+        Returns
+        -------
+        bool
+            Whether the lease was still held.
+        """
+
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                """
+                UPDATE work
+                SET state = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END,
+                    owner = NULL, expires_at = NULL, available_at = ?, error = ?
+                WHERE id = ? AND owner = ? AND state = 'leased'
+                """,
+                (
+                    self.max_attempts,
+                    time.time() + delay,
+                    error,
+                    item["id"],
+                    item["owner"],
+                ),
+            )
+
+        return cursor.rowcount > 0
+
+    def requeue_expired(self) -> int:
+        """
+        Return items with an expired lease to the queue, and fail those
+        that were leased LEASE_MAX_ATTEMPTS times.
+
+        Returns
+        -------
+        int
+            Amount of expired items.
+        """
+
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                """
+                UPDATE work
+                SET state = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END,
+                    owner = NULL, expires_at = NULL, error = 'lease expired'
+                WHERE state = 'leased' AND expires_at < ?
+                """,
+                (self.max_attempts, time.time()),
+            )
+
+        return cursor.rowcount
+
+    def outstanding(self) -> int:
+        """
+        Amount of items that are pending or leased, by any worker. Expired
+        leases are requeued first.
+
+        Returns
+        -------
+        int
+            Amount of unfinished items.
+        """
+
+        with self._lock:
+            self.requeue_expired()
+
+            (count,) = self.conn.execute(
+                "SELECT COUNT(*) FROM work WHERE state IN ('pending', 'leased')"
+            ).fetchone()
+
+        return count
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Amount of items per state.
+
+        Returns
+        -------
+        Dict[str, int]
+            Item counts, by state.
+        """
+
+        with self._lock:
+            return dict(
+                self.conn.execute(
+                    "SELECT state, COUNT(*) FROM work GROUP BY state"
+                ).fetchall()
+            )
+
+    def reset(self) -> None:
+        """
+        Remove all items, to start a new crawl.
+        """
+
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM work")
+
+    def close(self) -> None:
+        """
+        Close the connection to the queue file.
+        """
+
+        with self._lock:
+            self.conn.close()
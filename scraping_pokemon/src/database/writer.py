@@ -0,0 +1,149 @@
+import time
+from typing import Any, Iterable, List, Mapping, Optional
+
+from ..environ import FLUSH_INTERVAL, FLUSH_SIZE
+from ..metrics import METRICS
+from ..output import NDJSONWriter
+from ..types import DocumentTable
+
+
+class BufferedTable:
+    """
+    Write-behind proxy for a document table. Inserted records are buffered
+    and written with a single 'insert_multiple' call, once FLUSH_SIZE
+    records are buffered or, on the next insert, once the oldest buffered
+    record is FLUSH_INTERVAL seconds old. There is no timer: the age is
+    only checked on insert, so records of a table that stops receiving
+    inserts stay buffered until the next flush point below. Every other
+    table operation flushes the buffer first, so reads always see all
+    inserted records.
+
+    Durability: buffered records only live in memory. They are flushed by
+    'flush', on the thresholds above, when the database is closed at
+    teardown, and at interpreter exit. A killed process loses at most the
+    records of one unflushed batch per table, so no stage may be journaled
+    before its records are written:
+
+    - Pokédex URLs, generation URLs and Pokédex pages flush their tables
+      right before they are journaled.
+    - Detail pages are journaled right away, but only count as completed
+      on resume if their record is in the database; pages lost with an
+      unflushed batch are scraped again.
+
+    With a sink, every inserted record is also streamed to NDJSON right
+    away, independent of the buffer.
+
+    Inserts and flushes are timed as the 'db_insert' and 'db_flush'
+    stages, and inserted records are counted per table.
+
+    Parameters
+    ----------
+    table : DocumentTable
+        Table to write to.
+    name : str, optional
+        Name of the table, for the metrics, by default "table"
+    size : int, optional
+        Amount of buffered records that triggers a flush, by default
+        FLUSH_SIZE
+    interval : float, optional
+        Age in seconds of the oldest buffered record that triggers a flush
+        on the next insert, by default FLUSH_INTERVAL
+    sink : Optional[NDJSONWriter], optional
+        Stream to append inserted records to, by default None
+    """
+
+    def __init__(
+        self,
+        table: DocumentTable,
+        name: str = "table",
+        size: int = FLUSH_SIZE,
+        interval: float = FLUSH_INTERVAL,
+        sink: Optional[NDJSONWriter] = None,
+    ) -> None:
+        self.table = table
+        self.name = name
+        self.size = size
+        self.interval = interval
+        self.sink = sink
+
+        self._buffer: List[Mapping] = list()
+        self._since: float = 0.0
+
+    def insert(self, document: Mapping) -> None:
+        """
+        Buffer a record for insertion.
+
+        Parameters
+        ----------
+        document : Mapping
+            Record to insert.
+        """
+
+        with METRICS.span("db_insert"):
+            if not self._buffer:
+                self._since = time.monotonic()
+
+            self._buffer.append(document)
+
+            if self.sink is not None:
+                self.sink.write(document)
+
+        METRICS.count("records", table=self.name)
+
+        if (
+            len(self._buffer) >= self.size
+            or time.monotonic() - self._since >= self.interval
+        ):
+            self.flush()
+
+    def insert_multiple(self, documents: Iterable[Mapping]) -> None:
+        """
+        Buffer multiple records for insertion.
+
+        Parameters
+        ----------
+        documents : Iterable[Mapping]
+            Records to insert.
+        """
+
+        for document in documents:
+            self.insert(document)
+
+    def flush(self) -> List[int]:
+        """
+        Write all buffered records to the table.
+
+        Returns
+        -------
+        List[int]
+            Document IDs of the written records.
+        """
+
+        if not self._buffer:
+            return list()
+
+        documents, self._buffer = self._buffer, list()
+
+        with METRICS.span("db_flush"):
+            return self.table.insert_multiple(documents)
+
+    def truncate(self) -> None:
+        """
+        Discard all buffered records and truncate the table and its sink.
+        """
+
+        self._buffer.clear()
+        self.table.truncate()
+
+        if self.sink is not None:
+            self.sink.truncate()
+
+    def __len__(self) -> int:
+        self.flush()
+
+        return len(self.table)
+
+    def __getattr__(self, name: str) -> Any:
+        self.flush()
+
+        return getattr(self.table, name)
@@ -0,0 +1,120 @@
+import asyncio
+from typing import Any, Awaitable, Coroutine, List, Optional, Tuple
+
+import aiohttp
+
+import scraping_pokemon.src.environ as environ
+import scraping_pokemon.src.utils as utils
+
+
+class ImageDownloader:
+    """
+    Background image downloader. Image URLs are enqueued on a bounded
+    queue, and are streamed into the sprite store by a pool of workers
+    sharing a single pooled aiohttp session. Enqueueing waits while the
+    queue is full, which slows down the producers to the pace of the
+    downloads.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Amount of concurrent download workers, by default IMG_WORKERS
+    limit_per_host : int, optional
+        Maximum amount of open connections per host, by default
+        IMG_LIMIT_PER_HOST
+    queue_size : int, optional
+        Maximum amount of queued images, by default IMG_QUEUE_SIZE
+    """
+
+    def __init__(
+        self,
+        workers: int = environ.IMG_WORKERS,
+        limit_per_host: int = environ.IMG_LIMIT_PER_HOST,
+        queue_size: int = environ.IMG_QUEUE_SIZE,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.limit_per_host = limit_per_host
+
+        self._queue: asyncio.Queue[
+            Tuple[str, Optional[str]]
+        ] = asyncio.Queue(maxsize=queue_size)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._tasks: List[asyncio.Task] = list()
+
+    async def start(self) -> Coroutine[Any, Any, Awaitable[None]]:
+        """
+        Open the pooled session and start the download workers.
+        """
+
+        connector = aiohttp.TCPConnector(
+            limit=self.workers, limit_per_host=self.limit_per_host
+        )
+        self._session = aiohttp.ClientSession(connector=connector)
+        self._tasks = [
+            asyncio.create_task(self._worker())
+            for _ in range(self.workers)
+        ]
+
+        # Log
+        environ.CONSOLE.log(
+            f"Started image downloader with [b]{self.workers}[/b] workers."
+        )
+
+    async def enqueue(
+        self, url: str, key: Optional[str] = None
+    ) -> Coroutine[Any, Any, Awaitable[None]]:
+        """
+        Schedule an image for download, without waiting for the download.
+        Waits for a free slot if the queue is full.
+
+        Parameters
+        ----------
+        url : str
+            Direct URL to image.
+        key : Optional[str], optional
+            Key of the Pokémon the image belongs to, by default None
+        """
+
+        await self._queue.put((url, key))
+
+    async def drain(self) -> Coroutine[Any, Any, Awaitable[None]]:
+        """
+        Wait for all enqueued images to be written to disk, then stop the
+        workers and close the session.
+        """
+
+        # Log
+        environ.CONSOLE.log(
+            f"Draining image downloader: [b]{self._queue.qsize()}[/b] images queued..."
+        )
+
+        await self._queue.join()
+
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        if self._session:
+            await self._session.close()
+
+    async def _worker(self) -> Coroutine[Any, Any, Awaitable[None]]:
+        """
+        Download worker; consumes image URLs from the queue until cancelled.
+        """
+
+        while True:
+            url, key = await self._queue.get()
+
+            try:
+                await utils.save_img(
+                    url=url, session=self._session, key=key
+                )
+            except Exception as e:
+                # Log
+                environ.CONSOLE.log(
+                    f"[bold red]Failed to save image[/bold red]: '{url}' ({e!r})",
+                    level="error",
+                )
+            finally:
+                self._queue.task_done()
@@ -1,25 +1,137 @@
 from pathlib import Path
+from typing import Literal, Optional
 from urllib.parse import urljoin
 
-from rich.console import Console
-
+from .log import LogConsole
 from .types import FirefoxParams
 
+# Logging
+LOG_LEVEL: Literal["debug", "info", "warning", "error"] = "info"
+LOG_FILE: bool = True
+LOG_FILE_LEVEL: Literal["debug", "info", "warning", "error"] = "info"
+LOG_FILE_FORMAT: Literal["text", "jsonl"] = "jsonl"
+LOG_DIR: Path = Path("./data/static/logs")
+LOG_RECORD_SIZE: int = 1000
+
 # Setup
-CONSOLE = Console(record=True, tab_size=2)
+CONSOLE = LogConsole(
+    level=LOG_LEVEL, record_size=LOG_RECORD_SIZE, tab_size=2
+)
 FIREFOX_PARAMS = FirefoxParams(
     headless=False,
 )
 
 # Switches
+ENGINE: Literal["playwright", "http"] = "playwright"
 KEEP_ALIVE: bool = False
 PAGE_TIMEOUT: int = 5000
 LIMIT_POKEDEX: int = 1
 LIMIT_CARDS: int = 5
-SCREENSHOT_PAGE: bool = False
+BULK_EXTRACT: bool = True
+
+# Concurrency
+PIPELINE: bool = True
+CONCURRENCY_CARDS: int = 2
+CONCURRENCY_DETAILS: int = 4
+QUEUE_SIZE_CARDS: int = 64
+SHARDS: int = 0
+
+# Screenshots
+SCREENSHOT_MODE: Literal[
+    "off", "all", "rate", "hash", "errors"
+] = "hash"
+SCREENSHOT_RATE: float = 0.1
+SCREENSHOT_CLIP: Optional[str] = "main"
+SCREENSHOT_TYPE: Literal["jpeg", "png"] = "jpeg"
+SCREENSHOT_QUALITY: int = 80
+SCREENSHOT_WORKERS: int = 2
+SCREENSHOT_QUEUE_SIZE: int = 16
+SCREENSHOT_DIR: Path = Path("./data/static/img/screenshots")
+
+# Browser server
+BROWSER_SERVER: bool = False
+BROWSER_SERVER_PORT: int = 0
+BROWSER_ENDPOINT_FILE: Path = Path("./data/browser/endpoint.json")
+STORAGE_STATE: Path = Path("./data/browser/storage_state.json")
+
+# Work queue
+WORK_QUEUE: bool = False
+WORK_QUEUE_PATH: Path = Path("./data/db/work_queue.sqlite")
+WORK_QUEUE_SHARED: bool = False
+WORK_QUEUE_POLL: float = 1.0
+LEASE_TIMEOUT: float = 300.0
+LEASE_MAX_ATTEMPTS: int = 3
+
+# HTTP engine
+HTTP_CONCURRENCY: int = 32
+HTTP_FALLBACK: bool = True
+
+# Images
+IMG_WORKERS: int = 4
+IMG_LIMIT_PER_HOST: int = 4
+IMG_CHUNK_SIZE: int = 64 * 1024
+IMG_QUEUE_SIZE: int = 256
+
+# Sprite store
+SPRITE_DIR: Path = Path("./data/static/img/pokemon")
+SPRITE_MAX_AGE: int = 7 * 24 * 60 * 60
+SPRITE_LINKS: bool = True
+
+# Retries
+RETRY_ATTEMPTS: int = 3
+RETRY_BASE_DELAY: float = 2.0
+RETRY_MAX_DELAY: float = 60.0
+
+# Rate limiting
+RATE_LIMIT: bool = True
+RATE_INITIAL: float = 4.0
+RATE_MIN: float = 0.5
+RATE_MAX: float = 32.0
+RATE_BURST: float = 4.0
+RATE_INCREASE: float = 0.5
+RATE_DECREASE: float = 0.5
+RATE_LATENCY_TARGET: float = 2.0
+
+# Request interception
+ROUTE_BLOCKING: bool = True
+BLOCK_RESOURCE_TYPES: list[str] = ["image", "media", "font"]
+BLOCK_URL_PATTERNS: list[str] = [
+    "google-analytics",
+    "googletagmanager",
+    "googlesyndication",
+    "doubleclick",
+    "adservice",
+    "amazon-adsystem",
+]
+BLOCK_THIRD_PARTY: bool = True
+
+# Response cache
+CACHE_ENABLED: bool = True
+CACHE_DIR: Path = Path("./data/cache")
+CACHE_MAX_AGE: int = 24 * 60 * 60
+CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+CACHE_OFFLINE: bool = False
 
 # DB
+STORAGE_BACKEND: Literal["sqlite", "tinydb"] = "sqlite"
 TRUNCATE: bool = False
+RESUME: bool = True
+FLUSH_SIZE: int = 50
+FLUSH_INTERVAL: float = 5.0
+
+# Output
+NDJSON_OUTPUT: bool = True
+NDJSON_DIR: Path = Path("./data/static/out/ndjson")
+NDJSON_MAX_BYTES: int = 64 * 1024 * 1024
+PRETTY_JSON: bool = False
+
+# Export
+EXPORT_COLUMNAR: bool = True
+EXPORT_DIR: Path = Path("./data/static/out/columnar")
+
+# Metrics
+METRICS: bool = True
+METRICS_DIR: Path = Path("./data/static/metrics")
 
 # URL
 URL_ROOT = "https://pokemondb.net"
@@ -31,8 +143,10 @@ FOLDERS: list[str] = [
     "data/static/img/screenshots",
     "data/static/img/pokemon",
     "data/static/logs",
+    "data/static/metrics",
     "data/static/out",
     "data/db",
+    "data/browser",
 ]
 
 
@@ -0,0 +1,353 @@
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pyarrow as pa
+
+import scraping_pokemon.src.environ as environ
+from scraping_pokemon.src.database import db
+from scraping_pokemon.src.database.index import STATS
+
+# Leading number of a cell, e.g. '6.9' in '6.9 kg (15.2 lbs)'
+RE_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+
+# Typed schemas of the exported tables
+SCHEMA_POKEMON = pa.schema(
+    [
+        ("key", pa.string()),
+        ("name", pa.string()),
+        ("description", pa.string()),
+        ("national_no", pa.int32()),
+        ("types", pa.list_(pa.string())),
+        ("species", pa.string()),
+        ("height_m", pa.float64()),
+        ("weight_kg", pa.float64()),
+        ("abilities", pa.list_(pa.string())),
+        ("local_no", pa.list_(pa.string())),
+        ("ev_yield", pa.string()),
+        ("catch_rate", pa.int32()),
+        ("base_friendship", pa.int32()),
+        ("base_exp", pa.int32()),
+        ("growth_rate", pa.string()),
+        ("egg_groups", pa.list_(pa.string())),
+        ("gender", pa.string()),
+        ("egg_cycles", pa.int32()),
+        *[
+            (f"{stat}_{value}", pa.int16())
+            for stat in STATS
+            for value in ["base", "min", "max"]
+        ],
+        (
+            "pokedex_entries",
+            pa.list_(
+                pa.struct(
+                    [
+                        ("games", pa.list_(pa.string())),
+                        ("entry", pa.string()),
+                    ]
+                )
+            ),
+        ),
+        (
+            "where_to_find",
+            pa.list_(
+                pa.struct(
+                    [
+                        ("games", pa.list_(pa.string())),
+                        ("location", pa.string()),
+                    ]
+                )
+            ),
+        ),
+        (
+            "other_languages",
+            pa.list_(
+                pa.struct(
+                    [
+                        ("languages", pa.list_(pa.string())),
+                        ("name", pa.string()),
+                    ]
+                )
+            ),
+        ),
+    ]
+)
+SCHEMA_CARDS_DATA = pa.schema(
+    [("number", pa.int32()), ("types", pa.list_(pa.string()))]
+)
+SCHEMA_CARDS_IMG = pa.schema(
+    [
+        ("url", pa.string()),
+        ("img_src", pa.string()),
+        ("img_alt", pa.string()),
+    ]
+)
+
+
+def to_number(
+    text: Optional[str], cast: Callable[[str], Any] = int
+) -> Optional[Any]:
+    """
+    Parse the leading number of a cell, e.g. 45 for '45 (5.9% with
+    PokéBall, full HP)'.
+
+    Parameters
+    ----------
+    text : Optional[str]
+        Cell text.
+    cast : Callable[[str], Any], optional
+        Type to cast the number to, by default int
+
+    Returns
+    -------
+    Optional[Any]
+        Parsed number, or None if the cell holds no number, e.g. '—'.
+    """
+
+    match = RE_NUMBER.search(text or "")
+
+    if match is None:
+        return None
+
+    return cast(match.group().replace(",", ""))
+
+
+def first(values: Optional[list]) -> Optional[Any]:
+    """
+    Unwrap a single-valued list field.
+
+    Parameters
+    ----------
+    values : Optional[list]
+        List field of a record.
+
+    Returns
+    -------
+    Optional[Any]
+        First value, or None if there is none.
+    """
+
+    return values[0] if values else None
+
+
+def pokemon_row(document: dict) -> Dict[str, Any]:
+    """
+    Flatten a Pokémon record into a typed row.
+
+    Parameters
+    ----------
+    document : dict
+        Pokémon record.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Row matching SCHEMA_POKEMON.
+    """
+
+    pokedex_data = document["pokedex_data"]
+    training = document["training"]
+    breeding = document["breeding"]
+
+    row = dict(
+        key=document["key"],
+        name=document["name"],
+        description=document["description"],
+        national_no=to_number(first(pokedex_data["national_no"])),
+        types=(first(pokedex_data["type"]) or "").split(),
+        species=first(pokedex_data["species"]),
+        height_m=to_number(first(pokedex_data["height"]), float),
+        weight_kg=to_number(first(pokedex_data["weight"]), float),
+        abilities=first(pokedex_data["abilities"]),
+        local_no=first(pokedex_data["local_no"]),
+        ev_yield=first(training["ev_yield"]),
+        catch_rate=to_number(first(training["catch_rate"])),
+        base_friendship=to_number(first(training["base_friendship"])),
+        base_exp=to_number(first(training["base_exp"])),
+        growth_rate=first(training["growth_rate"]),
+        egg_groups=[
+            group.strip()
+            for group in first(breeding["egg_groups"]) or []
+        ],
+        gender=first(breeding["gender"]),
+        egg_cycles=to_number(first(breeding["egg_cycles"])),
+        pokedex_entries=[
+            dict(games=games, entry=entry)
+            for games, entry in zip(
+                document["pokedex_entries"]["game"],
+                document["pokedex_entries"]["entry"],
+            )
+        ],
+        where_to_find=[
+            dict(games=games, location=location)
+            for games, location in zip(
+                document["where_to_find"]["game"],
+                document["where_to_find"]["location"],
+            )
+        ],
+        other_languages=[
+            dict(languages=languages, name=name)
+            for languages, name in zip(
+                document["other_languages"]["language"],
+                document["other_languages"]["name"],
+            )
+        ],
+    )
+
+    for stat in STATS:
+        for value in ["base", "min", "max"]:
+            row[f"{stat}_{value}"] = (
+                document["base_stats"].get(stat, dict()).get(value)
+            )
+
+    return row
+
+
+def cards_data_row(document: dict) -> Dict[str, Any]:
+    """
+    Flatten a card data record into a typed row.
+
+    Parameters
+    ----------
+    document : dict
+        Card data record.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Row matching SCHEMA_CARDS_DATA.
+    """
+
+    card_data = document["card_data"]
+
+    return dict(
+        number=to_number(first(card_data["number"])),
+        types=first(card_data["types"]),
+    )
+
+
+def cards_img_row(document: dict) -> Dict[str, Any]:
+    """
+    Flatten a card image record into a typed row.
+
+    Parameters
+    ----------
+    document : dict
+        Card image record.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Row matching SCHEMA_CARDS_IMG.
+    """
+
+    card_image = document["card_image"]
+
+    return dict(
+        url=first(card_image["url"]),
+        img_src=first(card_image["img_src"]),
+        img_alt=first(card_image["img_alt"]),
+    )
+
+
+# Exported tables, with their schema and row flattener; the document
+# tables are looked up on export, so the database is opened only then
+EXPORTS: Dict[str, tuple] = dict(
+    pokemon=("table_pokemon", SCHEMA_POKEMON, pokemon_row),
+    cards_data=("table_cards_data", SCHEMA_CARDS_DATA, cards_data_row),
+    cards_img=("table_cards_img", SCHEMA_CARDS_IMG, cards_img_row),
+)
+
+
+def export_table(
+    name: str, folder: Path = environ.EXPORT_DIR
+) -> pa.Table:
+    """
+    Export a document table as typed columns, to both a Parquet file and
+    an Arrow IPC file. The Parquet file is compressed for storage and
+    exchange; the uncompressed Arrow file can be memory-mapped, so readers
+    only page in the columns they use.
+
+    Parameters
+    ----------
+    name : str
+        Name of the table; one of 'pokemon', 'cards_data' and 'cards_img'.
+    folder : Path, optional
+        Output folder, by default EXPORT_DIR
+
+    Returns
+    -------
+    pa.Table
+        Exported table.
+    """
+
+    # Imported here, since reading exports does not need it
+    import pyarrow.parquet as pq
+
+    table_name, schema, to_row = EXPORTS[name]
+    table = getattr(db, table_name)
+
+    arrow_table = pa.Table.from_pylist(
+        [to_row(document) for document in table.all()], schema=schema
+    )
+
+    folder.mkdir(parents=True, exist_ok=True)
+
+    pq.write_table(arrow_table, folder / f"{name}.parquet")
+
+    with pa.OSFile(str(folder / f"{name}.arrow"), "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            writer.write_table(arrow_table)
+
+    # Log
+    environ.CONSOLE.log(
+        f"Exported [b]{name}[/b]: {arrow_table.num_rows} rows, {arrow_table.num_columns} columns."
+    )
+
+    return arrow_table
+
+
+def read_table(
+    name: str,
+    columns: Optional[List[str]] = None,
+    folder: Path = environ.EXPORT_DIR,
+) -> pa.Table:
+    """
+    Memory-map an exported table. Without copying, only the pages of the
+    selected columns are read from disk.
+
+    Parameters
+    ----------
+    name : str
+        Name of the table.
+    columns : Optional[List[str]], optional
+        Columns to select, by default None, which selects all
+    folder : Path, optional
+        Output folder, by default EXPORT_DIR
+
+    Returns
+    -------
+    pa.Table
+        Exported table.
+    """
+
+    source = pa.memory_map(str(folder / f"{name}.arrow"), "r")
+    arrow_table = pa.ipc.open_file(source).read_all()
+
+    if columns is not None:
+        arrow_table = arrow_table.select(columns)
+
+    return arrow_table
+
+
+def export_tables() -> None:
+    """
+    Export all document tables.
+    """
+
+    for name in EXPORTS:
+        export_table(name)
+
+
+def run() -> None:
+    export_tables()
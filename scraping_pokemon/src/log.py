@@ -0,0 +1,338 @@
+import json
+import sys
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+from types import FrameType
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    Literal,
+    Optional,
+)
+
+from rich.console import Console
+from rich.errors import MarkupError
+from rich.text import Text
+
+# Severity of the log levels
+LEVELS: Dict[str, int] = dict(debug=10, info=20, warning=30, error=40)
+
+
+def plain(obj: Any) -> str:
+    """
+    Render a logged object as plain text, without markup or styles.
+
+    Parameters
+    ----------
+    obj : Any
+        Logged object; markup string, Text or other Rich renderable.
+
+    Returns
+    -------
+    str
+        Plain text.
+    """
+
+    if isinstance(obj, str):
+        try:
+            return Text.from_markup(obj).plain
+        except MarkupError:
+            return obj
+
+    if isinstance(obj, Text):
+        return obj.plain
+
+    console = Console(
+        file=StringIO(), width=100, color_system=None, emoji=False
+    )
+    console.print(obj)
+
+    return console.file.getvalue().rstrip()
+
+
+class LogSink:
+    """
+    Log file, written as records come in. Records are written as plain
+    text lines, or as JSON lines with the time, level, message and source
+    location of every record. The file is line buffered, so it can be
+    followed while scraping.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the log file.
+    format : Literal["text", "jsonl"], optional
+        Record format, by default "jsonl"
+    level : str, optional
+        Minimum level of the written records, by default "info"
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        format: Literal["text", "jsonl"] = "jsonl",
+        level: str = "info",
+    ) -> None:
+        self.path = Path(path)
+        self.format = format
+        self.severity = LEVELS[level]
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+
+    def write(
+        self, level: str, objects: Iterable[Any], frame: FrameType
+    ) -> None:
+        """
+        Write a record.
+
+        Parameters
+        ----------
+        level : str
+            Level of the record.
+        objects : Iterable[Any]
+            Logged objects.
+        frame : FrameType
+            Frame of the caller, for the source location.
+        """
+
+        time = datetime.now().isoformat(timespec="milliseconds")
+        message = " ".join(plain(obj) for obj in objects)
+        source = (
+            f"{Path(frame.f_code.co_filename).name}:{frame.f_lineno}"
+        )
+
+        if self.format == "jsonl":
+            line = json.dumps(
+                dict(
+                    time=time,
+                    level=level,
+                    message=message,
+                    source=source,
+                ),
+                ensure_ascii=False,
+            )
+        else:
+            line = f"{time} {level.upper():<7} {message} [{source}]"
+
+        self._file.write(f"{line}\n")
+
+    def close(self) -> None:
+        """
+        Close the log file.
+        """
+
+        self._file.close()
+
+
+class LogConsole(Console):
+    """
+    Rich console with log levels, a streaming log file and a bounded
+    recording. Records below the console level are dropped before they are
+    rendered, which makes them cheap in hot loops; the log file, if open,
+    has a level of its own.
+
+    Only the last record_size records are kept for the SVG and HTML export
+    of the console, so the recording does not grow with the length of a
+    run. A record_size of 0 disables the recording.
+
+    Parameters
+    ----------
+    *args : Any
+        Arguments of the Rich Console.
+    level : str, optional
+        Minimum level of the shown records, by default "info"
+    record_size : int, optional
+        Amount of records kept for export, by default 0
+    **kwargs : Any
+        Keyword arguments of the Rich Console.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        level: str = "info",
+        record_size: int = 0,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, record=record_size > 0, **kwargs)
+
+        self.severity = LEVELS[level]
+        self.record_size = record_size
+
+        self._sink: Optional[LogSink] = None
+
+        # Segments of the recorded records, and of those to be trimmed
+        self._record_sizes: Deque[int] = deque()
+        self._record_trimmed = 0
+
+    def enabled(self, level: str) -> bool:
+        """
+        Whether or not records of a level are shown or written anywhere;
+        guards logs that are expensive to compile.
+
+        Parameters
+        ----------
+        level : str
+            Log level.
+
+        Returns
+        -------
+        bool
+            Whether or not records of the level are logged.
+        """
+
+        severity = LEVELS[level]
+
+        return severity >= self.severity or (
+            self._sink is not None and severity >= self._sink.severity
+        )
+
+    def log(
+        self,
+        *objects: Any,
+        level: str = "info",
+        _stack_offset: int = 1,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Log objects with the time and source location, at a level.
+
+        Parameters
+        ----------
+        *objects : Any
+            Objects to log.
+        level : str, optional
+            Log level, by default "info"
+        **kwargs : Any
+            Keyword arguments of 'Console.log'.
+        """
+
+        severity = LEVELS[level]
+
+        if self._sink is not None and severity >= self._sink.severity:
+            self._sink.write(
+                level, objects, sys._getframe(_stack_offset)
+            )
+
+        if severity < self.severity:
+            return
+
+        with self._recording():
+            super().log(
+                *objects, _stack_offset=_stack_offset + 1, **kwargs
+            )
+
+    def rule(self, title: str = "", **kwargs: Any) -> None:
+        """
+        Draw a section rule, and write its title to the log file.
+
+        Parameters
+        ----------
+        title : str, optional
+            Title of the section, by default ""
+        **kwargs : Any
+            Keyword arguments of 'Console.rule'.
+        """
+
+        if (
+            self._sink is not None
+            and LEVELS["info"] >= self._sink.severity
+        ):
+            self._sink.write(
+                "info", [f"== {title} =="], sys._getframe(1)
+            )
+
+        if LEVELS["info"] < self.severity:
+            return
+
+        with self._recording():
+            super().rule(title, **kwargs)
+
+    def open_sink(
+        self,
+        directory: Path,
+        format: Literal["text", "jsonl"] = "jsonl",
+        level: str = "info",
+    ) -> Path:
+        """
+        Start writing records to a new log file.
+
+        Parameters
+        ----------
+        directory : Path
+            Folder of the log file.
+        format : Literal["text", "jsonl"], optional
+            Record format, by default "jsonl"
+        level : str, optional
+            Minimum level of the written records, by default "info"
+
+        Returns
+        -------
+        Path
+            Path of the log file.
+        """
+
+        self.close_sink()
+
+        extension = "jsonl" if format == "jsonl" else "log"
+        path = (
+            Path(directory)
+            / f"log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+        )
+        self._sink = LogSink(path, format, level)
+
+        return path
+
+    def close_sink(self) -> None:
+        """
+        Stop writing records to the log file, if any.
+        """
+
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def trim_recording(self) -> None:
+        """
+        Drop the recorded records beyond the last record_size ones. Called
+        before exporting the recording.
+        """
+
+        with self._record_buffer_lock:
+            del self._record_buffer[: self._record_trimmed]
+            self._record_trimmed = 0
+
+    @contextmanager
+    def _recording(self) -> Iterator[None]:
+        """
+        Track the segments a record adds to the recording, and drop those
+        of the oldest records once there are more than record_size.
+        """
+
+        if not self.record or not self.record_size:
+            yield
+
+            return
+
+        with self._record_buffer_lock:
+            before = len(self._record_buffer)
+
+        yield
+
+        with self._record_buffer_lock:
+            self._record_sizes.append(len(self._record_buffer) - before)
+
+            while len(self._record_sizes) > self.record_size:
+                self._record_trimmed += self._record_sizes.popleft()
+
+            # Trim in batches, so recording stays constant time
+            if self._record_trimmed > len(self._record_buffer) // 2:
+                del self._record_buffer[: self._record_trimmed]
+                self._record_trimmed = 0
@@ -0,0 +1,533 @@
+import json
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from rich.table import Table
+
+import scraping_pokemon.src.environ as environ
+
+# Upper bounds of the duration buckets, in seconds; the last bucket is +Inf
+BUCKETS: Tuple[float, ...] = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+# Prefix of the exported metric names
+NAMESPACE = "scraping_pokemon"
+
+# Counter and gauge key; name and sorted label pairs
+CounterKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Histogram:
+    """
+    Duration histogram of a single stage, with fixed buckets like a
+    Prometheus histogram. Quantiles are estimated by interpolating within
+    the buckets, so recording a duration takes constant time and memory.
+
+    Parameters
+    ----------
+    buckets : Tuple[float, ...], optional
+        Upper bounds of the buckets, by default BUCKETS
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, seconds: float) -> None:
+        """
+        Record a duration.
+
+        Parameters
+        ----------
+        seconds : float
+            Duration in seconds.
+        """
+
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = (
+            seconds if self.min is None else min(self.min, seconds)
+        )
+        self.max = (
+            seconds if self.max is None else max(self.max, seconds)
+        )
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile of the recorded durations.
+
+        Parameters
+        ----------
+        q : float
+            Quantile, between 0 and 1.
+
+        Returns
+        -------
+        Optional[float]
+            Estimated duration in seconds, or None if nothing was recorded.
+        """
+
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        seen = 0
+
+        for n, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[n - 1] if n > 0 else 0.0
+                upper = (
+                    self.buckets[n]
+                    if n < len(self.buckets)
+                    else self.max
+                )
+
+                # Clamp the estimate to the observed range
+                lower = max(lower, self.min)
+                upper = min(upper, self.max)
+
+                return lower + (upper - lower) * (rank - seen) / count
+
+            seen += count
+
+        return self.max
+
+    def merge(self, state: dict) -> None:
+        """
+        Add the durations of a histogram snapshot.
+
+        Parameters
+        ----------
+        state : dict
+            Snapshot of a histogram with the same buckets.
+        """
+
+        self.counts = [
+            a + b for a, b in zip(self.counts, state["counts"])
+        ]
+        self.count += state["count"]
+        self.sum += state["sum"]
+
+        for attr, pick in [("min", min), ("max", max)]:
+            if state[attr] is not None:
+                current = getattr(self, attr)
+                setattr(
+                    self,
+                    attr,
+                    state[attr]
+                    if current is None
+                    else pick(current, state[attr]),
+                )
+
+    def snapshot(self) -> dict:
+        """
+        Serializable state of the histogram, with its summary statistics.
+
+        Returns
+        -------
+        dict
+            Histogram snapshot.
+        """
+
+        return dict(
+            count=self.count,
+            sum=self.sum,
+            min=self.min,
+            max=self.max,
+            mean=self.sum / self.count if self.count else None,
+            p50=self.quantile(0.5),
+            p95=self.quantile(0.95),
+            buckets=list(self.buckets),
+            counts=list(self.counts),
+        )
+
+
+class Metrics:
+    """
+    Registry of the duration histograms, counters and gauges of a run.
+    Stages are timed with the 'span' context manager, which also counts the
+    errors raised inside of it; everything else is counted with 'count',
+    or set with 'gauge' if it can go down, like a queue depth.
+
+    Recording is in-process. Shard worker processes send their snapshot
+    to the main process, which merges it.
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        Whether to record anything, by default METRICS
+    """
+
+    def __init__(self, enabled: bool = environ.METRICS) -> None:
+        self.enabled = enabled
+
+        self.histograms: Dict[str, Histogram] = dict()
+        self.counters: Dict[CounterKey, float] = dict()
+        self.gauges: Dict[CounterKey, float] = dict()
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """
+        Time the enclosed block as a stage. Works around awaits as well,
+        since it measures wall-clock time.
+
+        Parameters
+        ----------
+        stage : str
+            Name of the stage.
+        """
+
+        if not self.enabled:
+            yield
+
+            return
+
+        started = time.perf_counter()
+
+        try:
+            yield
+        except Exception:
+            self.count("errors", stage=stage)
+
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """
+        Record the duration of a stage.
+
+        Parameters
+        ----------
+        stage : str
+            Name of the stage.
+        seconds : float
+            Duration in seconds.
+        """
+
+        if not self.enabled:
+            return
+
+        histogram = self.histograms.get(stage)
+
+        if histogram is None:
+            histogram = self.histograms[stage] = Histogram()
+
+        histogram.observe(seconds)
+
+    def count(self, name: str, value: float = 1, **labels: str) -> None:
+        """
+        Increment a counter.
+
+        Parameters
+        ----------
+        name : str
+            Name of the counter.
+        value : float, optional
+            Increment, by default 1
+        **labels : str
+            Labels of the counter.
+        """
+
+        if not self.enabled:
+            return
+
+        key = (
+            name,
+            tuple(sorted((k, str(v)) for k, v in labels.items())),
+        )
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name: str, value: float, **labels: str) -> None:
+        """
+        Set a gauge to its current value.
+
+        Parameters
+        ----------
+        name : str
+            Name of the gauge.
+        value : float
+            Current value.
+        **labels : str
+            Labels of the gauge.
+        """
+
+        if not self.enabled:
+            return
+
+        key = (
+            name,
+            tuple(sorted((k, str(v)) for k, v in labels.items())),
+        )
+        self.gauges[key] = value
+
+    def snapshot(self) -> dict:
+        """
+        Serializable state of all histograms, counters and gauges.
+
+        Returns
+        -------
+        dict
+            Metrics snapshot.
+        """
+
+        return dict(
+            histograms={
+                stage: histogram.snapshot()
+                for stage, histogram in sorted(self.histograms.items())
+            },
+            counters=[
+                dict(name=name, labels=dict(labels), value=value)
+                for (name, labels), value in sorted(
+                    self.counters.items()
+                )
+            ],
+            gauges=[
+                dict(name=name, labels=dict(labels), value=value)
+                for (name, labels), value in sorted(self.gauges.items())
+            ],
+        )
+
+    def merge(self, snapshot: dict, **labels: str) -> None:
+        """
+        Add the histograms and counters of a snapshot, like the one of a
+        shard worker process. Gauges describe the state of their own
+        process, so they are kept apart, with the given labels added.
+
+        Parameters
+        ----------
+        snapshot : dict
+            Metrics snapshot.
+        **labels : str
+            Labels added to the gauges of the snapshot, like the shard.
+        """
+
+        if not self.enabled:
+            return
+
+        for stage, state in snapshot["histograms"].items():
+            self.histograms.setdefault(stage, Histogram()).merge(state)
+
+        for counter in snapshot["counters"]:
+            self.count(
+                counter["name"], counter["value"], **counter["labels"]
+            )
+
+        for gauge in snapshot.get("gauges", []):
+            self.gauge(
+                gauge["name"],
+                gauge["value"],
+                **{**gauge["labels"], **labels},
+            )
+
+    def prometheus(self) -> str:
+        """
+        Render all histograms, counters and gauges in the Prometheus text
+        exposition format.
+
+        Returns
+        -------
+        str
+            Metrics, in Prometheus text format.
+        """
+
+        lines: List[str] = list()
+
+        if self.histograms:
+            name = f"{NAMESPACE}_stage_duration_seconds"
+
+            lines.append(f"# HELP {name} Duration of scraping stages.")
+            lines.append(f"# TYPE {name} histogram")
+
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+
+                for bound, count in zip(
+                    [*histogram.buckets, "+Inf"], histogram.counts
+                ):
+                    cumulative += count
+                    lines.append(
+                        f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}'
+                    )
+
+                lines.append(
+                    f'{name}_sum{{stage="{stage}"}} {histogram.sum}'
+                )
+                lines.append(
+                    f'{name}_count{{stage="{stage}"}} {histogram.count}'
+                )
+
+        typed = set()
+
+        for (counter, labels), value in sorted(self.counters.items()):
+            name = f"{NAMESPACE}_{counter}_total"
+
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+
+            rendered = ",".join(f'{k}="{v}"' for k, v in labels)
+            lines.append(
+                f"{name}{{{rendered}}} {value}"
+                if rendered
+                else f"{name} {value}"
+            )
+
+        for (gauge, labels), value in sorted(self.gauges.items()):
+            name = f"{NAMESPACE}_{gauge}"
+
+            if name not in typed:
+                lines.append(f"# TYPE {name} gauge")
+                typed.add(name)
+
+            rendered = ",".join(f'{k}="{v}"' for k, v in labels)
+            lines.append(
+                f"{name}{{{rendered}}} {value}"
+                if rendered
+                else f"{name} {value}"
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def write(
+        self, directory: Path = environ.METRICS_DIR
+    ) -> Tuple[Path, Path]:
+        """
+        Write the metrics as JSON and in Prometheus text format.
+
+        Parameters
+        ----------
+        directory : Path, optional
+            Folder of the metrics files, by default METRICS_DIR
+
+        Returns
+        -------
+        Tuple[Path, Path]
+            Paths of the JSON and Prometheus files.
+        """
+
+        stem = f"metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        path_json = Path(directory) / f"{stem}.json"
+        path_prom = Path(directory) / f"{stem}.prom"
+
+        path_json.parent.mkdir(parents=True, exist_ok=True)
+        path_json.write_text(
+            json.dumps(self.snapshot(), indent=2), encoding="utf-8"
+        )
+        path_prom.write_text(self.prometheus(), encoding="utf-8")
+
+        # Log
+        environ.CONSOLE.log(
+            f"Wrote metrics: '{path_json}', '{path_prom}'"
+        )
+
+        return path_json, path_prom
+
+    def report(self) -> None:
+        """
+        Log the durations and errors of every stage, and all other
+        counters and gauges.
+        """
+
+        if not self.enabled:
+            return
+
+        errors = {
+            dict(labels).get("stage"): value
+            for (name, labels), value in self.counters.items()
+            if name == "errors"
+        }
+
+        table = Table(title="Stages")
+
+        for column in [
+            "Stage",
+            "Count",
+            "Total (s)",
+            "Mean (ms)",
+            "p50 (ms)",
+            "p95 (ms)",
+            "Max (ms)",
+            "Errors",
+        ]:
+            table.add_column(column)
+
+        for stage, histogram in sorted(self.histograms.items()):
+            stats = histogram.snapshot()
+
+            table.add_row(
+                stage,
+                str(stats["count"]),
+                f"{stats['sum']:.2f}",
+                *[
+                    f"{1000 * stats[key]:.1f}"
+                    for key in ["mean", "p50", "p95", "max"]
+                ],
+                str(int(errors.get(stage, 0))),
+            )
+
+        # Log
+        environ.CONSOLE.log(table)
+
+        counters = Table(title="Counters")
+
+        for column in ["Counter", "Labels", "Value"]:
+            counters.add_column(column)
+
+        for (name, labels), value in sorted(self.counters.items()):
+            counters.add_row(
+                name,
+                ", ".join(f"{k}={v}" for k, v in labels),
+                f"{value:,.0f}",
+            )
+
+        # Log
+        environ.CONSOLE.log(counters)
+
+        if not self.gauges:
+            return
+
+        gauges = Table(title="Gauges")
+
+        for column in ["Gauge", "Labels", "Value"]:
+            gauges.add_column(column)
+
+        for (name, labels), value in sorted(self.gauges.items()):
+            gauges.add_row(
+                name,
+                ", ".join(f"{k}={v}" for k, v in labels),
+                f"{value:,.2f}",
+            )
+
+        # Log
+        environ.CONSOLE.log(gauges)
+
+
+# Shared registry for all stages of a run
+METRICS = Metrics()
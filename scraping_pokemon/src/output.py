@@ -0,0 +1,238 @@
+import atexit
+import json
+from pathlib import Path
+from textwrap import indent
+from typing import Dict, Iterator, List, Mapping, Optional, TextIO
+
+import scraping_pokemon.src.environ as environ
+
+
+class NDJSONWriter:
+    """
+    Streaming writer of newline-delimited JSON. Every record is appended
+    as a single compact line and flushed right away, so a crashed run keeps
+    all records written up to that point.
+
+    Files are named '<name>.<n>.ndjson' and rotated once they reach
+    max_bytes. Writing resumes in the last file of a previous run.
+
+    Parameters
+    ----------
+    name : str
+        Name of the stream.
+    folder : Path, optional
+        Output folder, by default NDJSON_DIR
+    max_bytes : int, optional
+        Size at which a file is rotated, by default NDJSON_MAX_BYTES
+    """
+
+    def __init__(
+        self,
+        name: str,
+        folder: Path = environ.NDJSON_DIR,
+        max_bytes: int = environ.NDJSON_MAX_BYTES,
+    ) -> None:
+        self.name = name
+        self.folder = Path(folder)
+        self.max_bytes = max_bytes
+
+        self._file: Optional[TextIO] = None
+        self._index = 0
+        self._size = 0
+
+    def files(self) -> List[Path]:
+        """
+        Files of the stream, in write order.
+
+        Returns
+        -------
+        List[Path]
+            Paths of the NDJSON files.
+        """
+
+        return sorted(self.folder.glob(f"{self.name}.*.ndjson"))
+
+    def _open(self) -> None:
+        """
+        Open the last file of the stream for appending, or the next file if
+        the last one is full.
+        """
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+        files = self.files()
+
+        if files:
+            self._index = int(files[-1].suffixes[-2].lstrip("."))
+
+        path = self.folder / f"{self.name}.{self._index:04d}.ndjson"
+        self._file = path.open("a", encoding="utf-8")
+        self._size = path.stat().st_size
+
+        # Terminate a line truncated by an interrupted run
+        if self._size:
+            with path.open("rb") as f:
+                f.seek(-1, 2)
+
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+                    self._size += 1
+
+    def write(self, record: Mapping) -> None:
+        """
+        Append a record.
+
+        Parameters
+        ----------
+        record : Mapping
+            Serializable record.
+        """
+
+        if self._file is None:
+            self._open()
+        elif self._size >= self.max_bytes:
+            self._file.close()
+            self._index += 1
+            self._size = 0
+            self._file = (
+                self.folder / f"{self.name}.{self._index:04d}.ndjson"
+            ).open("a", encoding="utf-8")
+
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+
+        self._file.write(line)
+        self._file.flush()
+        self._size += len(line.encode("utf-8"))
+
+    def read(self) -> Iterator[dict]:
+        """
+        Iterate over the records of the stream. Truncated lines, left by an
+        interrupted run, are skipped.
+
+        Yields
+        ------
+        Iterator[dict]
+            Records, in write order.
+        """
+
+        for path in self.files():
+            with path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+
+    def truncate(self) -> None:
+        """
+        Remove all files of the stream.
+        """
+
+        self.close()
+
+        for path in self.files():
+            path.unlink()
+
+        self._index = 0
+
+    def close(self) -> None:
+        """
+        Close the current file.
+        """
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def prettify(
+        self, folder: Path = Path("./data/static/out")
+    ) -> Path:
+        """
+        Convert the stream into a single pretty-printed JSON array, record
+        by record, without loading the stream into memory.
+
+        Parameters
+        ----------
+        folder : Path, optional
+            Output folder, by default Path("./data/static/out")
+
+        Returns
+        -------
+        Path
+            Path of the JSON file.
+        """
+
+        path = folder / f"{self.name}.json"
+
+        with path.open("w", encoding="utf-8") as f:
+            f.write("[")
+
+            n = 0
+
+            for n, record in enumerate(self.read(), start=1):
+                f.write(",\n" if n > 1 else "\n")
+                f.write(
+                    indent(
+                        json.dumps(
+                            record, indent=2, ensure_ascii=False
+                        ),
+                        "  ",
+                    )
+                )
+
+            f.write("\n]" if n else "]")
+
+        # Log
+        environ.CONSOLE.log(f"Created JSON dump for '{self.name}'.")
+
+        return path
+
+
+# Open streams, by name
+STREAMS: Dict[str, NDJSONWriter] = dict()
+
+_closed = False
+
+
+def stream(name: str) -> NDJSONWriter:
+    """
+    Get the shared stream of a name, creating it if needed.
+
+    Parameters
+    ----------
+    name : str
+        Name of the stream.
+
+    Returns
+    -------
+    NDJSONWriter
+        NDJSON stream.
+    """
+
+    if name not in STREAMS:
+        STREAMS[name] = NDJSONWriter(name)
+
+    return STREAMS[name]
+
+
+def close() -> None:
+    """
+    Close all streams, and convert them into pretty-printed JSON if
+    PRETTY_JSON is enabled.
+    """
+
+    global _closed
+
+    if _closed:
+        return
+
+    for writer in STREAMS.values():
+        writer.close()
+
+        if environ.PRETTY_JSON:
+            writer.prettify()
+
+    _closed = True
+
+
+atexit.register(close)
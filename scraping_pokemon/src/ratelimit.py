@@ -0,0 +1,507 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+from rich.table import Table
+
+import scraping_pokemon.src.environ as environ
+from scraping_pokemon.src.metrics import METRICS
+from scraping_pokemon.src.types import HostRate
+
+# Responses that signal the host is overloaded, or throttling us
+THROTTLE_STATUSES = {429, 503}
+
+
+class HostBucket:
+    """
+    Token bucket of a single host. Tokens are added at the current rate, up
+    to the burst size, and every request takes one. Waiting requests are
+    served in arrival order.
+
+    The rate is adjusted AIMD-style: every clean response adds
+    increase / rate, so the rate grows by about 'increase' per second of
+    sustained traffic, while a throttled response, a timeout, a failure or
+    a response slower than the latency target multiplies it by 'decrease'.
+    Signals of requests that were already in flight during a decrease are
+    ignored, so a single episode of congestion only decreases the rate
+    once.
+
+    The rate and queue depth are published as the 'rate_limit' and
+    'rate_queue_depth' gauges as they change, together with the peak queue
+    depth; decreases and Retry-After pauses are counted as
+    'rate_decreases' and 'rate_pauses'. All are labeled by host.
+
+    Parameters
+    ----------
+    host : str
+        Host name.
+    rate : float
+        Initial rate, in requests per second.
+    min_rate : float
+        Lower bound of the rate.
+    max_rate : float
+        Upper bound of the rate.
+    burst : float
+        Size of the bucket.
+    increase : float
+        Additive increase, in requests per second per second.
+    decrease : float
+        Multiplicative decrease factor.
+    latency_target : float
+        Latency, in seconds, above which a response signals congestion.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        rate: float,
+        min_rate: float,
+        max_rate: float,
+        burst: float,
+        increase: float,
+        decrease: float,
+        latency_target: float,
+    ) -> None:
+        self.host = host
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = max(1.0, burst)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.decreased_at = 0.0
+
+        # Statistics
+        self.waiting = 0
+        self.waiting_peak = 0
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.requests = 0
+        self.throttled = 0
+        self.failures = 0
+        self.decreases = 0
+
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> float:
+        """
+        Wait for a token.
+
+        Returns
+        -------
+        float
+            Monotonic time the token was taken.
+        """
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        self.waiting += 1
+        self.waiting_peak = max(self.waiting_peak, self.waiting)
+        self._publish()
+
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+
+                    self.tokens = min(
+                        self.burst,
+                        self.tokens + (now - self.updated) * self.rate,
+                    )
+                    self.updated = now
+
+                    if now >= self.paused_until and self.tokens >= 1:
+                        self.tokens -= 1
+
+                        break
+
+                    await asyncio.sleep(
+                        max(
+                            self.paused_until - now,
+                            (1 - self.tokens) / self.rate,
+                        )
+                    )
+        finally:
+            self.waiting -= 1
+            self._publish()
+
+        self.in_flight += 1
+
+        return now
+
+    def record(
+        self,
+        started: float,
+        status: Optional[int] = None,
+        failed: bool = False,
+        retry_after: Optional[float] = None,
+        received: Optional[float] = None,
+    ) -> None:
+        """
+        Record the outcome of a request and adjust the rate.
+
+        Parameters
+        ----------
+        started : float
+            Monotonic time the token of the request was taken.
+        status : Optional[int], optional
+            Status of the response, by default None
+        failed : bool, optional
+            Whether the request timed out or failed, by default False
+        retry_after : Optional[float], optional
+            Seconds the host asked to wait, by default None
+        received : Optional[float], optional
+            Monotonic time the response headers were received; the request
+            is measured until now if omitted, by default None
+        """
+
+        now = time.monotonic()
+        latency = (received or now) - started
+
+        self.in_flight -= 1
+        self.requests += 1
+
+        if failed:
+            self.failures += 1
+        else:
+            self.latency = (
+                latency
+                if self.latency is None
+                else 0.8 * self.latency + 0.2 * latency
+            )
+
+        throttled = status in THROTTLE_STATUSES
+
+        if throttled:
+            self.throttled += 1
+
+            if retry_after:
+                self.paused_until = max(
+                    self.paused_until, now + retry_after
+                )
+
+                METRICS.count("rate_pauses", host=self.host)
+
+        if throttled or failed or latency > self.latency_target:
+            # Requests in flight since the last decrease saw the old rate
+            if started >= self.decreased_at:
+                self.rate = max(
+                    self.min_rate, self.rate * self.decrease
+                )
+                self.tokens = min(self.tokens, 1.0)
+                self.decreased_at = now
+                self.decreases += 1
+
+                if failed:
+                    cause, reason = "failed", "failed"
+                elif throttled:
+                    cause, reason = "throttled", f"status {status}"
+                else:
+                    cause, reason = "latency", f"{latency:.1f}s latency"
+
+                METRICS.count(
+                    "rate_decreases", host=self.host, cause=cause
+                )
+
+                # Log
+                environ.CONSOLE.log(
+                    f"[bold yellow]Rate limit[/bold yellow] '{self.host}': "
+                    f"decreased to {self.rate:.2f} req/s ({reason}).",
+                    level="warning",
+                )
+        else:
+            self.rate = min(
+                self.max_rate, self.rate + self.increase / self.rate
+            )
+
+        self._publish()
+
+    def _publish(self) -> None:
+        """
+        Publish the current rate and queue depth as gauges.
+        """
+
+        METRICS.gauge("rate_limit", self.rate, host=self.host)
+        METRICS.gauge("rate_queue_depth", self.waiting, host=self.host)
+        METRICS.gauge(
+            "rate_queue_depth_peak", self.waiting_peak, host=self.host
+        )
+
+    def stats(self) -> HostRate:
+        """
+        Current rate and statistics of the host.
+
+        Returns
+        -------
+        HostRate
+            Host statistics.
+        """
+
+        return HostRate(
+            host=self.host,
+            rate=self.rate,
+            queue_depth=self.waiting,
+            queue_peak=self.waiting_peak,
+            in_flight=self.in_flight,
+            latency=self.latency,
+            requests=self.requests,
+            throttled=self.throttled,
+            failures=self.failures,
+            decreases=self.decreases,
+        )
+
+
+class Permit:
+    """
+    Permission to send a single request; the response of the request is
+    recorded on it, so its latency excludes reading the body.
+    """
+
+    def __init__(self) -> None:
+        self.status: Optional[int] = None
+        self.retry_after: Optional[float] = None
+        self.received: Optional[float] = None
+
+    def record(
+        self,
+        status: int,
+        headers: Optional[Mapping[str, str]] = None,
+        received: Optional[float] = None,
+    ) -> None:
+        """
+        Record the response of the request.
+
+        Parameters
+        ----------
+        status : int
+            Status of the response.
+        headers : Optional[Mapping[str, str]], optional
+            Headers of the response, for the Retry-After header, by default
+            None
+        received : Optional[float], optional
+            Monotonic time the response headers were received, if recorded
+            later; now if omitted, by default None
+        """
+
+        self.status = status
+        self.received = received or time.monotonic()
+
+        # Header names are lowercase in Playwright, case-insensitive in aiohttp
+        retry_after = (headers or dict()).get("retry-after")
+
+        if retry_after and retry_after.strip().isdigit():
+            self.retry_after = float(retry_after)
+
+
+class RateLimiter:
+    """
+    Per-host politeness scheduler. Every request to a host waits for a
+    token of that host's bucket, and reports its outcome, so the rate of
+    each host converges on the highest rate it sustains without
+    throttling or slowing down.
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        Whether or not to wait for tokens; outcomes are recorded either
+        way, by default RATE_LIMIT
+    rate : float, optional
+        Initial rate of every host, by default RATE_INITIAL
+    min_rate : float, optional
+        Lower bound of the rate, by default RATE_MIN
+    max_rate : float, optional
+        Upper bound of the rate, by default RATE_MAX
+    burst : float, optional
+        Size of the buckets, by default RATE_BURST
+    increase : float, optional
+        Additive increase, by default RATE_INCREASE
+    decrease : float, optional
+        Multiplicative decrease factor, by default RATE_DECREASE
+    latency_target : float, optional
+        Latency above which a response signals congestion, by default
+        RATE_LATENCY_TARGET
+    """
+
+    def __init__(
+        self,
+        enabled: bool = environ.RATE_LIMIT,
+        rate: float = environ.RATE_INITIAL,
+        min_rate: float = environ.RATE_MIN,
+        max_rate: float = environ.RATE_MAX,
+        burst: float = environ.RATE_BURST,
+        increase: float = environ.RATE_INCREASE,
+        decrease: float = environ.RATE_DECREASE,
+        latency_target: float = environ.RATE_LATENCY_TARGET,
+    ) -> None:
+        self.enabled = enabled
+        self.params = dict(
+            rate=rate,
+            min_rate=min_rate,
+            max_rate=max_rate,
+            burst=burst,
+            increase=increase,
+            decrease=decrease,
+            latency_target=latency_target,
+        )
+
+        self.buckets: Dict[str, HostBucket] = dict()
+
+        self._limits = dict(self.params)
+
+    def share(self, shares: int) -> None:
+        """
+        Limit this limiter to an equal share of every host, for when
+        several processes, like shard workers, each with a limiter of their
+        own, request the same hosts. The rates, bounds, burst and additive
+        increase are divided by the amount of shares, so the combined rate
+        of all processes stays within the limits of a single one.
+
+        Parameters
+        ----------
+        shares : int
+            Amount of processes sharing the hosts.
+        """
+
+        shares = max(1, shares)
+
+        # Shares of the initial limits, so sharing again does not compound
+        for name in ["rate", "min_rate", "max_rate", "increase"]:
+            self.params[name] = self._limits[name] / shares
+
+        self.params["burst"] = max(1.0, self._limits["burst"] / shares)
+
+        for host in self.buckets:
+            self.buckets[host] = HostBucket(host, **self.params)
+
+    def bucket(self, url: str) -> HostBucket:
+        """
+        Get the bucket of the host of a URL, creating it if needed.
+
+        Parameters
+        ----------
+        url : str
+            URL to request.
+
+        Returns
+        -------
+        HostBucket
+            Token bucket of the host.
+        """
+
+        host = urlsplit(url).hostname or ""
+
+        if host not in self.buckets:
+            self.buckets[host] = HostBucket(host, **self.params)
+
+        return self.buckets[host]
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[Permit]:
+        """
+        Wait for permission to request a URL. The request is sent within
+        the context, and its response recorded on the permit; exceptions
+        raised within the context are recorded as failed requests.
+
+        Parameters
+        ----------
+        url : str
+            URL to request.
+
+        Yields
+        ------
+        AsyncIterator[Permit]
+            Permit to record the response on.
+        """
+
+        bucket = self.bucket(url)
+
+        if self.enabled:
+            started = await bucket.acquire()
+        else:
+            bucket.in_flight += 1
+            started = time.monotonic()
+
+        permit = Permit()
+
+        try:
+            yield permit
+        except asyncio.CancelledError:
+            bucket.in_flight -= 1
+
+            raise
+        except Exception:
+            bucket.record(started, failed=True)
+
+            raise
+
+        bucket.record(
+            started,
+            status=permit.status,
+            retry_after=permit.retry_after,
+            received=permit.received,
+        )
+
+    def stats(self) -> Dict[str, HostRate]:
+        """
+        Current rate and queue depth of every host.
+
+        Returns
+        -------
+        Dict[str, HostRate]
+            Host statistics, by host.
+        """
+
+        return {
+            host: bucket.stats()
+            for host, bucket in self.buckets.items()
+        }
+
+    def report(self) -> None:
+        """
+        Log the rate, peak queue depth and outcomes of every host. Nothing
+        is queued or in flight once a run is done; the queue depth during
+        the run is published to METRICS.
+        """
+
+        table = Table(title="Rate limits")
+
+        for column in [
+            "Host",
+            "Rate (req/s)",
+            "Peak queued",
+            "Latency (s)",
+            "Requests",
+            "Throttled",
+            "Failed",
+            "Decreases",
+        ]:
+            table.add_column(column)
+
+        for stats in self.stats().values():
+            table.add_row(
+                stats["host"],
+                f"{stats['rate']:.2f}",
+                str(stats["queue_peak"]),
+                "-"
+                if stats["latency"] is None
+                else f"{stats['latency']:.2f}",
+                str(stats["requests"]),
+                str(stats["throttled"]),
+                str(stats["failures"]),
+                str(stats["decreases"]),
+            )
+
+        # Log
+        environ.CONSOLE.log(table)
+
+
+# Shared limiter for all requests of a run
+LIMITER = RateLimiter()
@@ -0,0 +1,311 @@
+import asyncio
+import heapq
+import random
+import time
+import traceback
+from collections import Counter
+from datetime import datetime
+from itertools import count
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    List,
+    Optional,
+    Tuple,
+)
+
+from playwright.async_api import Page
+
+import scraping_pokemon.src.environ as environ
+from scraping_pokemon.src.types import DeadLetter
+
+
+def backoff(
+    attempt: int,
+    base: float = environ.RETRY_BASE_DELAY,
+    cap: float = environ.RETRY_MAX_DELAY,
+) -> float:
+    """
+    Delay before retrying after a failed attempt. The delay doubles with
+    every attempt, up to the cap, and is jittered over its upper half, so
+    pages that failed together are not retried together.
+
+    Parameters
+    ----------
+    attempt : int
+        Amount of failed attempts.
+    base : float, optional
+        Delay after the first attempt, by default RETRY_BASE_DELAY
+    cap : float, optional
+        Upper bound of the delay, by default RETRY_MAX_DELAY
+
+    Returns
+    -------
+    float
+        Delay in seconds.
+    """
+
+    delay = min(cap, base * 2 ** max(0, attempt - 1))
+
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+async def snapshot(
+    page: Optional[Page],
+) -> Coroutine[Any, Any, Awaitable[Optional[str]]]:
+    """
+    Take an HTML snapshot of a page, for the dead-letter table.
+
+    Parameters
+    ----------
+    page : Optional[Page]
+        Playwright Page instance.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[Optional[str]]]
+        HTML of the page, or None if there is no page or it is unusable.
+    """
+
+    if page is None:
+        return None
+
+    try:
+        return await page.content()
+    except Exception:
+        return None
+
+
+def dead_letter(
+    stage: str,
+    url: str,
+    error: BaseException,
+    attempts: int,
+    html: Optional[str] = None,
+) -> DeadLetter:
+    """
+    Build the dead-letter record of a page that kept failing.
+
+    Parameters
+    ----------
+    stage : str
+        Crawl stage of the page.
+    url : str
+        URL of the page.
+    error : BaseException
+        Exception of the last attempt.
+    attempts : int
+        Amount of attempts.
+    html : Optional[str], optional
+        HTML snapshot of the page, by default None
+
+    Returns
+    -------
+    DeadLetter
+        Dead-letter record.
+    """
+
+    return DeadLetter(
+        stage=stage,
+        url=url,
+        attempts=attempts,
+        error=repr(error),
+        traceback="".join(traceback.format_exception(error)),
+        html=html,
+        failed_at=datetime.now().isoformat(),
+    )
+
+
+class RetryQueue:
+    """
+    Deferred retries of the failed pages of a worker pool. A failed page is
+    scheduled after an exponential, jittered backoff instead of being
+    retried right away, so the workers keep scraping healthy pages in the
+    meantime. Once a page failed RETRY_ATTEMPTS times, it is dead-lettered
+    with its exception and HTML snapshot.
+
+    Workers take due retries before new pages, and wait for the remaining
+    retries once their own source of pages is exhausted. Since a failed page
+    is scheduled by a worker that is still running, every retry is taken.
+
+    Parameters
+    ----------
+    stage : str
+        Crawl stage of the pages.
+    attempts : int, optional
+        Amount of attempts per page, by default RETRY_ATTEMPTS
+    sink : Optional[Callable[[DeadLetter], Any]], optional
+        Receiver of the dead-letter records, by default None
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        attempts: int = environ.RETRY_ATTEMPTS,
+        sink: Optional[Callable[[DeadLetter], Any]] = None,
+    ) -> None:
+        self.stage = stage
+        self.attempts = max(1, attempts)
+        self.sink = sink
+
+        self.failures: Counter = Counter()
+
+        self._heap: List[Tuple[float, int, Any]] = list()
+        self._order = count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    async def failed(
+        self,
+        item: Any,
+        url: str,
+        error: BaseException,
+        page: Optional[Page] = None,
+    ) -> Coroutine[Any, Any, Awaitable[Optional[DeadLetter]]]:
+        """
+        Record a failed attempt of a page; schedule a retry, or dead-letter
+        the page if it ran out of attempts.
+
+        Parameters
+        ----------
+        item : Any
+            Work item of the page, handed back once the retry is due.
+        url : str
+            URL of the page.
+        error : BaseException
+            Exception of the attempt.
+        page : Optional[Page], optional
+            Playwright Page instance the attempt ran on, for the HTML
+            snapshot, by default None
+
+        Returns
+        -------
+        Coroutine[Any, Any, Awaitable[Optional[DeadLetter]]]
+            Dead-letter record, or None if a retry was scheduled.
+        """
+
+        self.failures[url] += 1
+        attempt = self.failures[url]
+
+        if attempt < self.attempts:
+            delay = backoff(attempt)
+
+            heapq.heappush(
+                self._heap,
+                (time.monotonic() + delay, next(self._order), item),
+            )
+
+            # Log
+            environ.CONSOLE.log(
+                f"[bold yellow]Retrying[/bold yellow] in {delay:.1f}s "
+                f"({attempt}/{self.attempts}): '{url}' ({error!r})",
+                level="warning",
+            )
+
+            return None
+
+        record = dead_letter(
+            self.stage, url, error, attempt, await snapshot(page)
+        )
+
+        if self.sink is not None:
+            self.sink(record)
+
+        # Log
+        environ.CONSOLE.log(
+            f"[bold red]Dead-lettered[/bold red] after {attempt} attempts: '{url}' ({error!r})",
+            level="error",
+        )
+
+        return record
+
+    def due(self) -> Optional[Any]:
+        """
+        Take the earliest retry, if it is due.
+
+        Returns
+        -------
+        Optional[Any]
+            Work item, or None if no retry is due.
+        """
+
+        if self._heap and self._heap[0][0] <= time.monotonic():
+            return heapq.heappop(self._heap)[2]
+
+        return None
+
+    async def wait(
+        self,
+    ) -> Coroutine[Any, Any, Awaitable[Optional[Any]]]:
+        """
+        Wait for the earliest retry to be due, and take it.
+
+        Returns
+        -------
+        Coroutine[Any, Any, Awaitable[Optional[Any]]]
+            Work item, or None if no retries are scheduled.
+        """
+
+        while self._heap:
+            item = self.due()
+
+            if item is not None:
+                return item
+
+            await asyncio.sleep(
+                max(0.0, self._heap[0][0] - time.monotonic())
+            )
+
+        return None
+
+
+async def retrying(
+    operation: Callable[[], Awaitable[Any]],
+    url: str,
+    attempts: int = environ.RETRY_ATTEMPTS,
+) -> Coroutine[Any, Any, Awaitable[Any]]:
+    """
+    Run the operation of a single page, retrying it after an exponential,
+    jittered backoff. For pages that run as their own task, where waiting
+    does not hold up other pages.
+
+    Parameters
+    ----------
+    operation : Callable[[], Awaitable[Any]]
+        Operation to attempt.
+    url : str
+        URL of the page, for logging.
+    attempts : int, optional
+        Amount of attempts, by default RETRY_ATTEMPTS
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[Any]]
+        Result of the operation.
+
+    Raises
+    ------
+    Exception
+        The exception of the last attempt, if all attempts failed.
+    """
+
+    for attempt in range(1, max(1, attempts) + 1):
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt >= attempts:
+                raise
+
+            delay = backoff(attempt)
+
+            # Log
+            environ.CONSOLE.log(
+                f"[bold yellow]Retrying[/bold yellow] in {delay:.1f}s "
+                f"({attempt}/{attempts}): '{url}' ({e!r})",
+                level="warning",
+            )
+
+            await asyncio.sleep(delay)
@@ -0,0 +1,216 @@
+import weakref
+from collections import Counter
+from typing import Any, Awaitable, Coroutine, List, Optional
+from urllib.parse import urlsplit
+
+from playwright.async_api import Page, Request, Route
+
+import scraping_pokemon.src.environ as environ
+from scraping_pokemon.src.cache import RESPONSE_CACHE, ResponseCache
+from scraping_pokemon.src.ratelimit import LIMITER
+
+
+class RoutePolicy:
+    """
+    Request interception policy for Playwright pages. Requests are blocked
+    by resource type, URL pattern, or for being third-party, and the
+    blocked requests are counted per run. Documents that are not blocked
+    are served through the response cache, if provided.
+
+    Bytes saved are not reported: blocked requests are aborted before a
+    response, so their size is never known.
+
+    Parameters
+    ----------
+    resource_types : List[str], optional
+        Playwright resource types to block, by default BLOCK_RESOURCE_TYPES
+    url_patterns : List[str], optional
+        Substrings of URLs to block, by default BLOCK_URL_PATTERNS
+    block_third_party : bool, optional
+        Whether or not to block requests to hosts other than URL_ROOT and
+        its subdomains, by default BLOCK_THIRD_PARTY
+    blocking : bool, optional
+        Whether or not to block requests at all, by default ROUTE_BLOCKING
+    cache : Optional[ResponseCache], optional
+        Response cache for documents, by default None
+    """
+
+    def __init__(
+        self,
+        resource_types: List[str] = environ.BLOCK_RESOURCE_TYPES,
+        url_patterns: List[str] = environ.BLOCK_URL_PATTERNS,
+        block_third_party: bool = environ.BLOCK_THIRD_PARTY,
+        blocking: bool = environ.ROUTE_BLOCKING,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
+        self.resource_types = set(resource_types)
+        self.url_patterns = list(url_patterns)
+        self.block_third_party = block_third_party
+        self.first_party = urlsplit(environ.URL_ROOT).hostname or ""
+        self.blocking = blocking
+        self.cache = cache
+
+        # Statistics
+        self.blocked: Counter = Counter()
+        self.blocked_types: Counter = Counter()
+
+        self._pages: weakref.WeakSet = weakref.WeakSet()
+
+    async def install(
+        self, page: Page
+    ) -> Coroutine[Any, Any, Awaitable[None]]:
+        """
+        Install the policy on a page. Pages that already have the policy
+        installed are skipped.
+
+        Parameters
+        ----------
+        page : Page
+            Playwright Page instance.
+        """
+
+        if page in self._pages:
+            return
+
+        await page.route("**/*", self.handle)
+
+        self._pages.add(page)
+
+    def reason(self, request: Request) -> Optional[str]:
+        """
+        Determine whether, and why, a request should be blocked.
+
+        Parameters
+        ----------
+        request : Request
+            Playwright Request instance.
+
+        Returns
+        -------
+        Optional[str]
+            Reason for blocking the request, or None if it is allowed.
+        """
+
+        if request.resource_type in self.resource_types:
+            return request.resource_type
+
+        if any(pattern in request.url for pattern in self.url_patterns):
+            return "pattern"
+
+        if self.block_third_party:
+            host = urlsplit(request.url).hostname or ""
+
+            if host and not (
+                host == self.first_party
+                or host.endswith(f".{self.first_party}")
+            ):
+                return "third-party"
+
+        return None
+
+    async def handle(
+        self, route: Route
+    ) -> Coroutine[Any, Any, Awaitable[None]]:
+        """
+        Route handler; aborts blocked requests, serves documents through
+        the response cache and continues all others.
+
+        Parameters
+        ----------
+        route : Route
+            Playwright Route instance.
+        """
+
+        request = route.request
+        reason = self.reason(request) if self.blocking else None
+
+        if reason is not None:
+            self.blocked[reason] += 1
+            self.blocked_types[request.resource_type] += 1
+
+            await route.abort("blockedbyclient")
+        elif (
+            self.cache
+            and request.resource_type == "document"
+            and request.method == "GET"
+        ):
+            await self._handle_cached(route)
+        else:
+            await route.continue_()
+
+    async def _handle_cached(
+        self, route: Route
+    ) -> Coroutine[Any, Any, Awaitable[None]]:
+        """
+        Fulfill a request from the response cache, revalidating stale
+        entries with a conditional request. Requests that reach the host
+        wait for its rate limiter.
+
+        Parameters
+        ----------
+        route : Route
+            Playwright Route instance.
+        """
+
+        url = route.request.url
+        entry = self.cache.lookup(url)
+
+        if entry and self.cache.is_fresh(entry):
+            return await route.fulfill(
+                status=200,
+                content_type=entry["content_type"],
+                path=self.cache.hit(entry),
+            )
+
+        if self.cache.offline:
+            return await route.abort("internetdisconnected")
+
+        async with LIMITER.slot(url) as permit:
+            response = await route.fetch(
+                headers={
+                    **route.request.headers,
+                    **self.cache.conditional_headers(entry),
+                }
+            )
+
+            permit.record(response.status, response.headers)
+
+        if response.status == 304 and entry:
+            return await route.fulfill(
+                status=200,
+                content_type=entry["content_type"],
+                path=self.cache.hit(entry, revalidated=True),
+            )
+
+        body = await response.body()
+
+        if response.status == 200:
+            await self.cache.store(url, body, response.headers)
+
+        await route.fulfill(response=response, body=body)
+
+    def report(self) -> None:
+        """
+        Log the blocked request counts, by reason and by resource type.
+        """
+
+        reasons = ", ".join(
+            f"{reason}: {count}"
+            for reason, count in self.blocked.items()
+        )
+        resource_types = ", ".join(
+            f"{resource_type}: {count}"
+            for resource_type, count in self.blocked_types.items()
+        )
+
+        # Log
+        environ.CONSOLE.log(
+            f"Blocked [b]{sum(self.blocked.values())}[/b] requests ({reasons or 'none'}); "
+            f"by resource type: {resource_types or 'none'}."
+        )
+
+
+# Shared policy for all pages of a run
+ROUTE_POLICY = RoutePolicy(
+    cache=RESPONSE_CACHE if environ.CACHE_ENABLED else None
+)
@@ -1,3 +1,25 @@
-from .coro_main import main_coroutine
+from importlib import import_module
+from typing import Any
 
-__all__ = ["main_coroutine"]
+__all__ = ["main_coroutine", "main_coroutine_http"]
+
+# Entrypoint coroutines, by the module defining them
+_COROUTINES = dict(
+    main_coroutine=".coro_main",
+    main_coroutine_http=".coro_http",
+)
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Import the entrypoint coroutines on first access. Importing a scraping
+    module, e.g. in a shard worker process, then does not open the
+    database through the entrypoint modules.
+    """
+
+    if name in _COROUTINES:
+        return getattr(import_module(_COROUTINES[name], __name__), name)
+
+    raise AttributeError(
+        f"module {__name__!r} has no attribute {name!r}"
+    )
@@ -3,6 +3,7 @@ from urllib.parse import urljoin
 
 from playwright.async_api import Locator, Page, expect
 
+from ..database.crawl_state import journal
 from ..database.db import table_generations
 from ..environ import CONSOLE
 
@@ -29,6 +30,12 @@ async def get_generation_urls(
     # Log
     CONSOLE.log("Scraping [b]generation URL[/b] data...")
 
+    # Resume
+    if journal.generations is not None:
+        CONSOLE.log("Resumed [b]generation URL[/b] data from journal.")
+
+        return journal.generations
+
     # Storage
     db_urls_generations: List[str] = list()
 
@@ -51,4 +58,8 @@ async def get_generation_urls(
         # Insert into db
         table_generations.insert(dict(generation_url=record))
 
+    # Journal, once the records are written
+    table_generations.flush()
+    journal.record("generations", urls=db_urls_generations)
+
     return db_urls_generations
@@ -0,0 +1,775 @@
+import asyncio
+import re
+from functools import partial
+from typing import (
+    Any,
+    Awaitable,
+    Coroutine,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+from unicodedata import normalize
+from urllib.parse import urljoin
+
+import aiofiles
+import aiohttp
+from playwright.async_api import async_playwright
+from selectolax.parser import HTMLParser, Node
+
+import scraping_pokemon.src.utils as utils
+
+from .. import export, output
+from ..browser_server import launch_browser, new_context
+from ..database import db
+from ..database.crawl_state import journal
+from ..database.db import (
+    table_cards_data,
+    table_cards_img,
+    table_dead_letter,
+    table_generations,
+    table_pokedex,
+)
+from ..cache import RESPONSE_CACHE
+from ..downloader import ImageDownloader
+from ..environ import (
+    CACHE_ENABLED,
+    CONSOLE,
+    ENTRYPOINT,
+    EXPORT_COLUMNAR,
+    HTTP_CONCURRENCY,
+    HTTP_FALLBACK,
+    LIMIT_CARDS,
+    LIMIT_POKEDEX,
+    PAGE_TIMEOUT,
+    RETRY_ATTEMPTS,
+    URL_ROOT,
+)
+from ..metrics import METRICS
+from ..ratelimit import LIMITER
+from ..retry import dead_letter, retrying
+from ..screenshots import SCREENSHOTS
+from ..sprites import SPRITE_STORE
+from ..types import VitalsRow
+from . import parsers
+from .coro_pokemon_details import (
+    get_pokemon_details,
+    persist_pokemon,
+    resumed_pokemon,
+)
+
+# Collapses whitespace like a browser does for rendered text
+_RE_WHITESPACE = re.compile(r"\s+")
+
+
+async def main_coroutine_http() -> Coroutine[Any, Any, Awaitable[None]]:
+    """
+    Main coroutine for the browserless scraping engine. Pages are fetched
+    over a pooled HTTP client and parsed with an HTML parser, producing the
+    same records as the Playwright coroutines.
+    """
+
+    # Open pooled session
+    CONSOLE.rule("[b]HTTP client & target[/b]")
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_CONCURRENCY, limit_per_host=HTTP_CONCURRENCY
+    )
+    timeout = aiohttp.ClientTimeout(total=PAGE_TIMEOUT / 1000)
+
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=timeout
+    ) as session:
+        CONSOLE.log("HTTP client started! 😸")
+
+        # Start background image downloader
+        downloader = ImageDownloader()
+        await downloader.start()
+
+        # Follow entrypoint URL
+        tree = await fetch_html(session, ENTRYPOINT)
+
+        # Get Pokédex URLs
+        CONSOLE.rule("[b]Pokédex URLs[/b]")
+        urls_pokedex: List[str] = http_get_pokedex_urls(tree)
+        CONSOLE.log("Scraped and stored [b]Pokédex URL[/b] data.")
+
+        # Get generation URLs
+        CONSOLE.rule("[b]Generation URLs[/b]")
+        http_get_generation_urls(tree, urls_pokedex)
+        CONSOLE.log("Scraped and stored [b]generation URL[/b] data.")
+
+        # Data Pokédex cards
+        CONSOLE.rule("[b]Pokédex cards[/b]")
+        (
+            data_pokedex_cards_img,
+            data_pokedex_cards_data,
+        ) = await http_get_pokedex_cards(session, urls_pokedex)
+        CONSOLE.log(
+            "Scraped and stored [b]Pokédex cards image data[/b] and [b]Pokédex cards data[/b]."
+        )
+
+        # Get Pokémon details
+        CONSOLE.rule("[b]Pokémon details[/b]")
+        await http_get_pokemon_details(
+            session, data_pokedex_cards_img, downloader
+        )
+        CONSOLE.log("Scraped and stored [b]Pokémon details data[/b].")
+
+        # Flush pending image downloads
+        CONSOLE.rule("[b]Teardown[/b]")
+        await downloader.drain()
+        await SCREENSHOTS.drain()
+
+        # Write buffered records and close the NDJSON streams
+        db.flush()
+        output.close()
+
+        # Export typed columns
+        if EXPORT_COLUMNAR:
+            export.export_tables()
+
+        # Report cache and sprite store usage, and rate limits
+        if CACHE_ENABLED:
+            RESPONSE_CACHE.report()
+
+        SPRITE_STORE.report()
+        LIMITER.report()
+
+        # Report and write stage metrics
+        if METRICS.enabled:
+            METRICS.report()
+            METRICS.write()
+
+    # Dump console logs
+    for _type in ["svg", "html"]:
+        await utils.dump_console_recording(
+            title="console_log", type=_type
+        )
+
+
+async def fetch_html(
+    session: aiohttp.ClientSession, url: str
+) -> Coroutine[Any, Any, Awaitable[HTMLParser]]:
+    """
+    Fetch and parse an HTML page, through the response cache if
+    CACHE_ENABLED. Requests wait for the rate limiter of their host.
+
+    Parameters
+    ----------
+    session : aiohttp.ClientSession
+        Pooled HTTP session.
+    url : str
+        URL of the page.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[HTMLParser]]
+        Parsed HTML document.
+    """
+
+    with METRICS.span("fetch_html"):
+        if CACHE_ENABLED:
+            path = await RESPONSE_CACHE.fetch(session, url)
+
+            if path is None:
+                raise aiohttp.ClientError(f"Failed to fetch: {url}")
+
+            async with aiofiles.open(path, "rb") as f:
+                html = await f.read()
+        else:
+            async with LIMITER.slot(url) as permit, session.get(
+                url
+            ) as res:
+                permit.record(res.status, res.headers)
+                res.raise_for_status()
+                html = await res.read()
+
+    # Log
+    CONSOLE.log(f"Fetched: {url}", level="debug")
+
+    return HTMLParser(html)
+
+
+def inner_text(node: Node) -> str:
+    """
+    Approximate the rendered inner text of an element: whitespace is
+    collapsed, line breaks become newlines and table cells are separated by
+    tabs.
+
+    Parameters
+    ----------
+    node : Node
+        Parsed HTML element.
+
+    Returns
+    -------
+    str
+        Inner text of the element.
+    """
+
+    if node.tag == "tr":
+        return "\t".join(
+            inner_text(cell)
+            for cell in node.iter()
+            if cell.tag in ("th", "td")
+        ).strip()
+
+    parts: List[str] = list()
+    _collect_text(node, parts)
+
+    return "\n".join(
+        line.strip() for line in "".join(parts).split("\n")
+    ).strip()
+
+
+def extract_vitals(main: Node) -> Dict[str, List[VitalsRow]]:
+    """
+    Extract the vitals tables of a detail page in a single pass, keyed by
+    the section of the heading preceding them. Only the first table of
+    every section is kept; the selectolax equivalent of the browser-side
+    extraction of the Playwright engine.
+
+    Parameters
+    ----------
+    main : Node
+        Main element of the detail page.
+
+    Returns
+    -------
+    Dict[str, List[VitalsRow]]
+        Rows of the first table of every section.
+    """
+
+    tables: Dict[str, List[VitalsRow]] = dict()
+    section: Optional[str] = None
+
+    for node in _headings_and_tables(main):
+        if node.tag == "h2":
+            section = parsers.VITALS_PARSER.section_of(inner_text(node))
+        elif (
+            section is not None
+            and section not in tables
+            and "vitals-table"
+            in (node.attributes.get("class") or "").split()
+        ):
+            tables[section] = rows = list()
+
+            for row in node.css("tr"):
+                cells = [c for c in row.iter() if c.tag in ("th", "td")]
+
+                # Rows are keyed by their header label
+                if cells and cells[0].tag == "th":
+                    rows.append(
+                        (
+                            inner_text(cells[0]),
+                            [
+                                inner_text(cell)
+                                for cell in cells[1:]
+                                if cell.tag == "td"
+                            ],
+                        )
+                    )
+
+    return tables
+
+
+def _headings_and_tables(node: Node) -> Iterator[Node]:
+    """
+    Yield the 'h2' and 'table' descendants of an element in document order,
+    which CSS selector lists do not keep. Tables are not descended into.
+
+    Parameters
+    ----------
+    node : Node
+        Parsed HTML element.
+
+    Yields
+    ------
+    Iterator[Node]
+        Headings and tables.
+    """
+
+    for child in node.iter():
+        if child.tag in ("h2", "table"):
+            yield child
+        else:
+            yield from _headings_and_tables(child)
+
+
+def _collect_text(node: Node, parts: List[str]) -> None:
+    """
+    Recursively collect the text of an element and its descendants, in
+    document order.
+
+    Parameters
+    ----------
+    node : Node
+        Parsed HTML element.
+    parts : List[str]
+        Storage for the collected text fragments.
+    """
+
+    for child in node.iter(include_text=True):
+        if child.tag == "-text":
+            parts.append(
+                _RE_WHITESPACE.sub(" ", child.text(deep=False))
+            )
+        elif child.tag == "br":
+            parts.append("\n")
+        else:
+            _collect_text(child, parts)
+
+
+def http_get_pokedex_urls(tree: HTMLParser) -> List[str]:
+    """
+    Parse the Pokédex URLs from the Pokédex index.
+
+    Parameters
+    ----------
+    tree : HTMLParser
+        Parsed Pokédex index.
+
+    Returns
+    -------
+    List[str]
+        List containing scraped Pokédex URLs.
+    """
+
+    # Log
+    CONSOLE.log("Scraping [b]Pokédex URL[/b] data...")
+
+    # Resume
+    if journal.pokedex_index is not None:
+        CONSOLE.log("Resumed [b]Pokédex URL[/b] data from journal.")
+
+        return journal.pokedex_index
+
+    # Storage
+    db_urls_pokedex: List[str] = list()
+
+    # Locate Pokédexes list
+    lists = [
+        node
+        for node in tree.css("main nav *")
+        if node.tag in ("ul", "ol")
+    ]
+
+    # Extract and compile URLs
+    for li in lists[1].css("li"):
+        a = li.css_first("a[href]")
+
+        if a is None:
+            continue
+
+        pokedex: str = urljoin(URL_ROOT, a.attributes["href"])
+
+        # Add to storage
+        db_urls_pokedex.append(pokedex)
+
+        # Insert into db
+        table_pokedex.insert(dict(pokedex_url=pokedex))
+
+    # Journal, once the records are written
+    table_pokedex.flush()
+    journal.record("pokedex_index", urls=db_urls_pokedex)
+
+    return db_urls_pokedex
+
+
+def http_get_generation_urls(
+    tree: HTMLParser, urls_pokedex: List[str]
+) -> List[str]:
+    """
+    Parse the generation URLs from the Pokédex index.
+
+    Parameters
+    ----------
+    tree : HTMLParser
+        Parsed Pokédex index.
+    urls_pokedex : List[str]
+        List containing Pokédex target URLs.
+
+    Returns
+    -------
+    List[str]
+        List containing generation URLs.
+    """
+
+    # Log
+    CONSOLE.log("Scraping [b]generation URL[/b] data...")
+
+    # Resume
+    if journal.generations is not None:
+        CONSOLE.log("Resumed [b]generation URL[/b] data from journal.")
+
+        return journal.generations
+
+    # Storage
+    db_urls_generations: List[str] = list()
+
+    main = tree.css_first("main")
+
+    # Extract and compile URLs of links within lists
+    for a in main.css("a[href]"):
+        parent = a.parent
+
+        while parent is not None and parent.tag not in ("ul", "ol"):
+            parent = None if parent.tag == "main" else parent.parent
+
+        if parent is None:
+            continue
+
+        record = urljoin(urls_pokedex[0], a.attributes["href"])
+
+        # Add to storage
+        db_urls_generations.append(record)
+
+        # Insert into db
+        table_generations.insert(dict(generation_url=record))
+
+    # Journal, once the records are written
+    table_generations.flush()
+    journal.record("generations", urls=db_urls_generations)
+
+    return db_urls_generations
+
+
+async def http_get_pokedex_cards(
+    session: aiohttp.ClientSession, urls_pokedex: List[str]
+) -> Coroutine[Any, Any, Awaitable[Tuple[List[dict], List[dict]]]]:
+    """
+    Fetch and parse the Pokédex cards. Pages that fail to fetch or parse
+    are retried after a backoff, and dead-lettered once they run out of
+    attempts.
+
+    Parameters
+    ----------
+    session : aiohttp.ClientSession
+        Pooled HTTP session.
+    urls_pokedex : List[str]
+        List containing Pokédex target URLs.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[Tuple[List[dict], List[dict]]]]
+        Tuple containing two dictionaries for respectively the scraped Pokédex
+        card image data and Pokédex card data.
+    """
+
+    # Log
+    CONSOLE.log("Scraping [b]Pokédex cards[/b] data...")
+
+    # Storage
+    db_pokedex_card_image: List[dict] = list()
+    db_pokedex_card_data: List[dict] = list()
+
+    # Pokédex limit
+    if LIMIT_POKEDEX > 0:
+        urls_pokedex = urls_pokedex[:LIMIT_POKEDEX]
+
+        CONSOLE.log(
+            f"[bold red]LIMIT[/bold red]: 'urls_pokedex' - {LIMIT_POKEDEX} records"
+        )
+
+    # Resume
+    urls_fetch = [
+        url for url in urls_pokedex if url not in journal.pokedex_pages
+    ]
+
+    async def _attempt(url: str) -> Tuple[List[dict], List[dict]]:
+        return parse_pokedex_cards(await fetch_html(session, url))
+
+    async def _fetch(
+        url: str,
+    ) -> Optional[Tuple[List[dict], List[dict]]]:
+        try:
+            return await retrying(partial(_attempt, url), url)
+        except Exception as e:
+            table_dead_letter.insert(
+                dead_letter("pokedex", url, e, RETRY_ATTEMPTS)
+            )
+
+            # Log
+            CONSOLE.log(
+                f"[bold red]Dead-lettered[/bold red]: '{url}' ({e!r})",
+                level="error",
+            )
+
+            return None
+
+    pages: List[
+        Optional[Tuple[List[dict], List[dict]]]
+    ] = await asyncio.gather(*[_fetch(url) for url in urls_fetch])
+    pages_by_url = dict(zip(urls_fetch, pages))
+
+    for url in urls_pokedex:
+        if url in journal.pokedex_pages:
+            cards_img, cards_data = journal.pokedex_pages[url]
+
+            db_pokedex_card_image.extend(cards_img)
+            db_pokedex_card_data.extend(cards_data)
+
+            CONSOLE.log(
+                f"Resumed [b]Pokédex cards[/b] from journal: {url}"
+            )
+
+            continue
+
+        if pages_by_url[url] is None:
+            continue
+
+        cards_img, cards_data = pages_by_url[url]
+
+        for db_card_image, db_card_data in zip(cards_img, cards_data):
+            # Insert into db
+            table_cards_img.insert(dict(card_image=db_card_image))
+            table_cards_data.insert(dict(card_data=db_card_data))
+
+        db_pokedex_card_image.extend(cards_img)
+        db_pokedex_card_data.extend(cards_data)
+
+        # Journal, once the records are written
+        table_cards_img.flush()
+        table_cards_data.flush()
+        journal.record(
+            "pokedex_page",
+            url=url,
+            cards_img=cards_img,
+            cards_data=cards_data,
+        )
+
+        # Log
+        CONSOLE.log(
+            f"Extracted [b]card image data[/b] and [b]card data[/b] for {len(cards_data)} cards."
+        )
+
+    return db_pokedex_card_image, db_pokedex_card_data
+
+
+def parse_pokedex_cards(
+    tree: HTMLParser,
+) -> Tuple[List[dict], List[dict]]:
+    """
+    Parse the cards of a Pokédex page. Raises if the page lacks the
+    Pokémon grid or a card lacks its link or number, so the page is
+    retried and dead-lettered like a failed fetch.
+
+    Parameters
+    ----------
+    tree : HTMLParser
+        Parsed Pokédex page.
+
+    Returns
+    -------
+    Tuple[List[dict], List[dict]]
+        Tuple containing the card image data and card data.
+    """
+
+    cards_img: List[dict] = list()
+    cards_data: List[dict] = list()
+
+    # Pokémon grid
+    container = tree.css_first(".infocard-list")
+
+    if container is None:
+        raise ValueError("Pokémon grid '.infocard-list' not found")
+
+    card_img_data_all = container.css(".infocard-lg-img")
+    card_data_all = container.css(".infocard-lg-data")
+
+    # Card limit
+    if LIMIT_CARDS > 0:
+        card_img_data_all = card_img_data_all[:LIMIT_CARDS]
+        card_data_all = card_data_all[:LIMIT_CARDS]
+
+    for card_image, card_data in zip(card_img_data_all, card_data_all):
+        # Extract card image data
+        link = card_image.css_first("a[href]")
+        img = card_image.css_first("img")
+
+        if link is None:
+            raise ValueError("Card without a link to its detail page")
+
+        db_card_image = dict(
+            url=[urljoin(URL_ROOT, link.attributes["href"])],
+            img_src=[img.attributes.get("src") if img else None],
+            img_alt=[img.attributes.get("alt") if img else None],
+        )
+
+        # Extract card data
+        small = card_data.css("small")
+
+        if not small:
+            raise ValueError("Card without a Pokédex number")
+
+        db_card_data = dict(
+            number=[inner_text(small[0])],
+            types=[
+                [inner_text(t) for t in small[1].css("a[href]")]
+                if len(small) > 1
+                else []
+            ],
+        )
+
+        # Add to storage
+        cards_img.append(db_card_image)
+        cards_data.append(db_card_data)
+
+    return cards_img, cards_data
+
+
+async def http_get_pokemon_details(
+    session: aiohttp.ClientSession,
+    data_pokedex_cards_img: List[dict],
+    downloader: Optional[ImageDownloader] = None,
+) -> Coroutine[Any, Any, Awaitable[List[dict]]]:
+    """
+    Fetch and parse the Pokémon detail pages concurrently, bounded by
+    HTTP_CONCURRENCY. Failed pages are retried after a backoff, without
+    holding a slot. With HTTP_FALLBACK enabled, pages that keep failing are
+    scraped through Playwright afterwards; otherwise, they are
+    dead-lettered.
+
+    Parameters
+    ----------
+    session : aiohttp.ClientSession
+        Pooled HTTP session.
+    data_pokedex_cards_img : List[dict]
+        Scraped Pokédex card image data.
+    downloader : Optional[ImageDownloader], optional
+        Background image downloader, by default None
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[List[dict]]]
+        Scraped Pokémon details, in the order of the provided card data.
+    """
+
+    # Log
+    CONSOLE.log("Scraping [b]Pokémon details[/b] data...")
+
+    # Resume; completed pages are skipped if their key is in the database
+    completed = resumed_pokemon()
+    semaphore = asyncio.Semaphore(HTTP_CONCURRENCY)
+
+    async def _bounded(card: dict) -> Optional[dict]:
+        key = journal.details.get(card["url"][0])
+
+        if key in completed:
+            return completed[key]
+
+        async def _attempt() -> dict:
+            async with semaphore:
+                return await _http_scrape_pokemon(
+                    session,
+                    card["url"][0],
+                    card["img_src"][0],
+                    downloader,
+                )
+
+        try:
+            return await retrying(_attempt, card["url"][0])
+        except Exception as e:
+            # Log
+            CONSOLE.log(
+                f"[bold red]Failed[/bold red]: '{card['url'][0]}' ({e!r})",
+                level="error",
+            )
+
+            if not HTTP_FALLBACK:
+                table_dead_letter.insert(
+                    dead_letter(
+                        "details", card["url"][0], e, RETRY_ATTEMPTS
+                    )
+                )
+
+            return None
+
+    db_pokemon: List[Optional[dict]] = await asyncio.gather(
+        *[_bounded(card) for card in data_pokedex_cards_img]
+    )
+
+    # Playwright fallback
+    failed = [
+        idx for idx, pokemon in enumerate(db_pokemon) if not pokemon
+    ]
+
+    if failed:
+        # Log
+        CONSOLE.log(
+            f"Falling back to [b]Playwright[/b] for {len(failed)} Pokémon..."
+        )
+
+        async with async_playwright() as backend:
+            browser, _ = await launch_browser(backend)
+
+            try:
+                context = await new_context(browser)
+                page = await context.new_page()
+
+                recovered = await get_pokemon_details(
+                    page,
+                    [data_pokedex_cards_img[idx] for idx in failed],
+                    downloader,
+                )
+            finally:
+                await browser.close()
+
+        for idx, pokemon in zip(failed, recovered):
+            db_pokemon[idx] = pokemon
+
+    return db_pokemon
+
+
+async def _http_scrape_pokemon(
+    session: aiohttp.ClientSession,
+    url_pokemon: str,
+    url_img_src: str,
+    downloader: Optional[ImageDownloader] = None,
+) -> Coroutine[Any, Any, Awaitable[dict]]:
+    """
+    Fetch and parse a single Pokémon detail page and insert it into the
+    database.
+
+    Parameters
+    ----------
+    session : aiohttp.ClientSession
+        Pooled HTTP session.
+    url_pokemon : str
+        URL of the Pokémon detail page.
+    url_img_src : str
+        Direct URL to the Pokémon image.
+    downloader : Optional[ImageDownloader], optional
+        Background image downloader, by default None
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[dict]]
+        Scraped Pokémon details.
+    """
+
+    tree = await fetch_html(session, url_pokemon)
+
+    with METRICS.span("extract_pokemon"):
+        main = tree.css_first("main")
+
+        # Fetch name and description
+        name = normalize(
+            "NFKC", inner_text(main.css_first("h1, h2, h3, h4, h5, h6"))
+        )
+        description = normalize("NFKC", inner_text(main.css_first("p")))
+
+        # Log
+        CONSOLE.log(f"Processing: [b]{name}[/b]...", level="debug")
+
+        # Extract vitals tables
+        tables = extract_vitals(main)
+
+    # Parse
+    pokemon = await parsers.parse_pokemon(name, description, tables)
+
+    return await persist_pokemon(
+        pokemon, url_pokemon, url_img_src, downloader, session
+    )
@@ -1,14 +1,42 @@
 from typing import Any, Awaitable, Coroutine, List
 
-from playwright.async_api import Browser, Page, Playwright
+from playwright.async_api import (
+    Browser,
+    BrowserContext,
+    Page,
+    Playwright,
+)
 
 import scraping_pokemon.src.utils as utils
 
-from ..environ import CONSOLE, ENTRYPOINT, FIREFOX_PARAMS
+from .. import export, output
+from ..browser_server import launch_browser, new_context, save_state
+from ..cache import RESPONSE_CACHE
+from ..database import db
+from ..downloader import ImageDownloader
+from ..environ import (
+    BROWSER_SERVER,
+    CACHE_ENABLED,
+    CONSOLE,
+    ENTRYPOINT,
+    EXPORT_COLUMNAR,
+    PIPELINE,
+    ROUTE_BLOCKING,
+    SHARDS,
+    WORK_QUEUE,
+)
+from ..metrics import METRICS
+from ..ratelimit import LIMITER
+from ..routing import ROUTE_POLICY
+from ..screenshots import SCREENSHOTS
+from ..sprites import SPRITE_STORE
 from .coro_generations import get_generation_urls
 from .coro_pokedex_cards import get_pokedex_cards
 from .coro_pokedex_urls import get_pokedex_urls
 from .coro_pokemon_details import get_pokemon_details
+from .pipeline import run_pipeline
+from .queue_worker import run_queue_worker
+from .sharding import get_pokemon_details_sharded
 
 
 async def main_coroutine(
@@ -25,56 +53,127 @@ async def main_coroutine(
 
     # Launch browser and navigate
     CONSOLE.rule("[b]Browser & target[/b]")
-    browser: Browser = await backend.firefox.launch(**FIREFOX_PARAMS)
-    CONSOLE.log("Browser started! 😸")
+    browser: Browser
+    browser, connected = await launch_browser(backend)
+    context: BrowserContext = await new_context(browser)
+    CONSOLE.log(
+        "Browser connected! 😸" if connected else "Browser started! 😸"
+    )
+
+    # Start background image downloader
+    downloader = ImageDownloader()
+    await downloader.start()
 
     # Follow entrypoint URL
-    page: Page = await utils.navigate(url=ENTRYPOINT, browser=browser)
+    page: Page = await utils.navigate(
+        url=ENTRYPOINT, page=await context.new_page()
+    )
     CONSOLE.log(f"Navigated to target: '{ENTRYPOINT}'")
 
     # Get Pokédex URLs
     CONSOLE.rule("[b]Pokédex URLs[/b]")
     urls_pokedex: List[str] = await get_pokedex_urls(page)
-    await utils.save_json(urls_pokedex, "data_urls_pokedex")
-    CONSOLE.log("Scraped and serialized [b]Pokédex URL[/b] data.")
+    CONSOLE.log("Scraped and stored [b]Pokédex URL[/b] data.")
 
     # Get generation URLs
     CONSOLE.rule("[b]Generation URLs[/b]")
-    data_generation_urls = await get_generation_urls(page, urls_pokedex)
-    await utils.save_json(data_generation_urls, "data_generation_urls")
-    CONSOLE.log("Scraped and serialized [b]generation URL[/b] data.")
-
-    # Data Pokédex cards
-    CONSOLE.rule("[b]Pokédex cards[/b]")
-    (
-        data_pokedex_cards_img,
-        data_pokedex_cards_data,
-    ) = await get_pokedex_cards(page, urls_pokedex)
-    await utils.save_json(
-        data_pokedex_cards_img, "data_pokedex_cards_img"
-    )
-    await utils.save_json(
-        data_pokedex_cards_data, "data_pokedex_cards_data"
-    )
-    CONSOLE.log(
-        "Scraped and serialized [b]Pokédex cards image data[/b] and [b]Pokédex cards data[/b]."
-    )
+    await get_generation_urls(page, urls_pokedex)
+    CONSOLE.log("Scraped and stored [b]generation URL[/b] data.")
 
-    # Get Pokémon details
-    CONSOLE.rule("[b]Pokémon details[/b]")
-    data_pokemon_details = await get_pokemon_details(
-        page, data_pokedex_cards_img
-    )
-    await utils.save_json(data_pokemon_details, "data_pokemon_details")
-    CONSOLE.log("Scraped and serialized [b]Pokémon details data[/b].")
+    if WORK_QUEUE:
+        # Pokédex cards and Pokémon details, from the shared work queue
+        CONSOLE.rule("[b]Work queue[/b]")
+        (
+            data_pokedex_cards_img,
+            data_pokedex_cards_data,
+            data_pokemon_details,
+        ) = await run_queue_worker(page, urls_pokedex, downloader)
+        CONSOLE.log(
+            "Scraped and stored [b]Pokédex cards image data[/b], [b]Pokédex cards data[/b] and [b]Pokémon details data[/b]."
+        )
+    elif SHARDS > 1:
+        # Data Pokédex cards
+        CONSOLE.rule("[b]Pokédex cards[/b]")
+        (
+            data_pokedex_cards_img,
+            data_pokedex_cards_data,
+        ) = await get_pokedex_cards(page, urls_pokedex)
+        CONSOLE.log(
+            "Scraped and stored [b]Pokédex cards image data[/b] and [b]Pokédex cards data[/b]."
+        )
 
-    # Dump console logs
+        # Get Pokémon details, sharded over worker processes
+        CONSOLE.rule("[b]Pokémon details[/b]")
+        await get_pokemon_details_sharded(
+            data_pokedex_cards_img, downloader
+        )
+        CONSOLE.log("Scraped and stored [b]Pokémon details data[/b].")
+    elif PIPELINE:
+        # Pokédex cards and Pokémon details, pipelined
+        CONSOLE.rule("[b]Pokédex cards & Pokémon details[/b]")
+        (
+            data_pokedex_cards_img,
+            data_pokedex_cards_data,
+            data_pokemon_details,
+        ) = await run_pipeline(page, urls_pokedex, downloader)
+        CONSOLE.log(
+            "Scraped and stored [b]Pokédex cards image data[/b], [b]Pokédex cards data[/b] and [b]Pokémon details data[/b]."
+        )
+    else:
+        # Data Pokédex cards
+        CONSOLE.rule("[b]Pokédex cards[/b]")
+        (
+            data_pokedex_cards_img,
+            data_pokedex_cards_data,
+        ) = await get_pokedex_cards(page, urls_pokedex)
+        CONSOLE.log(
+            "Scraped and stored [b]Pokédex cards image data[/b] and [b]Pokédex cards data[/b]."
+        )
+
+        # Get Pokémon details
+        CONSOLE.rule("[b]Pokémon details[/b]")
+        await get_pokemon_details(
+            page, data_pokedex_cards_img, downloader
+        )
+        CONSOLE.log("Scraped and stored [b]Pokémon details data[/b].")
+
+    # Flush pending image downloads
     CONSOLE.rule("[b]Teardown[/b]")
+    await downloader.drain()
+    await SCREENSHOTS.drain()
+
+    # Write buffered records and close the NDJSON streams
+    db.flush()
+    output.close()
+
+    # Export typed columns
+    if EXPORT_COLUMNAR:
+        export.export_tables()
 
+    # Report blocked requests, cache and sprite store usage, and rate limits
+    if ROUTE_BLOCKING:
+        ROUTE_POLICY.report()
+
+    if CACHE_ENABLED:
+        RESPONSE_CACHE.report()
+
+    SPRITE_STORE.report()
+    LIMITER.report()
+
+    # Report and write stage metrics
+    if METRICS.enabled:
+        METRICS.report()
+        METRICS.write()
+
+    # Dump console logs
     for _type in ["svg", "html"]:
         await utils.dump_console_recording(
             title="console_log", type=_type
         )
 
+    # Persist cookies and local storage for the next run
+    if BROWSER_SERVER:
+        await save_state(context)
+
     # Teardown
     await utils.teardown(browser)
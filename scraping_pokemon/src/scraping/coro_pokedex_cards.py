@@ -1,17 +1,62 @@
-from typing import Any, Awaitable, Coroutine, List, Tuple
+from collections import deque
+from typing import Any, Awaitable, Coroutine, Dict, List, Tuple
 from urllib.parse import urljoin
 
-from playwright.async_api import Locator, Page, expect
+from playwright.async_api import Error, Locator, Page, expect
 
 import scraping_pokemon.src.utils as utils
 from scraping_pokemon.src.environ import (
+    BULK_EXTRACT,
     CONSOLE,
     LIMIT_CARDS,
     LIMIT_POKEDEX,
     URL_ROOT,
 )
 
-from ..database.db import table_cards_data, table_cards_img
+from ..database.crawl_state import journal
+from ..database.db import (
+    table_cards_data,
+    table_cards_img,
+    table_dead_letter,
+)
+from ..metrics import METRICS
+from ..retry import RetryQueue
+
+# Extracts all cards of an '.infocard-list' grid in a single browser call
+JS_EXTRACT_CARDS = """
+(container, limit) => {
+    const images = Array.from(container.querySelectorAll(".infocard-lg-img"));
+    const data = Array.from(container.querySelectorAll(".infocard-lg-data"));
+
+    let n = Math.min(images.length, data.length);
+
+    if (limit > 0) {
+        n = Math.min(n, limit);
+    }
+
+    const records = [];
+
+    for (let i = 0; i < n; i++) {
+        const link = images[i].querySelector("a[href]");
+        const img = images[i].querySelector("img");
+        const small = data[i].querySelectorAll("small");
+
+        records.push({
+            href: link ? link.getAttribute("href") : null,
+            img_src: img ? img.getAttribute("src") : null,
+            img_alt: img ? img.getAttribute("alt") : null,
+            number: small.length > 0 ? small[0].innerText : null,
+            types: small.length > 1
+                ? Array.from(small[1].querySelectorAll("a[href]")).map(
+                    (a) => a.innerText
+                )
+                : [],
+        });
+    }
+
+    return records;
+}
+"""
 
 
 async def get_pokedex_cards(
@@ -20,6 +65,12 @@ async def get_pokedex_cards(
     """
     Coroutine for scraping Pokédex cards.
 
+    With BULK_EXTRACT enabled, the card grid of each Pokédex page is
+    extracted in a single browser round trip. The per-locator extraction
+    is used as fallback. Failed pages are retried after a backoff, while
+    the next pages are scraped, and dead-lettered once they run out of
+    attempts.
+
     Parameters
     ----------
     page : Page
@@ -49,103 +100,269 @@ async def get_pokedex_cards(
             f"[bold red]LIMIT[/bold red]: 'urls_pokedex' - {LIMIT_POKEDEX} records"
         )
 
-    for url in urls_pokedex:
-        # Follow Pokédex URL
-        page = await utils.navigate(url=url, page=page)
+    # Pages by index, and retries of failed pages
+    queue = deque(enumerate(urls_pokedex))
+    retries = RetryQueue("pokedex", sink=table_dead_letter.insert)
+    pages: Dict[int, List[Tuple[dict, dict]]] = dict()
+
+    while True:
+        item = retries.due()
+
+        if item is None:
+            if queue:
+                item = queue.popleft()
+            else:
+                item = await retries.wait()
+
+                if item is None:
+                    break
 
-        # Pokémon grid
-        locator_card_container: Locator = page.locator(
-            ".infocard-list"
-        ).nth(0)
-        await expect(locator_card_container).to_be_visible()
+        idx, url = item
 
-        # Get card data
-        locator_card_img_data: Locator = locator_card_container.locator(
-            ".infocard-lg-img"
+        try:
+            pages[idx] = await scrape_pokedex_page(page, url)
+        except Exception as e:
+            await retries.failed(item, url, e, page)
+
+    for idx in sorted(pages):
+        cards = pages[idx]
+
+        # Add to storage
+        db_pokedex_card_image.extend(
+            card_image for card_image, _ in cards
         )
-        locator_card_data: Locator = locator_card_container.locator(
-            ".infocard-lg-data"
+        db_pokedex_card_data.extend(card_data for _, card_data in cards)
+
+    return db_pokedex_card_image, db_pokedex_card_data
+
+
+async def scrape_pokedex_page(
+    page: Page, url: str
+) -> Coroutine[Any, Any, Awaitable[List[Tuple[dict, dict]]]]:
+    """
+    Scrape the cards of a single Pokédex page and insert them into the
+    database. Pages completed by a previous run are resumed from the
+    journal.
+
+    Parameters
+    ----------
+    page : Page
+        Playwright Page instance.
+    url : str
+        Pokédex page URL.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[List[Tuple[dict, dict]]]]
+        List of tuples containing the card image data and card data.
+    """
+
+    # Resume
+    if url in journal.pokedex_pages:
+        cards_img, cards_data = journal.pokedex_pages[url]
+
+        CONSOLE.log(f"Resumed [b]Pokédex cards[/b] from journal: {url}")
+
+        return list(zip(cards_img, cards_data))
+
+    # Follow Pokédex URL
+    page = await utils.navigate(url=url, page=page)
+
+    # Pokémon grid
+    locator_card_container: Locator = page.locator(
+        ".infocard-list"
+    ).nth(0)
+    await expect(locator_card_container).to_be_visible()
+
+    # Card limit
+    if LIMIT_CARDS > 0:
+        CONSOLE.log(
+            f"[bold red]LIMIT[/bold red]: 'urls_pokedex' - {LIMIT_CARDS} records"
         )
 
-        card_img_data_all = await locator_card_img_data.all()
-        card_data_all = await locator_card_data.all()
+    # Extract card image data and card data
+    cards: List[Tuple[dict, dict]] | None = None
+
+    with METRICS.span("extract_cards"):
+        if BULK_EXTRACT:
+            try:
+                cards = await _extract_cards_bulk(
+                    locator_card_container
+                )
+            except (Error, ValueError) as e:
+                METRICS.count("bulk_fallbacks")
+
+                # Log
+                CONSOLE.log(
+                    f"[bold red]Bulk extraction failed[/bold red] ({e!r}); falling back to locators.",
+                    level="warning",
+                )
+
+        if cards is None:
+            cards = await _extract_cards_locator(locator_card_container)
+
+    for db_card_image, db_card_data in cards:
+        # Insert into db
+        table_cards_img.insert(dict(card_image=db_card_image))
+        table_cards_data.insert(dict(card_data=db_card_data))
+
+    # Journal, once the records are written
+    table_cards_img.flush()
+    table_cards_data.flush()
+    journal.record(
+        "pokedex_page",
+        url=url,
+        cards_img=[card_image for card_image, _ in cards],
+        cards_data=[card_data for _, card_data in cards],
+    )
+
+    return cards
+
+
+async def _extract_cards_bulk(
+    locator_card_container: Locator,
+) -> Coroutine[Any, Any, Awaitable[List[Tuple[dict, dict]]]]:
+    """
+    Extract all cards of a Pokémon grid in a single browser round trip.
+
+    Parameters
+    ----------
+    locator_card_container : Locator
+        Playwright Locator of the '.infocard-list' grid.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[List[Tuple[dict, dict]]]]
+        List of tuples containing the card image data and card data.
+
+    Raises
+    ------
+    ValueError
+        If a card lacks its link or number.
+    """
+
+    records: List[dict] = await locator_card_container.evaluate(
+        JS_EXTRACT_CARDS, LIMIT_CARDS
+    )
+
+    cards: List[Tuple[dict, dict]] = list()
+
+    for record in records:
+        if record["href"] is None or record["number"] is None:
+            raise ValueError(f"Incomplete card record: {record}")
+
+        db_card_image = dict(
+            url=[urljoin(URL_ROOT, record["href"])],
+            img_src=[record["img_src"]],
+            img_alt=[record["img_alt"]],
+        )
+        db_card_data = dict(
+            number=[record["number"]], types=[record["types"]]
+        )
+
+        cards.append((db_card_image, db_card_data))
+
+    # Log
+    CONSOLE.log(
+        f"Extracted [b]card image data[/b] and [b]card data[/b] for {len(cards)} cards."
+    )
+
+    return cards
+
+
+async def _extract_cards_locator(
+    locator_card_container: Locator,
+) -> Coroutine[Any, Any, Awaitable[List[Tuple[dict, dict]]]]:
+    """
+    Extract all cards of a Pokémon grid, field by field, through Playwright
+    locators.
+
+    Parameters
+    ----------
+    locator_card_container : Locator
+        Playwright Locator of the '.infocard-list' grid.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[List[Tuple[dict, dict]]]]
+        List of tuples containing the card image data and card data.
+    """
+
+    # Get card data
+    locator_card_img_data: Locator = locator_card_container.locator(
+        ".infocard-lg-img"
+    )
+    locator_card_data: Locator = locator_card_container.locator(
+        ".infocard-lg-data"
+    )
+
+    card_img_data_all = await locator_card_img_data.all()
+    card_data_all = await locator_card_data.all()
+
+    # Log
+    CONSOLE.log(
+        "Located all [b]card image data[/b] and [b]card data[/b]."
+    )
+
+    # Card limit
+    if LIMIT_CARDS > 0:
+        card_img_data_all = card_img_data_all[:LIMIT_CARDS]
+        card_data_all = card_data_all[:LIMIT_CARDS]
+
+    cards: List[Tuple[dict, dict]] = list()
+
+    for card_image, card_data in zip(card_img_data_all, card_data_all):
+        # Storage
+        db_card_image = dict(url=list(), img_src=list(), img_alt=list())
+        db_card_data = dict(number=list(), types=list())
+
+        # Extract card image data
+        url: str = urljoin(
+            URL_ROOT,
+            await card_image.get_by_role("link").get_attribute("href"),
+        )
+        img_src: str | None = await card_image.get_by_role(
+            "img"
+        ).get_attribute("src")
+        img_alt: str | None = await card_image.get_by_role(
+            "img"
+        ).get_attribute("alt")
 
         # Log
         CONSOLE.log(
-            "Located all [b]card image data[/b] and [b]card data[/b]."
+            f"Extracted [b]card image data[/b] for: \t{url}",
+            level="debug",
         )
 
-        # Card limit
-        if LIMIT_CARDS > 0:
-            card_img_data_all = card_img_data_all[:LIMIT_CARDS]
-            card_data_all = card_data_all[:LIMIT_CARDS]
-
-            CONSOLE.log(
-                f"[bold red]LIMIT[/bold red]: 'urls_pokedex' - {LIMIT_CARDS} records"
-            )
-
-        for card_image, card_data in zip(
-            card_img_data_all, card_data_all
-        ):
-            # Storage
-            db_card_image = dict(
-                url=list(), img_src=list(), img_alt=list()
-            )
-            db_card_data = dict(number=list(), types=list())
-
-            # Extract card image data
-            url: str = urljoin(
-                URL_ROOT,
-                await card_image.get_by_role("link").get_attribute(
-                    "href"
-                ),
-            )
-            img_src: str | None = await card_image.get_by_role(
-                "img"
-            ).get_attribute("src")
-            img_alt: str | None = await card_image.get_by_role(
-                "img"
-            ).get_attribute("alt")
-
-            # Log
-            CONSOLE.log(
-                f"Extracted [b]card image data[/b] for: \t{url}"
-            )
-
-            # Add to db
-            db_card_image["url"].append(url)
-            db_card_image["img_src"].append(img_src)
-            db_card_image["img_alt"].append(img_alt)
-
-            # Extract card data
-            number: str = await card_data.locator(
-                "small"
-            ).first.inner_text()
-
-            locator_types: Locator = (
-                card_data.locator("small").nth(1).get_by_role("link")
-            )
-
-            types: list(str) = list()
-
-            for t in await locator_types.all():
-                types.append(await t.inner_text())
-
-            # Log
-            CONSOLE.log(
-                f"Extracted [b]card data[/b] for: \t\t\t\t{url}"
-            )
-
-            # Add to db
-            db_card_data["number"].append(number)
-            db_card_data["types"].append(types)
-
-            # Add to storage
-            db_pokedex_card_image.append(db_card_image)
-            db_pokedex_card_data.append(db_card_data)
-
-            # Insert into db
-            table_cards_img.insert(dict(card_image=db_card_image))
-            table_cards_data.insert(dict(card_data=db_card_data))
+        # Add to db
+        db_card_image["url"].append(url)
+        db_card_image["img_src"].append(img_src)
+        db_card_image["img_alt"].append(img_alt)
 
-    return db_pokedex_card_image, db_pokedex_card_data
+        # Extract card data
+        number: str = await card_data.locator(
+            "small"
+        ).first.inner_text()
+
+        locator_types: Locator = (
+            card_data.locator("small").nth(1).get_by_role("link")
+        )
+
+        types: list(str) = list()
+
+        for t in await locator_types.all():
+            types.append(await t.inner_text())
+
+        # Log
+        CONSOLE.log(
+            f"Extracted [b]card data[/b] for: \t\t\t\t{url}",
+            level="debug",
+        )
+
+        # Add to db
+        db_card_data["number"].append(number)
+        db_card_data["types"].append(types)
+
+        cards.append((db_card_image, db_card_data))
+
+    return cards
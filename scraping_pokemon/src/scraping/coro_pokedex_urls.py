@@ -5,6 +5,7 @@ from playwright.async_api import Locator, Page, expect
 
 from scraping_pokemon.src.environ import URL_ROOT
 
+from ..database.crawl_state import journal
 from ..database.db import table_pokedex
 from ..environ import CONSOLE
 
@@ -29,6 +30,12 @@ async def get_pokedex_urls(
     # Log
     CONSOLE.log("Scraping [b]Pokédex URL[/b] data...")
 
+    # Resume
+    if journal.pokedex_index is not None:
+        CONSOLE.log("Resumed [b]Pokédex URL[/b] data from journal.")
+
+        return journal.pokedex_index
+
     # Storage
     db_urls_pokedex: List[str] = list()
 
@@ -54,4 +61,8 @@ async def get_pokedex_urls(
         # Insert into db
         table_pokedex.insert(dict(pokedex_url=pokedex))
 
+    # Journal, once the records are written
+    table_pokedex.flush()
+    journal.record("pokedex_index", urls=db_urls_pokedex)
+
     return db_urls_pokedex
@@ -0,0 +1,103 @@
+from typing import Any, Awaitable, Coroutine, Dict, List
+from unicodedata import normalize
+
+from playwright.async_api import Page
+
+import scraping_pokemon.src.utils as utils
+
+from ..environ import CONSOLE
+from ..metrics import METRICS
+from ..screenshots import SCREENSHOTS
+from ..types import VitalsRow
+from . import parsers
+
+# Extracts the name, description and vitals tables of a detail page in a
+# single browser call. Tables are keyed by the section of the heading
+# preceding them; only the first table of every section is kept.
+JS_EXTRACT_POKEMON = """
+(main, headings) => {
+    const text = (node) => (node ? node.innerText : null);
+    const tables = {};
+
+    let section = null;
+
+    for (const node of main.querySelectorAll("h2, .vitals-table")) {
+        if (node.tagName === "H2") {
+            const heading = node.innerText.normalize("NFKC").trim();
+            const match = headings.find(([, prefix]) => heading.startsWith(prefix));
+
+            section = match ? match[0] : null;
+        } else if (section !== null && !(section in tables)) {
+            tables[section] = Array.from(node.querySelectorAll("tr"))
+                .filter((row) => row.querySelector("th"))
+                .map((row) => [
+                    row.querySelector("th").innerText,
+                    Array.from(row.querySelectorAll("td")).map(text),
+                ]);
+        }
+    }
+
+    return {
+        name: text(main.querySelector("h1, h2, h3, h4, h5, h6")),
+        description: text(main.querySelector("p")),
+        tables: tables,
+    };
+}
+"""
+
+
+async def extract_pokemon(
+    page: Page, url_pokemon: str
+) -> Coroutine[Any, Any, Awaitable[dict]]:
+    """
+    Extract and parse a single Pokémon detail page, without persisting it.
+    Does not touch the database, so it can run in shard worker processes.
+    Sampled and failed pages are captured by the screenshot pipeline.
+
+    Parameters
+    ----------
+    page : Page
+        Playwright Page instance.
+    url_pokemon : str
+        URL of the Pokémon detail page.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[dict]]
+        Scraped Pokémon details.
+    """
+
+    try:
+        # Navigate to Pokémon detail page
+        page = await utils.navigate(url=url_pokemon, page=page)
+
+        # Extract name, description and vitals tables
+        with METRICS.span("extract_pokemon"):
+            extracted: Dict[str, Any] = await page.locator(
+                "main"
+            ).evaluate(
+                JS_EXTRACT_POKEMON,
+                list(parsers.VITALS_PARSER.headings.items()),
+            )
+
+        if extracted["name"] is None:
+            raise ValueError(f"Missing Pokémon name: {url_pokemon}")
+
+        name = normalize("NFKC", extracted["name"])
+        description = normalize("NFKC", extracted["description"] or "")
+        tables: Dict[str, List[VitalsRow]] = extracted["tables"]
+
+        # Log
+        CONSOLE.log(f"Processing: [b]{name}[/b]...", level="debug")
+
+        # Screenshot page; written to disk in the background
+        await SCREENSHOTS.capture(page, url_pokemon)
+
+        # Parse
+        pokemon = await parsers.parse_pokemon(name, description, tables)
+    except Exception:
+        await SCREENSHOTS.capture(page, url_pokemon, failed=True)
+
+        raise
+
+    return pokemon
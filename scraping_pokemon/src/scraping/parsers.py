@@ -0,0 +1,222 @@
+from typing import Any, Awaitable, Coroutine, Dict, List, Optional
+from unicodedata import normalize
+
+import scraping_pokemon.src.utils as utils
+
+from ..metrics import METRICS
+from ..types import FieldSpec, TableSpec, VitalsRow
+from .spec import VITALS_SPEC
+
+
+def clean(text: str) -> str:
+    """
+    Normalize an extracted text, and strip its surrounding whitespace.
+
+    Parameters
+    ----------
+    text : str
+        Extracted text.
+
+    Returns
+    -------
+    str
+        Cleaned text.
+    """
+
+    return normalize("NFKC", text).strip()
+
+
+class VitalsParser:
+    """
+    Parser of the vitals tables of a Pokémon detail page, compiled from a
+    declarative spec. Tables are assigned to a record section by the
+    heading preceding them, and rows to a field by their header label, so
+    neither depends on its position on the page. Pages of Pokémon with
+    multiple forms repeat the tables per form; the first table of every
+    section, of the default form, is parsed.
+
+    The extracted tables are passed as a whole, by section; every
+    extraction engine produces them in a single pass over the page.
+
+    Parameters
+    ----------
+    spec : Dict[str, TableSpec], optional
+        Tables, by record section, by default VITALS_SPEC
+    """
+
+    def __init__(
+        self, spec: Dict[str, TableSpec] = VITALS_SPEC
+    ) -> None:
+        self.spec = spec
+
+        # Normalized heading prefixes, by section
+        self.headings: Dict[str, str] = {
+            section: clean(table["heading"])
+            for section, table in spec.items()
+        }
+
+        # Fields by normalized header label, by section
+        self._fields: Dict[str, Dict[str, FieldSpec]] = {
+            section: {clean(f["label"]): f for f in table["fields"]}
+            for section, table in spec.items()
+        }
+
+        # Fields by raw header label, as seen on pages, by section
+        self._labels: Dict[str, Dict[str, Optional[FieldSpec]]] = {
+            section: dict() for section in spec
+        }
+
+    def section_of(self, heading: str) -> Optional[str]:
+        """
+        Look up the section of a table heading. Headings match by prefix,
+        since some name the Pokémon, like 'Where to find Pikachu'.
+
+        Parameters
+        ----------
+        heading : str
+            Text of the heading.
+
+        Returns
+        -------
+        Optional[str]
+            Section, or None if the heading has no table in the spec.
+        """
+
+        heading = clean(heading)
+
+        for section, prefix in self.headings.items():
+            if heading.startswith(prefix):
+                return section
+
+        return None
+
+    def parse(
+        self, tables: Dict[str, List[VitalsRow]]
+    ) -> Dict[str, dict]:
+        """
+        Parse the extracted vitals tables.
+
+        Parameters
+        ----------
+        tables : Dict[str, List[VitalsRow]]
+            Rows of the first table of every section found on the page.
+
+        Returns
+        -------
+        Dict[str, dict]
+            Parsed tables, by section.
+
+        Raises
+        ------
+        ValueError
+            If a required table is missing.
+        """
+
+        parsed: Dict[str, dict] = dict()
+
+        for section, table in self.spec.items():
+            rows = tables.get(section)
+
+            if rows is None and table["required"]:
+                raise ValueError(
+                    f"Missing vitals table: '{table['heading']}'"
+                )
+
+            rows = [
+                (label, cells) for label, cells in rows or [] if cells
+            ]
+
+            if table["kind"] == "records":
+                parsed[section] = self._parse_records(table, rows)
+            else:
+                parsed[section] = self._parse_fields(section, rows)
+
+        return parsed
+
+    def _parse_fields(
+        self, section: str, rows: List[VitalsRow]
+    ) -> Dict[str, Any]:
+        fields = self._fields[section]
+        labels = self._labels[section]
+
+        values: Dict[str, Any] = dict()
+
+        for label, cells in rows:
+            if label not in labels:
+                labels[label] = fields.get(clean(label))
+
+            f = labels[label]
+
+            if f is not None and f["name"] not in values:
+                values[f["name"]] = f["parse"](
+                    [clean(cell) for cell in cells]
+                )
+
+        # Fields in declaration order; absent rows are left empty
+        record: Dict[str, Any] = dict()
+
+        for f in fields.values():
+            if f["wrap"]:
+                record[f["name"]] = (
+                    [values[f["name"]]]
+                    if f["name"] in values
+                    else list()
+                )
+            elif f["name"] in values:
+                record[f["name"]] = values[f["name"]]
+
+        return record
+
+    @staticmethod
+    def _parse_records(
+        table: TableSpec, rows: List[VitalsRow]
+    ) -> Dict[str, list]:
+        label, value = table["records"]
+
+        return {
+            label: [
+                clean(row_label).split("\n") for row_label, _ in rows
+            ],
+            value: [clean(cells[0]) for _, cells in rows],
+        }
+
+
+# Parser of the vitals tables, shared by every scraping engine
+VITALS_PARSER = VitalsParser()
+
+
+async def parse_pokemon(
+    name: str, description: str, tables: Dict[str, List[VitalsRow]]
+) -> Coroutine[Any, Any, Awaitable[dict]]:
+    """
+    Compile a Pokémon record from the extracted contents of its detail
+    page. Shared by every scraping engine, so they produce identical
+    records.
+
+    Parameters
+    ----------
+    name : str
+        Normalized name of the Pokémon.
+    description : str
+        Normalized description of the Pokémon.
+    tables : Dict[str, List[VitalsRow]]
+        Rows of the first vitals table of every section, as assigned by
+        'VITALS_PARSER.section_of'.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[dict]]
+        Pokémon details.
+    """
+
+    with METRICS.span("parse"):
+        vitals = VITALS_PARSER.parse(tables)
+
+        # Generate key hash
+        _key = await utils.generate_hash(
+            (vitals["pokedex_data"]["national_no"], name)
+        )
+
+        return dict(
+            key=_key, name=name, description=description, **vitals
+        )
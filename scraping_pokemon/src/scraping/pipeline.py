@@ -0,0 +1,325 @@
+import asyncio
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from playwright.async_api import Page
+
+from ..database.crawl_state import journal
+from ..database.db import table_dead_letter
+from ..downloader import ImageDownloader
+from ..environ import (
+    CONCURRENCY_CARDS,
+    CONCURRENCY_DETAILS,
+    CONSOLE,
+    LIMIT_POKEDEX,
+    QUEUE_SIZE_CARDS,
+)
+from ..retry import RetryQueue
+from .coro_pokedex_cards import scrape_pokedex_page
+from .coro_pokemon_details import resumed_pokemon, scrape_pokemon
+
+# Position of a card; index of its Pokédex page, and index on that page
+CardPosition = Tuple[int, int]
+
+
+async def run_pipeline(
+    page: Page,
+    urls_pokedex: List[str],
+    downloader: Optional[ImageDownloader] = None,
+) -> Coroutine[
+    Any, Any, Awaitable[Tuple[List[dict], List[dict], List[dict]]]
+]:
+    """
+    Scrape the Pokédex cards and Pokémon details as a pipeline of
+    concurrent stages, connected by bounded queues:
+
+    Pokédex pages -> card workers -> cards queue -> detail workers ->
+    image downloader
+
+    Detail pages are scraped as soon as their card is extracted, while
+    later Pokédex pages are still being read. Once QUEUE_SIZE_CARDS cards
+    wait for a detail worker, the card workers wait as well; the image
+    downloader pushes back on the detail workers in the same way. The
+    stages run CONCURRENCY_CARDS and CONCURRENCY_DETAILS workers, each
+    driving its own Playwright Page. Failed pages are retried after a
+    backoff, while the workers carry on with other pages, and are
+    dead-lettered once they run out of attempts.
+
+    Parameters
+    ----------
+    page : Page
+        Playwright Page instance, used by the first card worker.
+    urls_pokedex : List[str]
+        List containing Pokédex target URLs.
+    downloader : Optional[ImageDownloader], optional
+        Background image downloader to hand the Pokémon images to; images
+        are saved inline if omitted, by default None
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[Tuple[List[dict], List[dict], List[dict]]]]
+        Scraped Pokédex card image data, Pokédex card data and Pokémon
+        details, in the order of the Pokédex pages and their cards.
+        Dead-lettered detail pages are None.
+    """
+
+    # Log
+    CONSOLE.log(
+        "Scraping [b]Pokédex cards[/b] and [b]Pokémon details[/b]..."
+    )
+
+    # Pokédex limit
+    if LIMIT_POKEDEX > 0:
+        urls_pokedex = urls_pokedex[:LIMIT_POKEDEX]
+
+        CONSOLE.log(
+            f"[bold red]LIMIT[/bold red]: 'urls_pokedex' - {LIMIT_POKEDEX} records"
+        )
+
+    # Resume; completed pages are skipped if their key is in the database
+    completed = resumed_pokemon()
+
+    # Queues
+    queue_urls: asyncio.Queue[Tuple[int, str]] = asyncio.Queue()
+    queue_cards: asyncio.Queue[
+        Optional[Tuple[CardPosition, dict]]
+    ] = asyncio.Queue(maxsize=QUEUE_SIZE_CARDS)
+
+    for idx, url in enumerate(urls_pokedex):
+        queue_urls.put_nowait((idx, url))
+
+    # Retries of failed pages, per stage
+    retries_cards = RetryQueue("pokedex", sink=table_dead_letter.insert)
+    retries_details = RetryQueue(
+        "details", sink=table_dead_letter.insert
+    )
+
+    # Storage; keyed by card position, to restore the order afterwards
+    cards: Dict[CardPosition, Tuple[dict, dict]] = dict()
+    pokemon: Dict[CardPosition, dict] = dict()
+
+    # Worker pages
+    n_card_workers = max(1, min(CONCURRENCY_CARDS, len(urls_pokedex)))
+    n_detail_workers = max(1, CONCURRENCY_DETAILS)
+
+    pages: List[Page] = [page] + [
+        await page.context.new_page()
+        for _ in range(n_card_workers + n_detail_workers - 1)
+    ]
+
+    # Log
+    CONSOLE.log(
+        f"Started [b]{n_card_workers}[/b] card workers and "
+        f"[b]{n_detail_workers}[/b] detail workers."
+    )
+
+    started = time.perf_counter()
+
+    async def _cards_stage() -> None:
+        await asyncio.gather(
+            *[
+                _cards_worker(
+                    _page, queue_urls, queue_cards, retries_cards, cards
+                )
+                for _page in pages[:n_card_workers]
+            ]
+        )
+
+        # Log
+        CONSOLE.log(
+            f"[b]Pokédex cards[/b] stage finished after {time.perf_counter() - started:.1f}s."
+        )
+
+        # Signal the detail workers to stop, once the queue is consumed
+        for _ in range(n_detail_workers):
+            await queue_cards.put(None)
+
+    tasks = [asyncio.create_task(_cards_stage())] + [
+        asyncio.create_task(
+            _details_worker(
+                _page,
+                queue_cards,
+                retries_details,
+                pokemon,
+                completed,
+                downloader,
+            )
+        )
+        for _page in pages[n_card_workers:]
+    ]
+
+    try:
+        await _supervise(tasks)
+    finally:
+        for _page in pages[1:]:
+            await _page.close()
+
+    # Log
+    CONSOLE.log(
+        f"[b]Pokémon details[/b] stage finished after {time.perf_counter() - started:.1f}s."
+    )
+
+    positions = sorted(cards)
+
+    return (
+        [cards[position][0] for position in positions],
+        [cards[position][1] for position in positions],
+        [pokemon.get(position) for position in positions],
+    )
+
+
+async def _supervise(
+    tasks: List[asyncio.Task],
+) -> Coroutine[Any, Any, Awaitable[None]]:
+    """
+    Wait for all pipeline tasks. If any task fails, the others are
+    cancelled, so that no stage keeps waiting on a queue that will not be
+    served anymore, and the exception is raised.
+
+    Parameters
+    ----------
+    tasks : List[asyncio.Task]
+        Tasks of the pipeline stages.
+    """
+
+    done, pending = await asyncio.wait(
+        tasks, return_when=asyncio.FIRST_EXCEPTION
+    )
+
+    for task in pending:
+        task.cancel()
+
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    for task in done:
+        if task.exception() is not None:
+            raise task.exception()
+
+
+async def _cards_worker(
+    page: Page,
+    queue_urls: asyncio.Queue[Tuple[int, str]],
+    queue_cards: asyncio.Queue[Optional[Tuple[CardPosition, dict]]],
+    retries: RetryQueue,
+    cards: Dict[CardPosition, Tuple[dict, dict]],
+) -> Coroutine[Any, Any, Awaitable[None]]:
+    """
+    Worker scraping Pokédex pages from the URL queue, until it is
+    exhausted and no retries are left. Every card is passed on to the
+    detail workers as soon as its page is extracted.
+
+    Parameters
+    ----------
+    page : Page
+        Playwright Page instance, owned by this worker.
+    queue_urls : asyncio.Queue[Tuple[int, str]]
+        Queue containing the index and URL of every Pokédex page.
+    queue_cards : asyncio.Queue[Optional[Tuple[CardPosition, dict]]]
+        Bounded queue of card positions and card image data.
+    retries : RetryQueue
+        Retries of failed Pokédex pages.
+    cards : Dict[CardPosition, Tuple[dict, dict]]
+        Storage for the card image data and card data.
+    """
+
+    while True:
+        item = retries.due()
+
+        if item is None:
+            try:
+                item = queue_urls.get_nowait()
+            except asyncio.QueueEmpty:
+                item = await retries.wait()
+
+                if item is None:
+                    return
+
+        idx, url = item
+
+        try:
+            scraped = await scrape_pokedex_page(page, url)
+        except Exception as e:
+            await retries.failed(item, url, e, page)
+
+            continue
+
+        for nth, card in enumerate(scraped):
+            cards[(idx, nth)] = card
+
+            await queue_cards.put(((idx, nth), card[0]))
+
+
+async def _details_worker(
+    page: Page,
+    queue_cards: asyncio.Queue[Optional[Tuple[CardPosition, dict]]],
+    retries: RetryQueue,
+    pokemon: Dict[CardPosition, dict],
+    completed: Dict[str, dict],
+    downloader: Optional[ImageDownloader] = None,
+) -> Coroutine[Any, Any, Awaitable[None]]:
+    """
+    Worker scraping Pokémon detail pages from the cards queue, until it
+    receives None and no retries are left. Due retries are taken first.
+
+    Parameters
+    ----------
+    page : Page
+        Playwright Page instance, owned by this worker.
+    queue_cards : asyncio.Queue[Optional[Tuple[CardPosition, dict]]]
+        Bounded queue of card positions and card image data.
+    retries : RetryQueue
+        Retries of failed detail pages.
+    pokemon : Dict[CardPosition, dict]
+        Storage for the scraped Pokémon details.
+    completed : Dict[str, dict]
+        Pokémon records completed by a previous run, by key hash.
+    downloader : Optional[ImageDownloader], optional
+        Background image downloader, by default None
+    """
+
+    stopped = False
+
+    while True:
+        item = retries.due()
+
+        if item is None:
+            if stopped:
+                item = await retries.wait()
+
+                if item is None:
+                    return
+            else:
+                item = await queue_cards.get()
+                queue_cards.task_done()
+
+                if item is None:
+                    stopped = True
+
+                    continue
+
+        position, card_image = item
+        url_pokemon = card_image["url"][0]
+        key = journal.details.get(url_pokemon)
+
+        if key in completed:
+            pokemon[position] = completed[key]
+
+            continue
+
+        try:
+            pokemon[position] = await scrape_pokemon(
+                page,
+                url_pokemon,
+                card_image["img_src"][0],
+                downloader,
+            )
+        except Exception as e:
+            await retries.failed(item, url_pokemon, e, page)
@@ -0,0 +1,224 @@
+import asyncio
+from typing import Any, Awaitable, Coroutine, List, Optional, Tuple
+
+from playwright.async_api import Page
+
+from ..database.db import table_dead_letter
+from ..database.workqueue import WORKER_ID, WorkQueue
+from ..downloader import ImageDownloader
+from ..environ import (
+    CONCURRENCY_DETAILS,
+    CONSOLE,
+    LIMIT_POKEDEX,
+    TRUNCATE,
+    WORK_QUEUE_PATH,
+    WORK_QUEUE_POLL,
+)
+from ..retry import backoff, dead_letter, snapshot
+from .coro_pokedex_cards import scrape_pokedex_page
+from .coro_pokemon_details import scrape_pokemon
+
+
+async def run_queue_worker(
+    page: Page,
+    urls_pokedex: List[str],
+    downloader: Optional[ImageDownloader] = None,
+) -> Coroutine[
+    Any, Any, Awaitable[Tuple[List[dict], List[dict], List[dict]]]
+]:
+    """
+    Scrape the Pokédex cards and Pokémon details from the shared work
+    queue, next to any number of workers on other nodes.
+
+    The Pokédex pages are enqueued by every worker; enqueueing is
+    idempotent, so they are only scraped once. Scraping a Pokédex page
+    enqueues the detail pages of its cards. Detail pages are leased before
+    Pokédex pages, so records are completed as early as possible. A worker
+    stops once no item is pending or leased by any worker.
+
+    Parameters
+    ----------
+    page : Page
+        Playwright Page instance, used by the first worker.
+    urls_pokedex : List[str]
+        List containing Pokédex target URLs.
+    downloader : Optional[ImageDownloader], optional
+        Background image downloader to hand the Pokémon images to; images
+        are saved inline if omitted, by default None
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[Tuple[List[dict], List[dict], List[dict]]]]
+        Pokédex card image data, Pokédex card data and Pokémon details
+        scraped by this worker.
+    """
+
+    # Log
+    CONSOLE.log(
+        f"Scraping from work queue '{WORK_QUEUE_PATH}' as [b]{WORKER_ID}[/b]..."
+    )
+
+    # Queue calls wait for other workers; kept off the event loop
+    queue = await asyncio.to_thread(WorkQueue, WORK_QUEUE_PATH)
+
+    if TRUNCATE:
+        await asyncio.to_thread(queue.reset)
+
+    # Pokédex limit
+    if LIMIT_POKEDEX > 0:
+        urls_pokedex = urls_pokedex[:LIMIT_POKEDEX]
+
+        CONSOLE.log(
+            f"[bold red]LIMIT[/bold red]: 'urls_pokedex' - {LIMIT_POKEDEX} records"
+        )
+
+    await asyncio.to_thread(
+        queue.enqueue_many,
+        "pokedex",
+        [(url, None) for url in urls_pokedex],
+    )
+
+    # Storage
+    cards: List[Tuple[dict, dict]] = list()
+    pokemon: List[dict] = list()
+
+    pages: List[Page] = [page] + [
+        await page.context.new_page()
+        for _ in range(max(1, CONCURRENCY_DETAILS) - 1)
+    ]
+
+    try:
+        await asyncio.gather(
+            *[
+                _queue_worker(_page, queue, cards, pokemon, downloader)
+                for _page in pages
+            ]
+        )
+    finally:
+        for _page in pages[1:]:
+            await _page.close()
+
+        counts = await asyncio.to_thread(queue.counts)
+        await asyncio.to_thread(queue.close)
+
+    # Log
+    CONSOLE.log(
+        f"Work queue: [b]{counts.get('done', 0)}[/b] done, "
+        f"[b]{counts.get('failed', 0)}[/b] failed, "
+        f"[b]{counts.get('pending', 0) + counts.get('leased', 0)}[/b] outstanding."
+    )
+
+    return (
+        [card_image for card_image, _ in cards],
+        [card_data for _, card_data in cards],
+        pokemon,
+    )
+
+
+async def _queue_worker(
+    page: Page,
+    queue: WorkQueue,
+    cards: List[Tuple[dict, dict]],
+    pokemon: List[dict],
+    downloader: Optional[ImageDownloader] = None,
+) -> Coroutine[Any, Any, Awaitable[None]]:
+    """
+    Worker leasing and scraping items from the work queue, until no item
+    is outstanding. While items are leased by other workers, it polls the
+    queue, since their work may add detail pages or expire. Failed items
+    are released with an exponential, jittered backoff, and dead-lettered
+    once they run out of attempts.
+
+    Parameters
+    ----------
+    page : Page
+        Playwright Page instance, owned by this worker.
+    queue : WorkQueue
+        Shared work queue.
+    cards : List[Tuple[dict, dict]]
+        Storage for the card image data and card data.
+    pokemon : List[dict]
+        Storage for the scraped Pokémon details.
+    downloader : Optional[ImageDownloader], optional
+        Background image downloader, by default None
+    """
+
+    while True:
+        item = await asyncio.to_thread(
+            queue.lease, "details"
+        ) or await asyncio.to_thread(queue.lease, "pokedex")
+
+        if item is None:
+            if not await asyncio.to_thread(queue.outstanding):
+                return
+
+            await asyncio.sleep(WORK_QUEUE_POLL)
+
+            continue
+
+        try:
+            if item["kind"] == "pokedex":
+                scraped = await scrape_pokedex_page(page, item["url"])
+
+                # Detail pages are enqueued before the page is acknowledged
+                await asyncio.to_thread(
+                    queue.enqueue_many,
+                    "details",
+                    [
+                        (
+                            card_image["url"][0],
+                            dict(img_src=card_image["img_src"][0]),
+                        )
+                        for card_image, _ in scraped
+                    ],
+                )
+                cards.extend(scraped)
+            else:
+                pokemon.append(
+                    await scrape_pokemon(
+                        page,
+                        item["url"],
+                        item["payload"]["img_src"],
+                        downloader,
+                    )
+                )
+        except Exception as e:
+            delay = backoff(item["attempts"])
+
+            await asyncio.to_thread(
+                queue.release, item, error=repr(e), delay=delay
+            )
+
+            if item["attempts"] >= queue.max_attempts:
+                table_dead_letter.insert(
+                    dead_letter(
+                        item["kind"],
+                        item["url"],
+                        e,
+                        item["attempts"],
+                        await snapshot(page),
+                    )
+                )
+
+                # Log
+                CONSOLE.log(
+                    f"[bold red]Dead-lettered[/bold red] after {item['attempts']} attempts: "
+                    f"'{item['url']}' ({e!r})",
+                    level="error",
+                )
+            else:
+                # Log
+                CONSOLE.log(
+                    f"[bold yellow]Retrying[/bold yellow] in {delay:.1f}s "
+                    f"({item['attempts']}/{queue.max_attempts}): '{item['url']}' ({e!r})",
+                    level="warning",
+                )
+
+            continue
+
+        if not await asyncio.to_thread(queue.ack, item):
+            # Log
+            CONSOLE.log(
+                f"[bold yellow]Lease expired[/bold yellow] before completion: '{item['url']}'.",
+                level="warning",
+            )
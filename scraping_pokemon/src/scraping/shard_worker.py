@@ -0,0 +1,177 @@
+import asyncio
+from queue import Queue
+from typing import Any, Awaitable, Coroutine, List, Tuple
+
+from playwright.async_api import Page, async_playwright
+
+from ..browser_server import launch_browser, new_context
+from ..environ import CONCURRENCY_DETAILS, CONSOLE
+from ..metrics import METRICS
+from ..ratelimit import LIMITER
+from ..retry import RetryQueue
+from ..screenshots import SCREENSHOTS
+from .coro_pokemon_page import extract_pokemon
+
+# Detail page of a shard; index in the frontier, page URL and image URL
+ShardItem = Tuple[int, str, str]
+
+
+def crawl_shard(
+    shard: int, shards: int, items: List[ShardItem], results: Queue
+) -> int:
+    """
+    Entry point of a shard worker process. Runs its own event loop and
+    Firefox instance, or connection to the browser server with
+    BROWSER_SERVER enabled, and scrapes the detail pages of its shard.
+    Nothing is written to the database here; every result is sent to the
+    writer in the main process. Failed pages are retried within the
+    shard, after a backoff.
+
+    Every shard has a rate limiter of its own, limited to an equal share
+    of every host, so the shards combined stay within the rate limits.
+
+    Messages put on the results queue:
+
+    - ('pokemon', idx, url_pokemon, url_img_src, pokemon)
+    - ('failed', idx, url_pokemon, dead_letter)
+    - ('rates', shard, host_rates), once the shard is done
+    - ('metrics', shard, snapshot), once the shard is done
+
+    Parameters
+    ----------
+    shard : int
+        Number of the shard.
+    shards : int
+        Amount of shards.
+    items : List[ShardItem]
+        Detail pages of the shard.
+    results : Queue
+        Queue shared with the writer in the main process.
+
+    Returns
+    -------
+    int
+        Amount of detail pages scraped.
+    """
+
+    LIMITER.share(shards)
+
+    return asyncio.run(_crawl_shard(shard, items, results))
+
+
+async def _crawl_shard(
+    shard: int, items: List[ShardItem], results: Queue
+) -> Coroutine[Any, Any, Awaitable[int]]:
+    """
+    Coroutine of a shard worker process; scrapes the detail pages with up
+    to CONCURRENCY_DETAILS pages of its own browser.
+
+    Parameters
+    ----------
+    shard : int
+        Number of the shard.
+    items : List[ShardItem]
+        Detail pages of the shard.
+    results : Queue
+        Queue shared with the writer in the main process.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[int]]
+        Amount of detail pages scraped.
+    """
+
+    queue: asyncio.Queue[ShardItem] = asyncio.Queue()
+    retries = RetryQueue("details")
+
+    for item in items:
+        queue.put_nowait(item)
+
+    async with async_playwright() as backend:
+        browser, connected = await launch_browser(backend)
+        context = await new_context(browser)
+
+        # Log
+        CONSOLE.log(
+            f"Shard [b]{shard}[/b]: browser {'connected' if connected else 'started'} for {len(items)} detail pages."
+        )
+
+        pages = [
+            await context.new_page()
+            for _ in range(max(1, min(CONCURRENCY_DETAILS, len(items))))
+        ]
+
+        try:
+            scraped = await asyncio.gather(
+                *[
+                    _shard_worker(page, queue, retries, results)
+                    for page in pages
+                ]
+            )
+        finally:
+            await SCREENSHOTS.drain()
+            await browser.close()
+
+            results.put(("rates", shard, LIMITER.stats()))
+
+            if METRICS.enabled:
+                results.put(("metrics", shard, METRICS.snapshot()))
+
+    return sum(scraped)
+
+
+async def _shard_worker(
+    page: Page,
+    queue: asyncio.Queue[ShardItem],
+    retries: RetryQueue,
+    results: Queue,
+) -> Coroutine[Any, Any, Awaitable[int]]:
+    """
+    Worker consuming the detail pages of a shard, until they are exhausted
+    and no retries are left. Due retries are taken first.
+
+    Parameters
+    ----------
+    page : Page
+        Playwright Page instance, owned by this worker.
+    queue : asyncio.Queue[ShardItem]
+        Detail pages of the shard.
+    retries : RetryQueue
+        Retries of failed detail pages.
+    results : Queue
+        Queue shared with the writer in the main process.
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[int]]
+        Amount of detail pages scraped.
+    """
+
+    scraped = 0
+
+    while True:
+        item = retries.due()
+
+        if item is None:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                item = await retries.wait()
+
+                if item is None:
+                    return scraped
+
+        idx, url_pokemon, url_img_src = item
+
+        try:
+            pokemon = await extract_pokemon(page, url_pokemon)
+        except Exception as e:
+            record = await retries.failed(item, url_pokemon, e, page)
+
+            if record is not None:
+                results.put(("failed", idx, url_pokemon, record))
+
+            continue
+
+        results.put(("pokemon", idx, url_pokemon, url_img_src, pokemon))
+        scraped += 1
@@ -0,0 +1,189 @@
+import asyncio
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+from typing import Any, Awaitable, Coroutine, List, Optional
+
+from ..database.crawl_state import journal
+from ..database.db import table_dead_letter
+from ..downloader import ImageDownloader
+from ..environ import CONSOLE, SHARDS
+from ..metrics import METRICS
+from .coro_pokemon_details import persist_pokemon, resumed_pokemon
+from .shard_worker import ShardItem, crawl_shard
+
+
+def split_frontier(
+    items: List[ShardItem], shards: int
+) -> List[List[ShardItem]]:
+    """
+    Split the detail-URL frontier into shards of equal size. Items are
+    dealt round-robin, so every shard gets a mix of the Pokédex pages.
+
+    Parameters
+    ----------
+    items : List[ShardItem]
+        Detail pages to scrape.
+    shards : int
+        Amount of shards.
+
+    Returns
+    -------
+    List[List[ShardItem]]
+        Non-empty shards.
+    """
+
+    return [items[n::shards] for n in range(shards) if items[n::shards]]
+
+
+async def get_pokemon_details_sharded(
+    data_pokedex_cards_img: List[dict],
+    downloader: Optional[ImageDownloader] = None,
+    shards: int = SHARDS,
+) -> Coroutine[Any, Any, Awaitable[List[dict]]]:
+    """
+    Coroutine for scraping Pokémon details across worker processes.
+
+    The detail-URL frontier is split into shards, and every shard is
+    scraped by a worker process running its own Playwright instance. The
+    workers only extract and parse; their results are merged by a single
+    writer in this process, which saves the images, inserts the records
+    and journals the completed pages, exactly like the in-process scrapers.
+    Pages that kept failing in a shard are dead-lettered by the writer.
+
+    Every shard gets an equal share of the per-host rate limits. Their
+    combined rate per host is logged, and published as the
+    'rate_limit_combined' gauge, once all shards are done.
+
+    Parameters
+    ----------
+    data_pokedex_cards_img : List[dict]
+        Scraped Pokédex card image data.
+    downloader : Optional[ImageDownloader], optional
+        Background image downloader to hand the Pokémon images to; images
+        are saved inline if omitted, by default None
+    shards : int, optional
+        Amount of worker processes, by default SHARDS
+
+    Returns
+    -------
+    Coroutine[Any, Any, Awaitable[List[dict]]]
+        Scraped Pokémon details, in the order of the provided card data.
+        Dead-lettered detail pages are None.
+    """
+
+    # Log
+    CONSOLE.log("Scraping [b]Pokémon details[/b] data, sharded...")
+
+    # Storage; indexed to keep the order of the card data
+    db_pokemon: List[dict] = [None] * len(data_pokedex_cards_img)
+
+    # Resume; completed pages are skipped if their key is in the database
+    completed = resumed_pokemon()
+
+    # Frontier
+    frontier: List[ShardItem] = list()
+
+    for idx, card in enumerate(data_pokedex_cards_img):
+        key = journal.details.get(card["url"][0])
+
+        if key in completed:
+            db_pokemon[idx] = completed[key]
+        else:
+            frontier.append((idx, card["url"][0], card["img_src"][0]))
+
+    if completed:
+        CONSOLE.log(
+            f"Resumed [b]{len(db_pokemon) - len(frontier)}[/b] Pokémon from journal."
+        )
+
+    parts = split_frontier(frontier, max(1, shards))
+
+    if not parts:
+        return db_pokemon
+
+    # Log
+    CONSOLE.log(
+        f"Started [b]{len(parts)}[/b] shard processes for [b]{len(frontier)}[/b] detail pages."
+    )
+
+    loop = asyncio.get_running_loop()
+    context = multiprocessing.get_context("spawn")
+
+    with context.Manager() as manager, ProcessPoolExecutor(
+        max_workers=len(parts), mp_context=context
+    ) as pool:
+        results = manager.Queue()
+        futures = [
+            loop.run_in_executor(
+                pool, crawl_shard, n, len(parts), part, results
+            )
+            for n, part in enumerate(parts)
+        ]
+
+        # Combined rate of the shards, by host
+        rates: Counter = Counter()
+
+        async def _merge(message: tuple) -> None:
+            if message[0] == "pokemon":
+                _, idx, url_pokemon, url_img_src, pokemon = message
+
+                db_pokemon[idx] = await persist_pokemon(
+                    pokemon, url_pokemon, url_img_src, downloader
+                )
+            elif message[0] == "failed":
+                _, idx, url_pokemon, record = message
+
+                table_dead_letter.insert(record)
+            elif message[0] == "rates":
+                _, _, host_rates = message
+
+                for host, stats in host_rates.items():
+                    rates[host] += stats["rate"]
+            else:
+                _, shard, snapshot = message
+
+                METRICS.merge(snapshot, shard=str(shard))
+
+        # Single writer; merges results until every shard has exited
+        while True:
+            try:
+                message = await asyncio.to_thread(
+                    results.get, True, 0.5
+                )
+            except queue.Empty:
+                if not all(future.done() for future in futures):
+                    continue
+
+                # Merge what the shards put after the last poll, like
+                # their final metrics snapshots
+                while True:
+                    try:
+                        message = results.get_nowait()
+                    except queue.Empty:
+                        break
+
+                    await _merge(message)
+
+                break
+
+            await _merge(message)
+
+        for host, rate in rates.items():
+            METRICS.gauge("rate_limit_combined", rate, host=host)
+
+            # Log
+            CONSOLE.log(
+                f"Shards: combined rate of '{host}' is [b]{rate:.2f}[/b] req/s."
+            )
+
+        # Surface crashed shards; their completed pages are journaled
+        for n, future in enumerate(futures):
+            if future.exception() is not None:
+                CONSOLE.log(
+                    f"[bold red]Shard {n} crashed[/bold red] ({future.exception()!r}).",
+                    level="error",
+                )
+
+    return db_pokemon
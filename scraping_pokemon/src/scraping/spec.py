@@ -0,0 +1,175 @@
+from typing import Any, Callable, Dict, List
+
+from ..types import FieldSpec, TableSpec
+
+
+def text(cells: List[str]) -> str:
+    """
+    Value of a single data cell.
+    """
+
+    return cells[0]
+
+
+def lines(cells: List[str]) -> List[str]:
+    """
+    Lines of a single data cell.
+    """
+
+    return cells[0].split("\n")
+
+
+def comma_separated(cells: List[str]) -> List[str]:
+    """
+    Comma-separated values of a single data cell.
+    """
+
+    return cells[0].split(",")
+
+
+def stat(cells: List[str]) -> Dict[str, int]:
+    """
+    Base, minimum and maximum value of a base stat. Empty cells, such as
+    the bar chart cell, are skipped.
+    """
+
+    return {
+        key: int(value)
+        for key, value in zip(
+            ["base", "min", "max"], [cell for cell in cells if cell]
+        )
+    }
+
+
+def field(
+    label: str,
+    name: str,
+    parse: Callable[[List[str]], Any] = text,
+    wrap: bool = True,
+) -> FieldSpec:
+    """
+    Declare the field of a row.
+
+    Parameters
+    ----------
+    label : str
+        Header label of the row.
+    name : str
+        Name of the field in the record.
+    parse : Callable[[List[str]], Any], optional
+        Parser of the data cell texts, by default text
+    wrap : bool, optional
+        Whether to wrap the value in a list, by default True
+
+    Returns
+    -------
+    FieldSpec
+        Field declaration.
+    """
+
+    return FieldSpec(label=label, name=name, parse=parse, wrap=wrap)
+
+
+def fields(
+    heading: str, *declared: FieldSpec, required: bool = True
+) -> TableSpec:
+    """
+    Declare a table of fields, with a row per field.
+
+    Parameters
+    ----------
+    heading : str
+        Heading preceding the table.
+    *declared : FieldSpec
+        Fields of the table.
+    required : bool, optional
+        Whether a page without the table is invalid, by default True
+
+    Returns
+    -------
+    TableSpec
+        Table declaration.
+    """
+
+    return TableSpec(
+        heading=heading,
+        kind="fields",
+        required=required,
+        fields=list(declared),
+        records=("", ""),
+    )
+
+
+def records(
+    heading: str, label: str, value: str, required: bool = False
+) -> TableSpec:
+    """
+    Declare a table of records, with a row per game or language. The header
+    label of every row is split into its lines.
+
+    Parameters
+    ----------
+    heading : str
+        Heading preceding the table.
+    label : str
+        Name of the header label field.
+    value : str
+        Name of the value field.
+    required : bool, optional
+        Whether a page without the table is invalid, by default False
+
+    Returns
+    -------
+    TableSpec
+        Table declaration.
+    """
+
+    return TableSpec(
+        heading=heading,
+        kind="records",
+        required=required,
+        fields=list(),
+        records=(label, value),
+    )
+
+
+# Vitals tables of a Pokémon detail page, by record section. Tables are
+# found by the heading preceding them, and rows by their header label.
+VITALS_SPEC: Dict[str, TableSpec] = dict(
+    pokedex_data=fields(
+        "Pokédex data",
+        field("National №", "national_no"),
+        field("Type", "type"),
+        field("Species", "species"),
+        field("Height", "height"),
+        field("Weight", "weight"),
+        field("Abilities", "abilities", lines),
+        field("Local №", "local_no", lines),
+    ),
+    training=fields(
+        "Training",
+        field("EV yield", "ev_yield"),
+        field("Catch rate", "catch_rate"),
+        field("Base Friendship", "base_friendship"),
+        field("Base Exp.", "base_exp"),
+        field("Growth Rate", "growth_rate"),
+    ),
+    breeding=fields(
+        "Breeding",
+        field("Egg Groups", "egg_groups", comma_separated),
+        field("Gender", "gender"),
+        field("Egg cycles", "egg_cycles"),
+    ),
+    base_stats=fields(
+        "Base stats",
+        field("HP", "hp", stat, wrap=False),
+        field("Attack", "attack", stat, wrap=False),
+        field("Defense", "defense", stat, wrap=False),
+        field("Sp. Atk", "special_attack", stat, wrap=False),
+        field("Sp. Def", "special_defense", stat, wrap=False),
+        field("Speed", "speed", stat, wrap=False),
+    ),
+    pokedex_entries=records("Pokédex entries", "game", "entry"),
+    where_to_find=records("Where to find", "game", "location"),
+    other_languages=records("Other languages", "language", "name"),
+)
@@ -0,0 +1,262 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha1
+from pathlib import Path
+from typing import Any, Awaitable, Coroutine, Optional, Set
+from urllib.parse import urlparse
+
+from playwright.async_api import Page
+
+import scraping_pokemon.src.environ as environ
+
+from .metrics import METRICS
+
+
+class ScreenshotPipeline:
+    """
+    Diagnostic screenshots of detail pages, kept off the critical path.
+    Pages are sampled by a deterministic policy; a sampled page is captured
+    to bytes by the browser, and the write to disk is handed to a thread
+    pool, so the page can move on right away.
+
+    Pending writes are bounded. Once the bound is reached, sampled pages are
+    skipped instead of captured, so screenshots cannot hold up scraping or
+    pile up in memory.
+
+    Sampling modes:
+
+    - 'off': no screenshots.
+    - 'all': every page.
+    - 'rate': every 1/rate-th page, evenly spaced in scraping order.
+    - 'hash': pages whose URL hashes below the rate; the same pages are
+      sampled on every run and in every shard.
+    - 'errors': only pages that failed to scrape.
+
+    Failed pages are captured in every mode but 'off'.
+
+    Parameters
+    ----------
+    mode : str, optional
+        Sampling mode, by default SCREENSHOT_MODE
+    rate : float, optional
+        Fraction of pages to sample, by default SCREENSHOT_RATE
+    clip : Optional[str], optional
+        Selector of the element to clip to; the full page is captured if
+        None, by default SCREENSHOT_CLIP
+    img_type : str, optional
+        Image format, by default SCREENSHOT_TYPE
+    quality : int, optional
+        JPEG quality, by default SCREENSHOT_QUALITY
+    workers : int, optional
+        Amount of write threads, by default SCREENSHOT_WORKERS
+    queue_size : int, optional
+        Maximum amount of pending writes, by default SCREENSHOT_QUEUE_SIZE
+    directory : Path, optional
+        Folder of the screenshots, by default SCREENSHOT_DIR
+    """
+
+    def __init__(
+        self,
+        mode: str = environ.SCREENSHOT_MODE,
+        rate: float = environ.SCREENSHOT_RATE,
+        clip: Optional[str] = environ.SCREENSHOT_CLIP,
+        img_type: str = environ.SCREENSHOT_TYPE,
+        quality: int = environ.SCREENSHOT_QUALITY,
+        workers: int = environ.SCREENSHOT_WORKERS,
+        queue_size: int = environ.SCREENSHOT_QUEUE_SIZE,
+        directory: Path = environ.SCREENSHOT_DIR,
+    ) -> None:
+        self.mode = mode
+        self.rate = min(1.0, max(0.0, rate))
+        self.clip = clip
+        self.img_type = img_type
+        self.quality = quality
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.directory = Path(directory)
+
+        self._seen = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    def sample(self, url: str, failed: bool = False) -> bool:
+        """
+        Decide whether to capture a page.
+
+        Parameters
+        ----------
+        url : str
+            URL of the page.
+        failed : bool, optional
+            Whether the page failed to scrape, by default False
+
+        Returns
+        -------
+        bool
+            Whether to capture the page.
+        """
+
+        if self.mode == "off":
+            return False
+
+        if failed or self.mode == "all":
+            return True
+
+        if self.mode == "rate":
+            self._seen += 1
+
+            return int(self._seen * self.rate) > int(
+                (self._seen - 1) * self.rate
+            )
+
+        if self.mode == "hash":
+            digest = sha1(url.encode("utf-8")).digest()
+
+            return (
+                int.from_bytes(digest[:4], "big") < self.rate * 2**32
+            )
+
+        return False
+
+    async def capture(
+        self, page: Page, url: str, failed: bool = False
+    ) -> Coroutine[Any, Any, Awaitable[bool]]:
+        """
+        Capture a page if it is sampled, and schedule its write to disk.
+        Capture errors are logged, never raised, since screenshots are only
+        diagnostic.
+
+        Parameters
+        ----------
+        page : Page
+            Playwright Page instance.
+        url : str
+            URL of the page, naming the screenshot.
+        failed : bool, optional
+            Whether the page failed to scrape, by default False
+
+        Returns
+        -------
+        Coroutine[Any, Any, Awaitable[bool]]
+            Whether a screenshot was captured.
+        """
+
+        if not self.sample(url, failed):
+            return False
+
+        if len(self._pending) >= self.queue_size:
+            METRICS.count("screenshots_skipped")
+
+            return False
+
+        options = dict(type=self.img_type, timeout=environ.PAGE_TIMEOUT)
+
+        if self.img_type == "jpeg":
+            options["quality"] = self.quality
+
+        try:
+            with METRICS.span("capture_screenshot"):
+                # Failed pages may lack the element; capture the viewport
+                if failed:
+                    data = await page.screenshot(**options)
+                elif self.clip:
+                    data = await page.locator(
+                        self.clip
+                    ).first.screenshot(**options)
+                else:
+                    data = await page.screenshot(
+                        full_page=True, **options
+                    )
+        except Exception as e:
+            # Log
+            environ.CONSOLE.log(
+                f"[bold red]Failed to capture screenshot[/bold red]: '{url}' ({e!r})",
+                level="error",
+            )
+
+            return False
+
+        suffix = "_error" if failed else ""
+        extension = "jpg" if self.img_type == "jpeg" else self.img_type
+        path = self.directory / f"{self._slug(url)}{suffix}.{extension}"
+
+        task = asyncio.create_task(self._write(path, data))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+        METRICS.count(
+            "screenshots", reason="error" if failed else "sample"
+        )
+        METRICS.count("screenshot_bytes", len(data))
+
+        return True
+
+    async def drain(self) -> Coroutine[Any, Any, Awaitable[None]]:
+        """
+        Wait for all pending screenshots to be written to disk, then stop
+        the write threads.
+        """
+
+        if self._pending:
+            # Log
+            environ.CONSOLE.log(
+                f"Draining screenshots: [b]{len(self._pending)}[/b] pending..."
+            )
+
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def _write(
+        self, path: Path, data: bytes
+    ) -> Coroutine[Any, Any, Awaitable[None]]:
+        """
+        Write a captured screenshot on the thread pool.
+
+        Parameters
+        ----------
+        path : Path
+            Path of the screenshot.
+        data : bytes
+            Encoded image.
+        """
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="screenshots",
+            )
+
+        try:
+            with METRICS.span("save_screenshot"):
+                await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self._write_file, path, data
+                )
+        except Exception as e:
+            # Log
+            environ.CONSOLE.log(
+                f"[bold red]Failed to save screenshot[/bold red]: '{path}' ({e!r})",
+                level="error",
+            )
+
+    @staticmethod
+    def _write_file(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    @staticmethod
+    def _slug(url: str) -> str:
+        slug = urlparse(url).path.rstrip("/").rsplit("/", 1)[-1]
+
+        return (
+            "".join(
+                c if c.isalnum() or c in "-_" else "_" for c in slug
+            )
+            or sha1(url.encode("utf-8")).hexdigest()[:12]
+        )
+
+
+# Screenshot pipeline shared by all detail page workers of a process
+SCREENSHOTS = ScreenshotPipeline()
@@ -0,0 +1,488 @@
+import asyncio
+import os
+import shutil
+import sqlite3
+import time
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Awaitable, Coroutine, Mapping, Optional
+from uuid import uuid4
+
+import aiofiles
+import aiohttp
+
+import scraping_pokemon.src.cache as cache
+import scraping_pokemon.src.environ as environ
+from scraping_pokemon.src.metrics import METRICS
+from scraping_pokemon.src.ratelimit import LIMITER
+from scraping_pokemon.src.types import SpriteEntry
+
+
+class SpriteStore:
+    """
+    Content-addressed store of the Pokémon images. Images are stored once
+    under their SHA-256 digest, so identical sprites, like those shared by
+    forms, take up disk space once. A SQLite manifest links every Pokémon
+    key and image URL to its digest, together with the ETag and
+    Last-Modified validators of the image.
+
+    Images with an entry younger than max_age are not downloaded again;
+    older entries are revalidated with a conditional request. With the
+    response cache enabled, images are fetched through it instead, and its
+    body is hard linked into the store, so an image is kept on disk once.
+    With links enabled, every image is also hard linked under its readable
+    name, like 'Bulbasaur.jpg'.
+
+    Parameters
+    ----------
+    root : Path, optional
+        Image directory, by default SPRITE_DIR
+    max_age : int, optional
+        Seconds an entry is kept without revalidation, by default
+        SPRITE_MAX_AGE
+    links : bool, optional
+        Whether or not to link images under their readable name, by
+        default SPRITE_LINKS
+    """
+
+    def __init__(
+        self,
+        root: Path = environ.SPRITE_DIR,
+        max_age: int = environ.SPRITE_MAX_AGE,
+        links: bool = environ.SPRITE_LINKS,
+    ) -> None:
+        self.root = Path(root)
+        self.max_age = max_age
+        self.links = links
+
+        # Statistics
+        self.skipped = 0
+        self.revalidated = 0
+        self.downloaded = 0
+        self.cached = 0
+        self.deduplicated = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """
+        Connection to the manifest, opened on first use.
+        """
+
+        if self._conn is None:
+            (self.root / "objects").mkdir(parents=True, exist_ok=True)
+            (self.root / "tmp").mkdir(parents=True, exist_ok=True)
+
+            self._conn = sqlite3.connect(
+                self.root / "manifest.db", isolation_level=None
+            )
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sprites (
+                    key TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    suffix TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    stored_at REAL NOT NULL,
+                    PRIMARY KEY (key, url)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sprites_digest ON sprites (digest)"
+            )
+
+        return self._conn
+
+    def path(self, digest: str, suffix: str) -> Path:
+        """
+        Path of a stored image.
+
+        Parameters
+        ----------
+        digest : str
+            SHA-256 digest of the image.
+        suffix : str
+            File extension of the image, like '.jpg'.
+
+        Returns
+        -------
+        Path
+            Path of the image on disk.
+        """
+
+        return self.root / "objects" / digest[:2] / f"{digest}{suffix}"
+
+    def lookup(self, key: str, url: str) -> Optional[SpriteEntry]:
+        """
+        Look up the manifest entry of an image.
+
+        Parameters
+        ----------
+        key : str
+            Key of the Pokémon.
+        url : str
+            Direct URL to the image.
+
+        Returns
+        -------
+        Optional[SpriteEntry]
+            Manifest entry, or None if the image is not stored.
+        """
+
+        row = self.conn.execute(
+            "SELECT * FROM sprites WHERE key = ? AND url = ?",
+            (key, url),
+        ).fetchone()
+
+        if (
+            row is None
+            or not self.path(row["digest"], row["suffix"]).exists()
+        ):
+            return None
+
+        return SpriteEntry(**dict(row))
+
+    def is_fresh(self, entry: SpriteEntry) -> bool:
+        """
+        Whether or not an image can be kept without revalidation.
+
+        Parameters
+        ----------
+        entry : SpriteEntry
+            Manifest entry.
+
+        Returns
+        -------
+        bool
+            True when the entry is younger than max_age.
+        """
+
+        return time.time() - entry["stored_at"] < self.max_age
+
+    async def fetch(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        key: Optional[str] = None,
+    ) -> Coroutine[Any, Any, Awaitable[Optional[Path]]]:
+        """
+        Store the image of a Pokémon, unless its manifest entry is fresh.
+        Stale entries are revalidated, and new images are streamed to disk
+        in chunks of IMG_CHUNK_SIZE bytes. With CACHE_ENABLED, images are
+        fetched through the response cache, and linked from it. Requests
+        wait for the rate limiter of their host.
+
+        Parameters
+        ----------
+        session : aiohttp.ClientSession
+            Session to fetch with.
+        url : str
+            Direct URL to the image.
+        key : Optional[str], optional
+            Key of the Pokémon, by default None
+
+        Returns
+        -------
+        Coroutine[Any, Any, Awaitable[Optional[Path]]]
+            Path of the stored image, or None if it was fresh or the server
+            did not respond with status 200.
+        """
+
+        key = key or ""
+        entry = self.lookup(key, url)
+
+        if entry and self.is_fresh(entry):
+            self.skipped += 1
+            self._link(url, self.path(entry["digest"], entry["suffix"]))
+
+            METRICS.count("images_skipped")
+
+            return None
+
+        if environ.CACHE_ENABLED:
+            return await self._fetch_cached(session, url, key, entry)
+
+        headers = dict()
+
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        async with LIMITER.slot(url) as permit, session.get(
+            url, headers=headers
+        ) as res:
+            permit.record(res.status, res.headers)
+
+            if res.status == 304 and entry:
+                self.revalidated += 1
+                self.conn.execute(
+                    "UPDATE sprites SET stored_at = ? WHERE key = ? AND url = ?",
+                    (time.time(), key, url),
+                )
+                self._link(
+                    url, self.path(entry["digest"], entry["suffix"])
+                )
+
+                return None
+
+            if res.status != 200:
+                return None
+
+            # Stream image to disk, hashing along the way
+            tmp = self.root / "tmp" / uuid4().hex
+            digest = sha256()
+
+            async with aiofiles.open(tmp, "wb") as f:
+                async for chunk in res.content.iter_chunked(
+                    environ.IMG_CHUNK_SIZE
+                ):
+                    digest.update(chunk)
+                    await f.write(chunk)
+
+            return self._commit(
+                key, url, tmp, digest.hexdigest(), res.headers
+            )
+
+    async def _fetch_cached(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        key: str,
+        entry: Optional[SpriteEntry],
+    ) -> Coroutine[Any, Any, Awaitable[Optional[Path]]]:
+        """
+        Store an image fetched through the response cache. The cache stores
+        bodies under their SHA-256 digest as well, so its body is linked
+        into the store as-is; only bodies the cache had to download count
+        as downloaded.
+
+        Parameters
+        ----------
+        session : aiohttp.ClientSession
+            Session to fetch with.
+        url : str
+            Direct URL to the image.
+        key : str
+            Key of the Pokémon.
+        entry : Optional[SpriteEntry]
+            Stale manifest entry of the image, if any.
+
+        Returns
+        -------
+        Coroutine[Any, Any, Awaitable[Optional[Path]]]
+            Path of the stored image, or None if it was unchanged or the
+            server did not respond with status 200.
+        """
+
+        before = cache.RESPONSE_CACHE.lookup(url)
+        path = await cache.RESPONSE_CACHE.fetch(session, url)
+
+        if path is None:
+            return None
+
+        digest = path.name
+
+        if entry and entry["digest"] == digest:
+            self.revalidated += 1
+            self.conn.execute(
+                "UPDATE sprites SET stored_at = ? WHERE key = ? AND url = ?",
+                (time.time(), key, url),
+            )
+            self._link(url, self.path(entry["digest"], entry["suffix"]))
+
+            return None
+
+        after = cache.RESPONSE_CACHE.lookup(url)
+        headers = dict()
+
+        if after and after["etag"]:
+            headers["etag"] = after["etag"]
+
+        if after and after["last_modified"]:
+            headers["last-modified"] = after["last_modified"]
+
+        tmp = await asyncio.to_thread(self._adopt, path)
+
+        return self._commit(
+            key,
+            url,
+            tmp,
+            digest,
+            headers,
+            transferred=before is None or before["digest"] != digest,
+        )
+
+    def _adopt(self, source: Path) -> Path:
+        """
+        Hard link an image that is already on disk, like a response cache
+        body, to a temporary file; copied where hard links are not
+        supported.
+
+        Parameters
+        ----------
+        source : Path
+            File containing the image.
+
+        Returns
+        -------
+        Path
+            Temporary file.
+        """
+
+        tmp = self.root / "tmp" / uuid4().hex
+
+        try:
+            os.link(source, tmp)
+        except OSError:
+            shutil.copyfile(source, tmp)
+
+        return tmp
+
+    def _commit(
+        self,
+        key: str,
+        url: str,
+        tmp: Path,
+        digest: str,
+        headers: Mapping[str, str],
+        transferred: bool = True,
+    ) -> Path:
+        """
+        Move a written image into the object store, link it from the
+        manifest, and remove the image it replaces once nothing links to
+        it anymore. Only transferred images count as downloaded bytes.
+
+        Parameters
+        ----------
+        key : str
+            Key of the Pokémon.
+        url : str
+            Direct URL to the image.
+        tmp : Path
+            Temporary file containing the image.
+        digest : str
+            SHA-256 digest of the image.
+        headers : Mapping[str, str]
+            Response headers.
+        transferred : bool, optional
+            Whether or not the image was downloaded for this fetch, by
+            default True
+
+        Returns
+        -------
+        Path
+            Path of the stored image.
+        """
+
+        suffix = Path(url).suffix.lower()
+        path = self.path(digest, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if path.exists():
+            self.deduplicated += 1
+            tmp.unlink()
+        else:
+            tmp.replace(path)
+
+        if transferred:
+            self.downloaded += 1
+
+            METRICS.count("images")
+            METRICS.count("image_bytes", path.stat().st_size)
+        else:
+            self.cached += 1
+
+        previous = self.conn.execute(
+            "SELECT digest, suffix FROM sprites WHERE key = ? AND url = ?",
+            (key, url),
+        ).fetchone()
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sprites VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                url,
+                digest,
+                suffix,
+                path.stat().st_size,
+                headers.get("etag"),
+                headers.get("last-modified"),
+                time.time(),
+            ),
+        )
+
+        if previous and previous["digest"] != digest:
+            (refs,) = self.conn.execute(
+                "SELECT COUNT(*) FROM sprites WHERE digest = ?",
+                (previous["digest"],),
+            ).fetchone()
+
+            if not refs:
+                self.path(
+                    previous["digest"], previous["suffix"]
+                ).unlink(missing_ok=True)
+
+        self._link(url, path, replace=True)
+
+        return path
+
+    def _link(
+        self, url: str, path: Path, replace: bool = False
+    ) -> None:
+        """
+        Hard link a stored image under its readable name; copied where
+        hard links are not supported.
+
+        Parameters
+        ----------
+        url : str
+            Direct URL to the image.
+        path : Path
+            Path of the stored image.
+        replace : bool, optional
+            Whether or not to replace an existing link, by default False
+        """
+
+        if not self.links:
+            return
+
+        link = self.root / f"{Path(url).stem.title()}{Path(url).suffix}"
+
+        # Renaming onto a hard link of the same file is a no-op
+        if link.exists() and (not replace or link.samefile(path)):
+            return
+
+        tmp = self.root / "tmp" / uuid4().hex
+
+        try:
+            os.link(path, tmp)
+        except OSError:
+            shutil.copyfile(path, tmp)
+
+        tmp.replace(link)
+
+    def report(self) -> None:
+        """
+        Log the skipped, revalidated, downloaded, cached and deduplicated
+        images of this run.
+        """
+
+        # Log
+        environ.CONSOLE.log(
+            f"Sprite store: [b]{self.skipped}[/b] fresh, [b]{self.revalidated}[/b] revalidated, "
+            f"[b]{self.downloaded}[/b] downloaded, [b]{self.cached}[/b] linked from cache, "
+            f"of which [b]{self.deduplicated}[/b] deduplicated."
+        )
+
+
+# Shared image store for all downloads of a run
+SPRITE_STORE = SpriteStore()
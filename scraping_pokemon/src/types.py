@@ -1,5 +1,20 @@
 from pathlib import Path
-from typing import Literal, TypedDict, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Mapping,
+    Protocol,
+    Tuple,
+    TypedDict,
+    Union,
+)
+
+# Row of a vitals table; header label and data cell texts
+VitalsRow = Tuple[str, List[str]]
 
 
 class FirefoxParams(TypedDict):
@@ -8,3 +23,102 @@ class FirefoxParams(TypedDict):
     slow_mo: Union[float, None]
     downloads_path: Union[str, Path, None]
     traces_dir: Union[str, Path, None]
+
+
+class CacheEntry(TypedDict):
+    url: str
+    digest: str
+    size: int
+    content_type: Union[str, None]
+    etag: Union[str, None]
+    last_modified: Union[str, None]
+    stored_at: float
+    accessed_at: float
+
+
+class SpriteEntry(TypedDict):
+    key: str
+    url: str
+    digest: str
+    suffix: str
+    size: int
+    etag: Union[str, None]
+    last_modified: Union[str, None]
+    stored_at: float
+
+
+class WorkItem(TypedDict):
+    id: int
+    kind: str
+    url: str
+    payload: Dict[str, Any]
+    attempts: int
+    owner: str
+    expires_at: float
+
+
+class HostRate(TypedDict):
+    host: str
+    rate: float
+    queue_depth: int
+    queue_peak: int
+    in_flight: int
+    latency: Union[float, None]
+    requests: int
+    throttled: int
+    failures: int
+    decreases: int
+
+
+class DeadLetter(TypedDict):
+    stage: str
+    url: str
+    attempts: int
+    error: str
+    traceback: str
+    html: Union[str, None]
+    failed_at: str
+
+
+class FieldSpec(TypedDict):
+    label: str
+    name: str
+    parse: Callable[[List[str]], Any]
+    wrap: bool
+
+
+class TableSpec(TypedDict):
+    heading: str
+    kind: Literal["fields", "records"]
+    required: bool
+    fields: List[FieldSpec]
+    records: Tuple[str, str]
+
+
+class IndexEntry(TypedDict):
+    doc_id: int
+    key: str
+    name: str
+    national_no: int
+    generation: int
+    types: List[str]
+    stats: Dict[str, int]
+
+
+class DocumentTable(Protocol):
+    def insert(self, document: Mapping) -> int:
+        ...
+
+    def insert_multiple(
+        self, documents: Iterable[Mapping]
+    ) -> List[int]:
+        ...
+
+    def all(self) -> List[dict]:
+        ...
+
+    def truncate(self) -> None:
+        ...
+
+    def __len__(self) -> int:
+        ...
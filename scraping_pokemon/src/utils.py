@@ -1,5 +1,6 @@
 import asyncio
 import json
+import time
 from datetime import datetime
 from hashlib import sha1, sha256
 from pathlib import Path
@@ -8,6 +9,7 @@ from typing import (
     Any,
     Awaitable,
     Coroutine,
+    List,
     Literal,
     Optional,
     TextIO,
@@ -20,38 +22,53 @@ from playwright.async_api import (
     Browser,
     Locator,
     Page,
+    Response,
     async_playwright,
 )
 
 import scraping_pokemon.src.environ as environ
+import scraping_pokemon.src.routing as routing
+import scraping_pokemon.src.sprites as sprites
+from scraping_pokemon.src.metrics import METRICS
+from scraping_pokemon.src.ratelimit import LIMITER
 import scraping_pokemon.src.scraping as scraping
 
 
-async def save_img(url: str) -> Coroutine[Any, Any, None]:
+async def save_img(
+    url: str,
+    session: Optional[aiohttp.ClientSession] = None,
+    key: Optional[str] = None,
+) -> Coroutine[Any, Any, None]:
     """
-    Save an image, from a direct URL to the image, to disk. Image type is
-    inferred from the URL.
+    Save an image, from a direct URL to the image, to the sprite store.
+    Images the store holds a fresh copy of are not downloaded again. With
+    CACHE_ENABLED, the image is fetched through the response cache.
+    Requests wait for the rate limiter of their host.
 
     Parameters
     ----------
     url : str
         Direct URL to image.
+    session : Optional[aiohttp.ClientSession], optional
+        Session to download with; a new session is opened if omitted, by
+        default None
+    key : Optional[str], optional
+        Key of the Pokémon the image belongs to, by default None
     """
 
-    filename = f"./data/static/img/pokemon/{Path(url).stem.title()}{Path(url).suffix}"
-
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as res:
-            if res.status == 200:
-                payload = await res.read()
+    if session is None:
+        async with aiohttp.ClientSession() as _session:
+            return await save_img(url=url, session=_session, key=key)
 
-                async with aiofiles.open(filename, "wb+") as f:
-                    await f.write(payload)
+    with METRICS.span("save_img"):
+        path = await sprites.SPRITE_STORE.fetch(session, url, key)
 
-                    # Log
-                    environ.CONSOLE.log(
-                        f"Saved image: '{Path(url).stem.title()}{Path(url).suffix}'"
-                    )
+    if path:
+        # Log
+        environ.CONSOLE.log(
+            f"Saved image: '{Path(url).stem.title()}{Path(url).suffix}'",
+            level="debug",
+        )
 
 
 async def generate_hash(
@@ -124,15 +141,17 @@ async def save_screenshot(
     if idx >= 0:
         filename = filename[:idx]
 
-    await element.screenshot(
-        type=img_type,
-        path=f"./data/static/img/screenshots/{filename}.{img_type}",
-        full_page=full_page,
-    )
+    with METRICS.span("save_screenshot"):
+        await element.screenshot(
+            type=img_type,
+            path=f"./data/static/img/screenshots/{filename}.{img_type}",
+            full_page=full_page,
+        )
 
     # Log
     environ.CONSOLE.log(
-        f"Saved screenshot for '{filename}' page/element."
+        f"Saved screenshot for '{filename}' page/element.",
+        level="debug",
     )
 
 
@@ -157,19 +176,20 @@ async def save_json(
     if idx >= 0:
         filename = filename[0:idx]
 
-    async with aiofiles.open(
-        file=f"./data/static/out/{filename}.json",
-        mode="w",
-        encoding="utf-8",
-    ) as f:
-        await f.write(
-            json.dumps(
-                obj, indent=2, sort_keys=sort, ensure_ascii=False
+    with METRICS.span("save_json"):
+        async with aiofiles.open(
+            file=f"./data/static/out/{filename}.json",
+            mode="w",
+            encoding="utf-8",
+        ) as f:
+            await f.write(
+                json.dumps(
+                    obj, indent=2, sort_keys=sort, ensure_ascii=False
+                )
             )
-        )
 
-        # Log
-        environ.CONSOLE.log(f"Created JSON dump for '{filename}'.")
+    # Log
+    environ.CONSOLE.log(f"Created JSON dump for '{filename}'.")
 
 
 def clean_text(text: str) -> str:
@@ -204,7 +224,11 @@ async def navigate(
     page: Optional[Page] = None,
 ) -> Coroutine[Any, Any, Awaitable[Page]]:
     """
-    Navigates the provided browser, or page, to the provided url.
+    Navigates the provided browser, or page, to the provided url. With
+    ROUTE_BLOCKING enabled, requests are filtered by the shared route
+    policy. With CACHE_ENABLED, documents are served through the response
+    cache, which waits for the rate limiter of their host on a miss;
+    otherwise, the navigation itself waits for it.
 
     Parameters
     ----------
@@ -229,14 +253,44 @@ async def navigate(
     if not page and not browser:
         raise TypeError("Either 'browser' or 'page' must be provided")
 
-    if page:
-        await page.goto(url)
-    else:
+    if not page:
         page = await browser.new_page()
-        await page.goto(url)
+
+    with METRICS.span("navigate"):
+        # Block resources by policy, and serve documents from cache
+        if environ.ROUTE_BLOCKING or environ.CACHE_ENABLED:
+            await routing.ROUTE_POLICY.install(page)
+
+        if environ.CACHE_ENABLED:
+            await page.goto(url)
+        else:
+            # Time the document response only; 'goto' also waits for
+            # the page to load, which says nothing about server pressure
+            received: List[float] = list()
+
+            def _on_response(response: Response) -> None:
+                if response.frame == page.main_frame and (
+                    response.request.is_navigation_request()
+                ):
+                    received.append(time.monotonic())
+
+            page.on("response", _on_response)
+
+            try:
+                async with LIMITER.slot(url) as permit:
+                    response = await page.goto(url)
+
+                    if response is not None:
+                        permit.record(
+                            response.status,
+                            response.headers,
+                            received[-1] if received else None,
+                        )
+            finally:
+                page.remove_listener("response", _on_response)
 
     # Log
-    environ.CONSOLE.log(f"Navigating to: {url}")
+    environ.CONSOLE.log(f"Navigating to: {url}", level="debug")
 
     # Set page timeout
     page.set_default_timeout(environ.PAGE_TIMEOUT)
@@ -249,7 +303,8 @@ async def dump_console_recording(
 ) -> Coroutine[Any, Any, Awaitable[None]]:
     """
     Dumps a recording of the internal rich console to vector (svg), or HTML
-    format.
+    format. The recording holds the last LOG_RECORD_SIZE records; nothing
+    is dumped if recording is disabled.
 
     Parameters
     ----------
@@ -264,8 +319,11 @@ async def dump_console_recording(
         If provided type is not supported.
     """
 
+    if not environ.CONSOLE.record:
+        return
+
     params = dict(
-        path=f"./data/static/logs/{title}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.svg",
+        path=f"{environ.LOG_DIR}/{title}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.svg",
         title=title.title(),
         clear=False,
     )
@@ -275,6 +333,8 @@ async def dump_console_recording(
         f"Dumping console logs: [b i]{type.upper()}[/b i] format..."
     )
 
+    environ.CONSOLE.trim_recording()
+
     if type == "svg":
         environ.CONSOLE.save_svg(**params)
     elif type == "html":
@@ -317,11 +377,29 @@ async def teardown(
 
 async def entrypoint() -> Coroutine[Any, Any, Awaitable[None]]:
     """
-    Playwright async API context manager entrypoint.
+    Scraping entrypoint. Runs the browserless engine if ENGINE is set to
+    'http', or the Playwright async API context manager otherwise. With
+    LOG_FILE enabled, the run is logged to a file in LOG_DIR as well.
     """
 
-    async with async_playwright() as backend:
+    if environ.LOG_FILE:
+        path = environ.CONSOLE.open_sink(
+            environ.LOG_DIR,
+            format=environ.LOG_FILE_FORMAT,
+            level=environ.LOG_FILE_LEVEL,
+        )
+
         # Log
-        environ.CONSOLE.log("Initiating async browser context...")
+        environ.CONSOLE.log(f"Logging to: '{path}'")
+
+    try:
+        if environ.ENGINE == "http":
+            return await scraping.main_coroutine_http()
+
+        async with async_playwright() as backend:
+            # Log
+            environ.CONSOLE.log("Initiating async browser context...")
 
-        await scraping.main_coroutine(backend)
+            await scraping.main_coroutine(backend)
+    finally:
+        environ.CONSOLE.close_sink()